@@ -0,0 +1,41 @@
+import asyncio
+
+from .observability import COALESCED_WAITERS, INFLIGHT_COMPUTATIONS
+
+
+class SingleFlight:
+    """
+    같은 키의 동시 요청을 하나의 계산으로 합칩니다. (single-flight)
+    키의 계산이 진행 중이면 새 요청은 계산을 새로 시작하지 않고 같은 결과(또는 같은 예외)를 함께 기다립니다.
+    계산이 끝나면 키를 바로 지우므로 결과를 캐시하지는 않습니다. 이벤트 루프 스레드에서만 호출해야 합니다.
+
+    먼저 온 요청의 연결이 끊겨도 계산은 취소하지 않습니다. (기다리는 다른 요청이 있을 수 있고,
+    끝까지 학습한 모델은 캐시되어 다음 요청에서 재사용됩니다.)
+    """
+
+    def __init__(self, name: str):
+        self.name = name
+        self._inflight = {}
+
+    def inflight(self) -> int:
+        return len(self._inflight)
+
+    async def run(self, key, compute):
+        """compute()가 돌려주는 코루틴을 키마다 하나만 실행하고, 그 결과를 반환합니다."""
+        future = self._inflight.get(key)
+        if future is not None:
+            COALESCED_WAITERS.labels(self.name).inc()
+        else:
+            future = asyncio.ensure_future(compute())
+            self._inflight[key] = future
+            INFLIGHT_COMPUTATIONS.labels(self.name).inc()
+            future.add_done_callback(lambda done: self._finish(key, done))
+        return await asyncio.shield(future)
+
+    def _finish(self, key, future: asyncio.Future):
+        if self._inflight.get(key) is future:
+            del self._inflight[key]
+            INFLIGHT_COMPUTATIONS.labels(self.name).dec()
+        # 기다리던 요청이 모두 끊겼어도 예외가 '확인되지 않음'으로 로그에 남지 않도록 꺼내 둡니다.
+        if not future.cancelled():
+            future.exception()
@@ -0,0 +1,44 @@
+from typing import Literal
+
+import pandas as pd
+from fastapi.responses import JSONResponse, Response
+
+# 표 형태 응답(과거 시세, 분봉)의 형식
+# - records: 행마다 객체 하나 ([{"date": ..., "closing_price": ...}, ...]) - 기존 형식
+# - columns: 컬럼마다 배열 하나 ({"date": [...], "closing_price": [...]}) - 키 이름이 반복되지 않아 작음
+# - arrow: Apache Arrow IPC 스트림 (pyarrow.ipc.open_stream / pandas로 바로 읽을 수 있음)
+ResponseFormat = Literal["records", "columns", "arrow"]
+ARROW_MEDIA_TYPE = "application/vnd.apache.arrow.stream"
+
+
+def _json_safe(frame: pd.DataFrame) -> pd.DataFrame:
+    # JSON에는 NaN이 없으므로 null로 바꿉니다.
+    if not frame.isna().values.any():
+        return frame
+    return frame.astype(object).where(frame.notna(), None)
+
+
+def arrow_bytes(frame: pd.DataFrame) -> bytes:
+    """데이터프레임(인덱스 제외)을 Arrow IPC 스트림 바이트로 직렬화합니다."""
+    import pyarrow as pa  # 이 형식을 요청할 때만 불러옵니다.
+
+    table = pa.Table.from_pandas(frame, preserve_index=False)
+    sink = pa.BufferOutputStream()
+    with pa.ipc.new_stream(sink, table.schema) as writer:
+        writer.write_table(table)
+    return sink.getvalue().to_pybytes()
+
+
+def table_response(key: str, frame: pd.DataFrame, fmt: ResponseFormat = "records") -> Response:
+    """
+    표 형태 데이터를 요청한 형식의 응답으로 만듭니다. JSON 형식은 {key: 데이터}로 감쌉니다.
+    frame의 컬럼이 그대로 응답 필드가 되므로, 날짜 등은 호출하는 쪽에서 응답에 쓸 형태로 만들어 둡니다.
+    """
+    if fmt == "arrow":
+        return Response(arrow_bytes(frame), media_type=ARROW_MEDIA_TYPE)
+    frame = _json_safe(frame)
+    if fmt == "columns":
+        data = {column: frame[column].tolist() for column in frame.columns}
+    else:
+        data = frame.to_dict(orient='records')
+    return JSONResponse({key: data})
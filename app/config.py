@@ -0,0 +1,168 @@
+import os
+
+# 프로젝트 루트 디렉토리
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+
+# 로컬 캐시/저장소의 기본 디렉토리 (환경 변수로 변경 가능)
+DATA_DIR = os.environ.get("PREDICTIBOOT_DATA_DIR", os.path.join(PROJECT_ROOT, ".predictiboot"))
+
+# --- 학습된 모델 캐시 ---
+MODEL_CACHE_DIR = os.environ.get("PREDICTIBOOT_MODEL_CACHE_DIR", os.path.join(DATA_DIR, "models"))
+MODEL_CACHE_MAX_ENTRIES = int(os.environ.get("PREDICTIBOOT_MODEL_CACHE_MAX_ENTRIES", "200"))
+MODEL_CACHE_MAX_BYTES = int(os.environ.get("PREDICTIBOOT_MODEL_CACHE_MAX_BYTES", str(2 * 1024 ** 3)))
+MODEL_CACHE_MEMORY_ENTRIES = int(os.environ.get("PREDICTIBOOT_MODEL_CACHE_MEMORY_ENTRIES", "8"))
+
+# --- 증분(warm start) 재학습 ---
+WARM_START_ENABLED = os.environ.get("PREDICTIBOOT_WARM_START", "1") == "1"
+WARM_START_LSTM_EPOCHS = int(os.environ.get("PREDICTIBOOT_WARM_START_LSTM_EPOCHS", "5"))
+WARM_START_XGB_TREES = int(os.environ.get("PREDICTIBOOT_WARM_START_XGB_TREES", "50"))
+# 이 횟수만큼 이어서 학습했거나 마지막 전체 학습 후 이 기간(일)이 지나면 전체 재학습합니다.
+WARM_START_MAX_UPDATES = int(os.environ.get("PREDICTIBOOT_WARM_START_MAX_UPDATES", "5"))
+WARM_START_MAX_AGE_DAYS = int(os.environ.get("PREDICTIBOOT_WARM_START_MAX_AGE_DAYS", "7"))
+WARM_START_MAX_NEW_BARS = int(os.environ.get("PREDICTIBOOT_WARM_START_MAX_NEW_BARS", "5"))
+# 새 봉이 기존 스케일러 범위를 이 비율 이상 벗어나면 드리프트로 보고 전체 재학습합니다.
+WARM_START_DRIFT_TOLERANCE = float(os.environ.get("PREDICTIBOOT_WARM_START_DRIFT_TOLERANCE", "0.05"))
+
+# --- 병렬 학습 ---
+# 1이면 독립적인 1차 모델 학습 4개를 프로세스 풀에서 동시에 실행합니다.
+PARALLEL_TRAINING = os.environ.get("PREDICTIBOOT_PARALLEL_TRAINING", "0") == "1"
+PARALLEL_TRAINING_WORKERS = int(os.environ.get("PREDICTIBOOT_PARALLEL_TRAINING_WORKERS", "4"))
+# 워커당 TensorFlow/XGBoost 스레드 수 (0이면 CPU 코어 수 / 워커 수)
+PARALLEL_TRAINING_THREADS = int(os.environ.get("PREDICTIBOOT_PARALLEL_TRAINING_THREADS", "0"))
+
+# --- 학습 시간 예산 ---
+# 요청 하나의 학습에 쓸 기본 시간(초). 예산이 빠듯하면 epoch 수/모델 크기를 줄이거나 XGBoost만 사용. 0이면 제한 없음
+TRAINING_BUDGET_SECONDS = float(os.environ.get("PREDICTIBOOT_TRAINING_BUDGET_SECONDS", "120"))
+# 예산 중 메타 모델 학습/예측/저장을 위해 남겨 두는 비율
+TRAINING_BUDGET_RESERVE_FRACTION = float(os.environ.get("PREDICTIBOOT_TRAINING_BUDGET_RESERVE_FRACTION", "0.1"))
+# 조기 종료 검증에 사용하는 마지막 학습 데이터 비율
+TRAINING_VALIDATION_FRACTION = float(os.environ.get("PREDICTIBOOT_TRAINING_VALIDATION_FRACTION", "0.1"))
+LSTM_MAX_EPOCHS = int(os.environ.get("PREDICTIBOOT_LSTM_MAX_EPOCHS", "50"))
+LSTM_EARLY_STOPPING_PATIENCE = int(os.environ.get("PREDICTIBOOT_LSTM_EARLY_STOPPING_PATIENCE", "5"))
+# 예산 안에 이만큼의 epoch도 돌릴 수 없으면 LSTM 없이 XGBoost만 사용
+LSTM_MIN_EPOCHS = int(os.environ.get("PREDICTIBOOT_LSTM_MIN_EPOCHS", "5"))
+XGB_MAX_TREES = int(os.environ.get("PREDICTIBOOT_XGB_MAX_TREES", "500"))
+XGB_EARLY_STOPPING_ROUNDS = int(os.environ.get("PREDICTIBOOT_XGB_EARLY_STOPPING_ROUNDS", "30"))
+
+# --- 예측 기간 ---
+# 한 번의 학습으로 함께 예측할 기간(거래일, 쉼표로 구분). 다음 거래일(1)은 항상 포함
+PREDICTION_HORIZONS = sorted({1} | {
+    int(days) for days in os.environ.get("PREDICTIBOOT_PREDICTION_HORIZONS", "1,5,20").split(",") if days.strip()
+})
+
+# --- 전 종목 공통(global) 모델 ---
+# 예측에 사용할 모델: per_ticker(요청마다 종목별 학습), global(미리 학습한 공통 모델로 추론만),
+# compare(두 모델을 모두 실행해 예측과 소요 시간을 함께 반환). 요청마다 model 파라미터로 바꿀 수 있음
+PREDICTION_MODELS = ("per_ticker", "global", "compare")
+PREDICTION_MODEL = os.environ.get("PREDICTIBOOT_PREDICTION_MODEL", "per_ticker")
+GLOBAL_MODEL_DIR = os.environ.get("PREDICTIBOOT_GLOBAL_MODEL_DIR", os.path.join(DATA_DIR, "global_model"))
+# 공통 모델 학습에 사용하는 데이터 기간(년)과, 종목마다 뽑는 1차 모델 학습 샘플 수 (0이면 전부 사용)
+GLOBAL_MODEL_YEARS = int(os.environ.get("PREDICTIBOOT_GLOBAL_MODEL_YEARS", "5"))
+GLOBAL_MODEL_SAMPLES_PER_CODE = int(os.environ.get("PREDICTIBOOT_GLOBAL_MODEL_SAMPLES_PER_CODE", "150"))
+# 종목마다 마지막 이 거래일 수만큼은 메타 모델 학습과 검증(hold-out)에 사용
+GLOBAL_MODEL_META_DAYS = int(os.environ.get("PREDICTIBOOT_GLOBAL_MODEL_META_DAYS", "60"))
+GLOBAL_MODEL_LSTM_EPOCHS = int(os.environ.get("PREDICTIBOOT_GLOBAL_MODEL_LSTM_EPOCHS", "30"))
+
+# --- 배치 예측 ---
+BATCH_FETCH_CONCURRENCY = int(os.environ.get("PREDICTIBOOT_BATCH_FETCH_CONCURRENCY", "8"))
+BATCH_MAX_CODES = int(os.environ.get("PREDICTIBOOT_BATCH_MAX_CODES", "300"))
+
+# --- 비동기 예측 작업 ---
+JOB_WORKERS = int(os.environ.get("PREDICTIBOOT_JOB_WORKERS", "2"))
+JOB_MAX_PENDING = int(os.environ.get("PREDICTIBOOT_JOB_MAX_PENDING", "32"))
+JOB_RESULT_TTL_SECONDS = int(os.environ.get("PREDICTIBOOT_JOB_RESULT_TTL_SECONDS", "3600"))
+JOB_EVENT_POLL_SECONDS = float(os.environ.get("PREDICTIBOOT_JOB_EVENT_POLL_SECONDS", "0.5"))
+
+# --- 학습 워커 ---
+# local: API 프로세스에서 직접 학습. queue: 예측을 브로커 큐에 넣고 별도 학습 워커(python -m app.workers)가 처리
+WORKER_MODE = os.environ.get("PREDICTIBOOT_WORKER_MODE", "local")
+# memory: 같은 프로세스 안의 큐 (API 프로세스에서 워커 스레드를 함께 실행, 개발/테스트용)
+# file: 공유 디렉토리의 파일 큐 (같은 호스트나 공유 파일 시스템의 여러 워커 프로세스/노드)
+WORKER_BROKER = os.environ.get("PREDICTIBOOT_WORKER_BROKER", "file")
+WORKER_BROKER_DIR = os.environ.get("PREDICTIBOOT_WORKER_BROKER_DIR", os.path.join(DATA_DIR, "queue"))
+# memory 브로커일 때 API 프로세스 안에서 실행할 워커 수
+WORKER_LOCAL_COUNT = int(os.environ.get("PREDICTIBOOT_WORKER_LOCAL_COUNT", "2"))
+# 종목 코드를 워커에 배정하는 해시 링에서 워커 하나가 차지하는 가상 노드 수
+WORKER_VIRTUAL_NODES = int(os.environ.get("PREDICTIBOOT_WORKER_VIRTUAL_NODES", "64"))
+# 워커는 이 간격(초)으로 생존 신호를 남기고, 이 시간(초) 동안 신호가 없으면 링에서 빠진 것으로 봄
+WORKER_HEARTBEAT_SECONDS = float(os.environ.get("PREDICTIBOOT_WORKER_HEARTBEAT_SECONDS", "5"))
+WORKER_TIMEOUT_SECONDS = float(os.environ.get("PREDICTIBOOT_WORKER_TIMEOUT_SECONDS", "30"))
+# API가 워커의 결과를 기다리는 최대 시간(초)과 상태 확인 간격(초)
+WORKER_TASK_TIMEOUT_SECONDS = float(os.environ.get("PREDICTIBOOT_WORKER_TASK_TIMEOUT_SECONDS", "1800"))
+WORKER_POLL_SECONDS = float(os.environ.get("PREDICTIBOOT_WORKER_POLL_SECONDS", "0.5"))
+
+# --- 업스트림 HTTP ---
+HTTP_TIMEOUT_SECONDS = float(os.environ.get("PREDICTIBOOT_HTTP_TIMEOUT_SECONDS", "10"))
+HTTP_CONNECT_TIMEOUT_SECONDS = float(os.environ.get("PREDICTIBOOT_HTTP_CONNECT_TIMEOUT_SECONDS", "5"))
+HTTP_MAX_CONNECTIONS = int(os.environ.get("PREDICTIBOOT_HTTP_MAX_CONNECTIONS", "100"))
+HTTP_MAX_KEEPALIVE_CONNECTIONS = int(os.environ.get("PREDICTIBOOT_HTTP_MAX_KEEPALIVE_CONNECTIONS", "20"))
+# 호스트별 동시 요청 수 / KRX(pykrx) 동시 호출 수
+HTTP_PER_HOST_CONCURRENCY = int(os.environ.get("PREDICTIBOOT_HTTP_PER_HOST_CONCURRENCY", "8"))
+KRX_CONCURRENCY = int(os.environ.get("PREDICTIBOOT_KRX_CONCURRENCY", "4"))
+
+# --- 로컬 OHLCV 저장소 ---
+OHLCV_STORE_DIR = os.environ.get("PREDICTIBOOT_OHLCV_STORE_DIR", os.path.join(DATA_DIR, "ohlcv"))
+# 처음 동기화할 때 받아 두는 최소 이력 (이보다 짧은 기간 요청은 잘라서 응답)
+OHLCV_STORE_MIN_YEARS = int(os.environ.get("PREDICTIBOOT_OHLCV_STORE_MIN_YEARS", "5"))
+# 마지막 동기화 후 이 시간(초) 안의 요청은 업스트림 확인 없이 저장소에서 응답
+OHLCV_STORE_SYNC_TTL_SECONDS = int(os.environ.get("PREDICTIBOOT_OHLCV_STORE_SYNC_TTL_SECONDS", "300"))
+# 메모리에 들고 있는 최근 파티션 수 (파일이 바뀌면 다시 읽음)
+OHLCV_STORE_MEMORY_ENTRIES = int(os.environ.get("PREDICTIBOOT_OHLCV_STORE_MEMORY_ENTRIES", "256"))
+
+# --- 종목 검색 인덱스 ---
+TICKER_INDEX_DIR = os.environ.get("PREDICTIBOOT_TICKER_INDEX_DIR", os.path.join(DATA_DIR, "tickers"))
+# 인덱스를 새로 만들지 못했을 때 이전 인덱스로 응답하며 다시 시도하기까지 기다리는 시간(초)
+TICKER_INDEX_RETRY_SECONDS = float(os.environ.get("PREDICTIBOOT_TICKER_INDEX_RETRY_SECONDS", "600"))
+
+# --- 장중 분봉 ---
+# 당일 분봉을 재사용하는 시간(초)이자 실시간 구독 종목의 업스트림 조회 간격
+INTRADAY_POLL_SECONDS = float(os.environ.get("PREDICTIBOOT_INTRADAY_POLL_SECONDS", "60"))
+# 메모리에 보관하는 (종목, 날짜) 분봉 묶음 수
+INTRADAY_CACHE_MAX_DAYS = int(os.environ.get("PREDICTIBOOT_INTRADAY_CACHE_MAX_DAYS", "256"))
+
+# --- 뉴스 수집 ---
+NEWS_MAX_LIST_PAGES = int(os.environ.get("PREDICTIBOOT_NEWS_MAX_LIST_PAGES", "3"))
+NEWS_BODY_CONCURRENCY = int(os.environ.get("PREDICTIBOOT_NEWS_BODY_CONCURRENCY", "8"))
+
+# --- 뉴스 캐시 ---
+NEWS_CACHE_PATH = os.environ.get("PREDICTIBOOT_NEWS_CACHE_PATH", os.path.join(DATA_DIR, "news.sqlite3"))
+NEWS_ARTICLE_TTL_SECONDS = int(os.environ.get("PREDICTIBOOT_NEWS_ARTICLE_TTL_SECONDS", str(30 * 24 * 3600)))
+NEWS_LIST_TTL_SECONDS = int(os.environ.get("PREDICTIBOOT_NEWS_LIST_TTL_SECONDS", "300"))
+
+# --- LLM 분석 ---
+LLM_MODEL = os.environ.get("PREDICTIBOOT_LLM_MODEL", "gpt-3.5-turbo")
+# OpenAI 호환 서버(로컬 테스트 서버 등)를 쓰려면 지정. 비워 두면 OpenAI 기본 주소 사용
+LLM_BASE_URL = os.environ.get("PREDICTIBOOT_LLM_BASE_URL") or None
+LLM_TIMEOUT_SECONDS = float(os.environ.get("PREDICTIBOOT_LLM_TIMEOUT_SECONDS", "60"))
+LLM_CACHE_PATH = os.environ.get("PREDICTIBOOT_LLM_CACHE_PATH", os.path.join(DATA_DIR, "llm_cache.sqlite3"))
+# 같은 입력(종목, 예측 결과, 뉴스 묶음)에 대한 분석 결과를 재사용하는 시간(초). 0이면 캐시 사용 안 함
+LLM_CACHE_TTL_SECONDS = int(os.environ.get("PREDICTIBOOT_LLM_CACHE_TTL_SECONDS", str(6 * 3600)))
+
+# --- 기술적 지표 저장소 ---
+FEATURE_STORE_DIR = os.environ.get("PREDICTIBOOT_FEATURE_STORE_DIR", os.path.join(DATA_DIR, "features"))
+
+# --- 로깅 ---
+LOG_LEVEL = os.environ.get("PREDICTIBOOT_LOG_LEVEL", "INFO").upper()
+
+# --- 시작 시 엔진 워밍업 ---
+# 서버 시작 후 백그라운드에서 미리 불러올 무거운 의존성 (쉼표로 구분, 비워 두면 처음 사용할 때만 불러옴)
+# predictor(TensorFlow/XGBoost), pykrx, bs4, yfinance
+WARMUP_ENGINES = [
+    name.strip() for name in os.environ.get("PREDICTIBOOT_WARMUP_ENGINES", "predictor,pykrx,bs4").split(",")
+    if name.strip()
+]
+
+# --- 장 마감 후 예측 미리 계산 ---
+# 관심 종목(쉼표로 구분)과 지수 유니버스(KOSPI200, KOSPI100, KOSPI50, KOSDAQ150). 둘 다 비워 두면 스케줄러를 끔
+PRECOMPUTE_CODES = [
+    code.strip() for code in os.environ.get("PREDICTIBOOT_PRECOMPUTE_CODES", "").split(",") if code.strip()
+]
+PRECOMPUTE_UNIVERSE = os.environ.get("PREDICTIBOOT_PRECOMPUTE_UNIVERSE", "").strip() or None
+# 미리 계산할 데이터 기간(년, 쉼표로 구분)
+PRECOMPUTE_YEARS = [
+    int(years) for years in os.environ.get("PREDICTIBOOT_PRECOMPUTE_YEARS", "1").split(",") if years.strip()
+]
+# 평일 이 시각(KST, HH:MM) 이후 한 번 실행. 서버가 이 시각 이후에 시작되면 바로 한 번 실행
+PRECOMPUTE_TIME = os.environ.get("PREDICTIBOOT_PRECOMPUTE_TIME", "16:00")
+PREDICTION_STORE_PATH = os.environ.get("PREDICTIBOOT_PREDICTION_STORE_PATH", os.path.join(DATA_DIR, "predictions.sqlite3"))
+PREDICTION_STORE_RETENTION_DAYS = int(os.environ.get("PREDICTIBOOT_PREDICTION_STORE_RETENTION_DAYS", "30"))
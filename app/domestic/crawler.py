@@ -1,164 +1,303 @@
-import requests
-from bs4 import BeautifulSoup
+import logging
+import asyncio
 import pandas as pd
 import time
-from selenium import webdriver
-from selenium.webdriver.common.by import By
-from selenium.webdriver.support.ui import WebDriverWait
-from selenium.webdriver.support import expected_conditions as EC
-from selenium.common.exceptions import TimeoutException
-import datetime # Added for date filtering
-from pykrx import stock # Added for intraday data
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlsplit, parse_qs
+from .ohlcv_store import ohlcv_store
+from .ticker_index import ticker_index
+from .news_cache import news_cache, content_hash
+from ..http_client import fetch_text, get_text, run_krx
+from ..timing import stage
+from ..engines import load_engine
+from ..config import NEWS_MAX_LIST_PAGES, NEWS_BODY_CONCURRENCY
+
+logger = logging.getLogger(__name__)
+
+def _soup(html: str):
+    # bs4는 처음 파싱할 때 불러옵니다. (서버 시작 시간 단축)
+    return load_engine("bs4").BeautifulSoup(html, 'lxml')
+
+def _parse_stock_name(html: str) -> str:
+    soup = _soup(html)
+    company_wrap = soup.find('div', class_='wrap_company')
+    if company_wrap:
+        name_tag = company_wrap.find('a')
+        if name_tag:
+            return name_tag.text
+    return "알 수 없는 종목"
+
+def _lookup_indexed_name(code: str):
+    try:
+        return ticker_index.get_name(code)
+    except Exception:
+        return None
 
 def get_stock_name(code: str) -> str:
-    # ... (This function remains unchanged) ...
+    """종목 인덱스에서 이름을 찾고, 인덱스에 없을 때만 네이버 금융 페이지를 조회합니다."""
+    name = _lookup_indexed_name(code)
+    if name:
+        return name
     try:
-        url = f"https://finance.naver.com/item/main.nhn?code={code}"
-        headers = {'User-Agent': 'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/108.0.0.0 Safari/537.36'}
-        response = requests.get(url, headers=headers)
-        response.raise_for_status()
-        soup = BeautifulSoup(response.text, 'lxml')
-        company_wrap = soup.find('div', class_='wrap_company')
-        if company_wrap:
-            name_tag = company_wrap.find('a')
-            if name_tag:
-                return name_tag.text
+        return _parse_stock_name(get_text(f"https://finance.naver.com/item/main.nhn?code={code}"))
+    except Exception:
         return "알 수 없는 종목"
+
+async def get_stock_name_async(code: str) -> str:
+    """get_stock_name의 비동기 버전 (공용 연결 풀 사용)"""
+    name = await asyncio.to_thread(_lookup_indexed_name, code)
+    if name:
+        return name
+    try:
+        return _parse_stock_name(await fetch_text(f"https://finance.naver.com/item/main.nhn?code={code}"))
     except Exception:
         return "알 수 없는 종목"
 
-def get_historical_data(code: str, years: int = 1):
+def get_historical_frame(code: str, years: int = 1):
     """
     pykrx를 사용하여 특정 종목의 과거 시세 데이터를 가져옵니다.
     네이버 금융 페이징 방식 대신 날짜 범위 지정 방식으로 변경하여 정확성을 높입니다.
+    로컬 OHLCV 저장소를 거치므로 업스트림에서는 마지막 동기화 이후의 구간만 받아 옵니다.
+    행마다 딕셔너리를 만들지 않고 저장소의 데이터프레임(날짜 인덱스, OHLCV_COLUMNS)을 그대로 반환하며,
+    실패하면 에러 딕셔너리를 반환합니다.
     """
     try:
-        today = datetime.datetime.now()
-        start_date = today - datetime.timedelta(days=years * 365)
-        
-        # pykrx는 YYYYMMDD 형식의 날짜를 사용합니다.
-        today_str = today.strftime('%Y%m%d')
-        start_date_str = start_date.strftime('%Y%m%d')
+        df = ohlcv_store.get(code, years)
+        logger.debug("Loaded %d records for %s from the OHLCV store.", len(df), code)
+        return df
+    except Exception as e:
+        logger.warning("An error occurred in get_historical_frame with pykrx: %s", e)
+        return {"error": f"An unexpected error occurred with pykrx: {e}"}
 
-        print(f"DEBUG: Fetching historical data for {code} from {start_date_str} to {today_str} using pykrx.")
-        
-        df = stock.get_market_ohlcv(start_date_str, today_str, code)
-        
-        if df.empty:
-            print(f"DEBUG: No historical data found for {code} in the given range.")
-            return []
+# 배치 예측에서 이름으로 지정할 수 있는 지수 유니버스 (pykrx 지수 티커)
+INDEX_UNIVERSES = {
+    'KOSPI200': '1028',
+    'KOSPI100': '1034',
+    'KOSPI50': '1035',
+    'KOSDAQ150': '2203',
+}
 
-        # 데이터프레임을 기존 형식(list of dicts)으로 변환
-        df = df.reset_index() # '날짜' 컬럼을 인덱스에서 컬럼으로 변환
-        df = df.rename(columns={
-            '날짜': 'date', '종가': 'closing_price', '시가': 'opening_price',
-            '고가': 'high_price', '저가': 'low_price', '거래량': 'volume', '등락률': 'change'
-        })
-        # 날짜 형식을 'YYYY.MM.DD'로 변경
-        df['date'] = df['date'].dt.strftime('%Y.%m.%d')
-        
-        # '전일비' 컬럼은 predictor에서 사용하지 않으므로 'change' 컬럼(등락률)을 그대로 둠
-        
-        # 필요한 컬럼만 선택
-        df = df[['date', 'closing_price', 'change', 'opening_price', 'high_price', 'low_price', 'volume']]
+def get_index_constituents(universe: str) -> list:
+    """
+    지수 유니버스 이름(예: 'KOSPI200')으로 구성 종목 코드 리스트를 가져옵니다.
+    """
+    index_ticker = INDEX_UNIVERSES.get(universe.upper())
+    if index_ticker is None:
+        raise ValueError(f"Unknown universe: '{universe}'. Available: {', '.join(INDEX_UNIVERSES)}")
+    with stage("krx_fetch"):
+        return list(load_engine("pykrx").get_index_portfolio_deposit_file(index_ticker))
 
-        print(f"DEBUG: Successfully fetched {len(df)} records using pykrx.")
-        # 데이터를 역순으로 정렬 (최신 날짜가 위로 오도록)
-        return df.sort_values(by='date', ascending=True).to_dict(orient='records')
+async def get_historical_frame_async(code: str, years: int = 1):
+    """get_historical_frame의 비동기 버전 (pykrx 호출을 스레드에서 실행)"""
+    return await run_krx(get_historical_frame, code, years)
 
-    except Exception as e:
-        print(f"DEBUG: An error occurred in get_historical_data with pykrx: {e}")
-        return {"error": f"An unexpected error occurred with pykrx: {e}"}
+def _parse_article_content(html: str):
+    """기사 페이지 HTML에서 본문을 추출합니다. 본문을 찾지 못하면 None을 반환합니다."""
+    article_soup = _soup(html)
+    
+    # 네이버 금융 뉴스 본문 선택자 (실제 구조에 따라 변경될 수 있음)
+    content_tag = article_soup.find('div', id='newsct_article')
+    if content_tag:
+        return content_tag.get_text(strip=True, separator='\n')
+    # 다른 가능한 선택자 시도
+    content_tag = article_soup.find('div', id='articeBody')
+    if content_tag:
+        return content_tag.get_text(strip=True, separator='\n')
+    return None
 
-def get_stock_news(code: str, limit: int = 5):
+def _news_list_url(code: str, page: int) -> str:
+    # 종목 뉴스 페이지(news.naver)가 iframe('news_frame')으로 불러오는 목록 페이지
+    return f"https://finance.naver.com/item/news_news.naver?code={code}&page={page}&clusterId="
+
+def _news_list_headers(code: str) -> dict:
+    # 목록 페이지는 종목 뉴스 페이지에서 호출된 요청인지 Referer로 확인합니다.
+    return {'Referer': f"https://finance.naver.com/item/news.naver?code={code}"}
+
+def _parse_news_list(html: str) -> list:
+    """뉴스 목록 페이지에서 기사(제목, 링크, 출처, 날짜)를 추출합니다."""
+    soup = _soup(html)
+    news_table = soup.find('table', class_='type5')
+    if not news_table:
+        return None
+
+    news_list = []
+    for row in news_table.find_all('tr'):
+        title_tag = row.find('a', class_='tit')
+        info_tag = row.find('td', class_='info')
+        date_tag = row.find('td', class_='date')
+
+        if title_tag and info_tag and date_tag:
+            title = title_tag.text.strip()
+            if not title:
+                continue
+            
+            link = title_tag['href']
+            if not link.startswith('http'):
+                link = "https://finance.naver.com" + link
+            
+            source = info_tag.text.strip()
+            date = date_tag.text.strip()
+
+            news_list.append({"title": title, "link": link, "source": source, "date": date})
+    return news_list
+
+def _unique_news_count(pages: list) -> int:
+    return len({news["link"] for page in pages if page for news in page})
+
+def _collect_news_pages(pages: list):
+    """
+    여러 목록 페이지의 기사를 링크 기준으로 중복 제거하여 모두 모읍니다.
+    (본문이 같은 기사를 빼고도 limit개를 채울 수 있도록 여기서는 자르지 않습니다.)
+    """
+    if pages and pages[0] is None:
+        return {"error": "Could not find the news table in the news list page."}
+    news_list, seen = [], set()
+    for page in pages:
+        for news in page or []:
+            if news["link"] not in seen:
+                seen.add(news["link"])
+                news_list.append(news)
+    if not news_list:
+        return {"error": "News table was found, but no articles could be parsed."}
+    return news_list
+
+def _article_fetch_url(link: str) -> str:
     """
-    네이버 금융에서 최신 종목 뉴스를 크롤링합니다. (Selenium과 Iframe 핸들링 사용)
-    이제 기사 본문도 함께 수집합니다.
+    네이버 금융 기사 링크(news_read.naver)는 스크립트로 네이버 뉴스 원문 페이지로 이동하므로,
+    본문은 원문 페이지 주소로 바로 요청합니다.
     """
-    options = webdriver.ChromeOptions()
-    options.add_argument('--headless')
-    options.add_argument('--no-sandbox')
-    options.add_argument('--disable-dev-shm-usage')
-    options.add_argument("user-agent=Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/108.0.0.0 Safari/537.36")
+    query = parse_qs(urlsplit(link).query)
+    if 'article_id' in query and 'office_id' in query:
+        return f"https://n.news.naver.com/mnews/article/{query['office_id'][0]}/{query['article_id'][0]}"
+    return link
+
+def _get_news_page(code: str, page: int):
+    """목록 페이지를 캐시(짧은 TTL)에서 찾고, 없으면 받아서 캐시에 저장합니다."""
+    items = news_cache.get_list(code, page)
+    if items is None:
+        items = _parse_news_list(get_text(_news_list_url(code, page), headers=_news_list_headers(code)))
+        if items is not None:
+            news_cache.put_list(code, page, items)
+    return items
 
-    driver = None
+async def _get_news_page_async(code: str, page: int):
+    # SQLite 캐시 조회/저장은 이벤트 루프를 막지 않도록 스레드에서 실행합니다.
+    items = await asyncio.to_thread(news_cache.get_list, code, page)
+    if items is None:
+        html = await fetch_text(_news_list_url(code, page), headers=_news_list_headers(code))
+        items = _parse_news_list(html)
+        if items is not None:
+            await asyncio.to_thread(news_cache.put_list, code, page, items)
+    return items
+
+def _fetch_article_content(news: dict):
+    """기사 본문을 받아 (본문 또는 None, 오류 메시지 또는 None)을 반환합니다."""
     try:
-        driver = webdriver.Chrome(options=options)
-        url = f"https://finance.naver.com/item/news.naver?code={code}"
-        driver.get(url)
+        return _parse_article_content(get_text(_article_fetch_url(news["link"]))), None
+    except Exception as e:
+        return None, str(e)
 
-        WebDriverWait(driver, 15).until(
-            EC.frame_to_be_available_and_switch_to_it((By.ID, "news_frame"))
-        )
+async def _fetch_article_content_async(news: dict, limit: asyncio.Semaphore):
+    try:
+        async with limit:
+            return _parse_article_content(await fetch_text(_article_fetch_url(news["link"]))), None
+    except Exception as e:
+        return None, str(e)
 
-        WebDriverWait(driver, 15).until(
-            EC.presence_of_element_located((By.CLASS_NAME, 'type5'))
-        )
+def _merge_article_contents(news_list: list, cached: dict, fetched: dict, result: list, seen_hashes: set):
+    """
+    캐시된 본문과 새로 받은 본문을 기사 목록에 채워 result에 추가하고, 새로 받은 본문은 캐시에 저장합니다.
+    여러 매체에 동시 송고되어 본문이 같은 기사(seen_hashes에 있는 본문)는 처음 것만 남깁니다.
+    """
+    for news in news_list:
+        link = news["link"]
+        if link in cached:
+            content, digest = cached[link]["content"], cached[link]["content_hash"]
+        else:
+            content, error = fetched[link]
+            if content is not None:
+                news_cache.put_article(link, news["title"], news["source"], news["date"], content)
+                digest = content_hash(content)
+            else:
+                content = f"본문 수집 중 오류 발생: {error}" if error else "본문 수집에 실패했습니다."
+                digest = None
 
-        soup = BeautifulSoup(driver.page_source, 'lxml')
-        news_table = soup.find('table', class_='type5')
-        
-        if not news_table:
-            return {"error": "Switched to iframe, but still could not find the news table."}
+        if digest is not None:
+            if digest in seen_hashes:
+                continue
+            seen_hashes.add(digest)
+        result.append(dict(news, content=content))
 
-        news_list = []
-        headers = {'User-Agent': 'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/108.0.0.0 Safari/537.36'}
+def _next_news_batch(candidates: list, result: list, limit: int):
+    """아직 채우지 못한 개수만큼 다음 후보 기사를 (이번 묶음, 남은 후보)로 나눕니다."""
+    needed = limit - len(result)
+    return candidates[:needed], candidates[needed:]
 
-        for row in news_table.find_all('tr'):
-            if len(news_list) >= limit:
+def get_stock_news(code: str, limit: int = 5):
+    """
+    네이버 금융에서 최신 종목 뉴스를 크롤링합니다.
+    브라우저 없이 뉴스 iframe의 목록 페이지를 HTTP로 직접 받아 파싱하며, 기사 본문도 함께 수집합니다.
+    목록과 본문은 로컬 캐시를 거치므로 캐시에 없는 새 기사만 업스트림에서 받습니다.
+    """
+    try:
+        pages = []
+        for page in range(1, NEWS_MAX_LIST_PAGES + 1):
+            pages.append(_get_news_page(code, page))
+            if pages[-1] is None or _unique_news_count(pages) >= limit:
                 break
-            
-            title_tag = row.find('a', class_='tit')
-            info_tag = row.find('td', class_='info')
-            date_tag = row.find('td', class_='date')
-
-            if title_tag and info_tag and date_tag:
-                title = title_tag.text.strip()
-                if not title:
-                    continue
-                
-                link = title_tag['href']
-                if not link.startswith('http'):
-                    link = "https://finance.naver.com" + link
-                
-                source = info_tag.text.strip()
-                date = date_tag.text.strip()
-                
-                # --- 기사 본문 수집 로직 추가 ---
-                content = "본문 수집에 실패했습니다."
-                try:
-                    article_response = requests.get(link, headers=headers, timeout=5)
-                    article_response.raise_for_status()
-                    article_soup = BeautifulSoup(article_response.text, 'lxml')
-                    
-                    # 네이버 금융 뉴스 본문 선택자 (실제 구조에 따라 변경될 수 있음)
-                    content_tag = article_soup.find('div', id='newsct_article')
-                    if content_tag:
-                        content = content_tag.get_text(strip=True, separator='\n')
-                    else:
-                        # 다른 가능한 선택자 시도
-                        content_tag = article_soup.find('div', id='articeBody')
-                        if content_tag:
-                            content = content_tag.get_text(strip=True, separator='\n')
-
-                except Exception as e:
-                    content = f"본문 수집 중 오류 발생: {e}"
-                # ---------------------------------
-
-                news_list.append({"title": title, "link": link, "source": source, "date": date, "content": content})
-        
-        if not news_list:
-            return {"error": "News table was found, but no articles could be parsed."}
-        
-        return news_list
+    except Exception as e:
+        return {"error": f"An unexpected error occurred while fetching the news list: {e}"}
+
+    candidates = _collect_news_pages(pages)
+    if isinstance(candidates, dict):
+        return candidates
 
-    except TimeoutException:
-        return {"error": "A component (iframe 'news_frame' or table 'type5') was not found in time."}
+    # 본문이 같은 기사를 빼면서 limit개가 찰 때까지 모자란 만큼씩 다음 후보의 본문을 채웁니다.
+    result, seen_hashes = [], set()
+    with ThreadPoolExecutor(max_workers=NEWS_BODY_CONCURRENCY) as pool:
+        while candidates and len(result) < limit:
+            news_list, candidates = _next_news_batch(candidates, result, limit)
+            cached = news_cache.get_articles([news["link"] for news in news_list])
+            missing = [news for news in news_list if news["link"] not in cached]
+            fetched = dict(zip([news["link"] for news in missing], pool.map(_fetch_article_content, missing)))
+            _merge_article_contents(news_list, cached, fetched, result, seen_hashes)
+    return result
+
+async def get_stock_news_async(code: str, limit: int = 5):
+    """
+    get_stock_news의 비동기 버전. 목록 페이지를 받은 뒤 캐시에 없는 본문들만 공용 연결 풀로 동시에 수집합니다.
+    (동시 요청 수는 NEWS_BODY_CONCURRENCY로 제한)
+    """
+    try:
+        pages = []
+        for page in range(1, NEWS_MAX_LIST_PAGES + 1):
+            pages.append(await _get_news_page_async(code, page))
+            if pages[-1] is None or _unique_news_count(pages) >= limit:
+                break
     except Exception as e:
-        return {"error": f"An unexpected error occurred with Selenium: {e}"}
-    finally:
-        if driver:
-            driver.quit()
+        return {"error": f"An unexpected error occurred while fetching the news list: {e}"}
+
+    candidates = _collect_news_pages(pages)
+    if isinstance(candidates, dict):
+        return candidates
+
+    result, seen_hashes = [], set()
+    body_limit = asyncio.Semaphore(NEWS_BODY_CONCURRENCY)
+    while candidates and len(result) < limit:
+        news_list, candidates = _next_news_batch(candidates, result, limit)
+        cached = await asyncio.to_thread(news_cache.get_articles, [news["link"] for news in news_list])
+        missing = [news for news in news_list if news["link"] not in cached]
+        contents = await asyncio.gather(*[_fetch_article_content_async(news, body_limit) for news in missing])
+        fetched = dict(zip([news["link"] for news in missing], contents))
+        # 새로 받은 본문을 캐시에 저장하므로 스레드에서 실행합니다.
+        await asyncio.to_thread(_merge_article_contents, news_list, cached, fetched, result, seen_hashes)
+    return result
+
+async def get_intraday_data_async(code: str, date_str: str):
+    """get_intraday_data의 비동기 버전 (pykrx 호출을 스레드에서 실행)"""
+    return await run_krx(get_intraday_data, code, date_str)
+
+INTRADAY_COLUMNS = ['time', 'opening_price', 'high_price', 'low_price', 'closing_price', 'volume']
 
 def get_intraday_data(code: str, date_str: str):
     """
@@ -167,13 +306,14 @@ def get_intraday_data(code: str, date_str: str):
         code: 종목 코드 (예: '005930')
         date_str: 날짜 문자열 (YYYYMMDD 형식)
     Returns:
-        분봉 데이터 리스트 (시간, 시가, 고가, 저가, 종가, 거래량)
+        분봉 데이터프레임 (INTRADAY_COLUMNS: 시간, 시가, 고가, 저가, 종가, 거래량)
+        행마다 dict를 만들지 않도록 데이터프레임 그대로 반환하며, 기존 records 형식이 필요한 곳에서만 변환합니다.
     """
     try:
-        print(f"DEBUG: get_intraday_data called for code: {code}, date: {date_str}")
+        logger.debug("get_intraday_data called for code: %s, date: %s", code, date_str)
         # pykrx는 'YYYYMMDD' 형식의 날짜를 받음
         try:
-            print(f"DEBUG: Calling pykrx.stock.get_market_ohlcv with date_str: {date_str}, code: {code}")
+            logger.debug("Calling pykrx.stock.get_market_ohlcv with date_str: %s, code: %s", date_str, code)
             # df = stock.get_market_ohlcv(date_str, date_str, code, interval="1m")
             # df = stock.get_market_ohlcv(date_str, date_str, code)
             # df = stock.get_market_ohlcv_by_time(
@@ -182,16 +322,16 @@ def get_intraday_data(code: str, date_str: str):
             #     code,
             #     interval="1m"  # 1분봉
             # )
-            df = stock.get_market_ohlcv(date_str, date_str, code, "m")
-            print(df)
-            print(f"DEBUG: pykrx call returned. df.empty: {df.empty}, df.shape: {df.shape if not df.empty else 'N/A'}")
+            with stage("krx_fetch"):
+                df = load_engine("pykrx").get_market_ohlcv(date_str, date_str, code, "m")
+            logger.debug("pykrx call returned. df.empty: %s, df.shape: %s", df.empty, df.shape)
         except Exception as e:
-            print(f"DEBUG: pykrx call failed: {e}")
+            logger.warning("pykrx call failed: %s", e)
             return {"error": f"Failed to fetch data: {e}"}
         
         if df.empty:
-            print(f"DEBUG: DataFrame is empty for code: {code}, date: {date_str}")
-            return []
+            logger.debug("DataFrame is empty for code: %s, date: %s", code, date_str)
+            return pd.DataFrame(columns=INTRADAY_COLUMNS)
 
         # 인덱스(시간)를 문자열로 변환하고 필요한 컬럼만 선택
         df['time'] = df.index.strftime('%H:%M')
@@ -200,10 +340,10 @@ def get_intraday_data(code: str, date_str: str):
             '종가': 'closing_price', '거래량': 'volume'
         })
         
-        # 필요한 컬럼만 선택하여 리스트로 반환
-        result = df[['time', 'opening_price', 'high_price', 'low_price', 'closing_price', 'volume']].to_dict(orient='records')
-        print(f"DEBUG: Successfully processed {len(result)} intraday records.")
+        # 필요한 컬럼만 선택하여 반환
+        result = df[INTRADAY_COLUMNS].reset_index(drop=True)
+        logger.debug("Successfully processed %d intraday records.", len(result))
         return result
     except Exception as e:
-        print(f"DEBUG: Error in get_intraday_data: {e}") # ADDED FOR DEBUGGING
+        logger.warning("Error in get_intraday_data: %s", e)
         return {"error": f"Failed to fetch intraday data: {e}"}
@@ -0,0 +1,161 @@
+import os
+import logging
+import threading
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from ..config import FEATURE_STORE_DIR, OHLCV_STORE_MIN_YEARS
+from .ohlcv_store import ohlcv_store
+from .ticker_index import ticker_index
+
+logger = logging.getLogger(__name__)
+
+FEATURE_COLUMNS = ['sma5', 'sma20', 'rsi', 'price_change_ratio']
+# 새로 계산하는 첫 행 앞에 필요한 과거 행 수 (가장 긴 지표 창인 sma20 기준)
+_WARMUP_ROWS = 20
+# 파티션 읽기/쓰기 스레드 수 (pyarrow는 인코딩/디코딩 중 GIL을 놓으므로 전 종목 갱신 시 I/O를 겹쳐 실행)
+_IO_WORKERS = min(8, os.cpu_count() or 1)
+
+
+def compute_panel_features(close: pd.DataFrame) -> dict:
+    """
+    (행=봉 위치, 열=종목) 종가 행렬에서 모든 종목의 기술적 지표를 한 번에 계산합니다.
+    반환값은 {지표 이름: 같은 모양의 DataFrame} 입니다.
+
+    각 열은 종목별 봉 순서대로 아래쪽(최신)에 맞춰 정렬되어 있어야 하며, 위쪽의 빈 칸은 NaN으로 채웁니다.
+    (거래 정지 등으로 종목마다 날짜가 달라도 종목별로 계산한 결과와 같습니다.)
+    """
+    delta = close.diff(1)
+    # 종목별 계산과 같도록 첫 봉의 상승/하락폭은 0으로 두고, 위쪽의 빈 칸만 NaN으로 남깁니다.
+    gain = delta.where(delta > 0, 0).where(close.notna()).rolling(window=14).mean()
+    loss = (-delta.where(delta < 0, 0)).where(close.notna()).rolling(window=14).mean()
+    rs = gain / loss
+    return {
+        'sma5': close.rolling(5).mean(),
+        'sma20': close.rolling(20).mean(),
+        'rsi': 100 - (100 / (1 + rs)),
+        'price_change_ratio': close / close.shift(1) - 1,
+    }
+
+
+def _bottom_aligned(series_by_code: dict) -> pd.DataFrame:
+    """종목별 종가 배열들을 마지막 봉 기준으로 맞춘 (최대 길이 x 종목 수) 행렬로 만듭니다."""
+    length = max(len(values) for values in series_by_code.values())
+    matrix = np.full((length, len(series_by_code)), np.nan)
+    for i, values in enumerate(series_by_code.values()):
+        if len(values):
+            matrix[-len(values):, i] = values
+    return pd.DataFrame(matrix, columns=list(series_by_code))
+
+
+class FeatureStore:
+    """
+    종목별 기술적 지표를 로컬 Parquet 파일(종목당 하나의 파티션)로 보관합니다.
+
+    update는 저장된 종가와 새 종가를 비교해 처음 달라진 봉(새 봉, 장중에 바뀐 마지막 봉, 수정주가 반영 등)부터만
+    다시 계산하며, 여러 종목을 넘기면 필요한 구간을 하나의 행렬로 모아 한 번에 계산합니다.
+    매일 새 봉 하나가 추가되는 경우 종목당 마지막 20여 행만 계산합니다.
+    """
+
+    def __init__(self, root: str):
+        self.root = root
+        self._lock = threading.Lock()
+
+    def _path(self, code: str) -> str:
+        return os.path.join(self.root, f"{code}.parquet")
+
+    def _read(self, code: str):
+        path = self._path(code)
+        if not os.path.exists(path):
+            return None
+        try:
+            return pd.read_parquet(path)
+        except Exception as e:
+            # 읽을 수 없는 파티션은 지우고 처음부터 다시 계산합니다. (남겨 두면 매번 읽기에 실패합니다.)
+            logger.warning("Discarding unreadable feature partition %s: %s", path, e)
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+            return None
+
+    def _write(self, code: str, frame: pd.DataFrame):
+        # 여러 프로세스가 같은 종목을 동시에 저장해도 서로의 임시 파일을 덮어쓰지 않도록 저장마다 이름을 다르게 합니다.
+        os.makedirs(self.root, exist_ok=True)
+        path = self._path(code)
+        temp_path = f"{path}.{uuid.uuid4().hex}.tmp"
+        frame.to_parquet(temp_path)
+        os.replace(temp_path, path)
+
+    def update(self, closes_by_code: dict) -> dict:
+        """
+        {종목 코드: 날짜 인덱스의 종가 Series}를 받아 저장된 지표를 최신 상태로 맞추고,
+        {종목 코드: 날짜 인덱스, 'closing_price' + FEATURE_COLUMNS 컬럼의 DataFrame}을 반환합니다.
+        """
+        codes = list(closes_by_code)
+        with self._lock, ThreadPoolExecutor(max_workers=_IO_WORKERS) as pool:
+            result, pending, tails = {}, {}, {}
+            for code, stored in zip(codes, pool.map(self._read, codes)):
+                closes = closes_by_code[code].dropna().sort_index().astype(float)
+
+                first = 0
+                if stored is not None:
+                    stored_closes = stored['closing_price'].reindex(closes.index).values
+                    changed = np.isnan(stored_closes) | ~np.isclose(stored_closes, closes.values)
+                    if not changed.any():
+                        result[code] = stored
+                        continue
+                    first = int(np.argmax(changed))
+
+                # 처음 달라진 봉 이전의 저장분은 유지 (첫 봉부터 다르면 수정주가 반영 등으로 보고 전부 다시 계산)
+                keep = stored[stored.index < closes.index[first]] if first > 0 else None
+                new_closes = closes.iloc[first:]
+                history = keep['closing_price'].values if keep is not None else np.empty(0)
+                pending[code] = (keep, new_closes)
+                tails[code] = np.concatenate([history[-_WARMUP_ROWS:], new_closes.values])
+
+            if tails:
+                panel = compute_panel_features(_bottom_aligned(tails))
+                panel_values = np.stack([panel[name].to_numpy() for name in FEATURE_COLUMNS], axis=2)
+                columns = ['closing_price'] + FEATURE_COLUMNS
+                for i, (code, (keep, new_closes)) in enumerate(pending.items()):
+                    rows = len(new_closes)
+                    block = np.column_stack([new_closes.values, panel_values[len(panel_values) - rows:, i, :]])
+                    index = new_closes.index
+                    if keep is not None:
+                        block = np.vstack([keep[columns].to_numpy(), block])
+                        index = keep.index.append(index)
+                    result[code] = pd.DataFrame(block, index=index.rename('date'), columns=columns)
+                list(pool.map(lambda code: self._write(code, result[code]), pending))
+            return result
+
+    def get(self, code: str, closes: pd.Series) -> pd.DataFrame:
+        """종가 Series의 날짜에 맞춘 지표 DataFrame(FEATURE_COLUMNS)을 반환합니다. 필요한 구간만 새로 계산합니다."""
+        frame = self.update({code: closes})[code]
+        return frame[FEATURE_COLUMNS].reindex(closes.index)
+
+
+# 시장별로 파티션 디렉토리를 나눕니다. (해외 종목도 같은 예측 모델을 쓰므로 지표를 저장하지만 국내 종목과 섞지 않음)
+FEATURE_MARKETS = ("domestic", "international")
+feature_stores = {market: FeatureStore(os.path.join(FEATURE_STORE_DIR, market)) for market in FEATURE_MARKETS}
+feature_store = feature_stores["domestic"]
+
+
+def build_market_features(codes: list = None, years: int = None) -> int:
+    """
+    로컬 시세 저장소의 종목들(기본값: 검색 인덱스의 전 종목)에 대해 지표를 한 번에 갱신하고 갱신한 종목 수를 반환합니다.
+    (장 마감 후 일괄 실행용)
+    """
+    if codes is None:
+        codes = ticker_index.codes()
+    years = years or OHLCV_STORE_MIN_YEARS
+    closes_by_code = {}
+    for code in codes:
+        try:
+            closes_by_code[code] = ohlcv_store.get(code, years)['closing_price']
+        except Exception as e:
+            logger.warning("Skipping features for %s: %s", code, e)
+    return len(feature_store.update(closes_by_code))
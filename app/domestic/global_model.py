@@ -0,0 +1,389 @@
+import os
+import json
+import time
+import shutil
+import logging
+import datetime
+import threading
+
+import joblib
+import numpy as np
+import pandas as pd
+import xgboost as xgb
+import tensorflow as tf
+from sklearn.linear_model import LinearRegression
+from tensorflow.keras.models import Sequential, load_model
+from tensorflow.keras.layers import LSTM, Dense, Dropout
+from numpy.lib.stride_tricks import sliding_window_view
+
+from .feature_store import compute_panel_features, FEATURE_COLUMNS
+from ..timing import stage
+from ..config import (
+    PREDICTION_HORIZONS, GLOBAL_MODEL_DIR, GLOBAL_MODEL_SAMPLES_PER_CODE, GLOBAL_MODEL_META_DAYS,
+    GLOBAL_MODEL_LSTM_EPOCHS, TRAINING_VALIDATION_FRACTION, LSTM_EARLY_STOPPING_PATIENCE,
+    XGB_MAX_TREES, XGB_EARLY_STOPPING_ROUNDS
+)
+
+logger = logging.getLogger(__name__)
+
+HORIZONS = PREDICTION_HORIZONS
+MAX_HORIZON = max(HORIZONS)
+
+# 정규화 방식이나 모델 구조(예측 기간 포함)가 바뀌면 버전을 올립니다. 버전이 다른 모델은 불러오지 않고 다시 학습해야 합니다.
+GLOBAL_MODEL_VERSION = "global-stacking-v1-h" + "-".join(str(h) for h in HORIZONS)
+
+OHLCV_COLUMNS = ['closing_price', 'opening_price', 'high_price', 'low_price', 'volume']
+WINDOW = 60
+VOLATILITY_WINDOW = 60
+# 지표(sma20, 20일 수익률/거래량 평균)가 모두 채워지기 전의 앞쪽 행은 사용하지 않습니다.
+_WARMUP_ROWS = 21
+_MIN_VOLATILITY = 1e-3
+# 1차 모델 학습 샘플이 이보다 적은 종목은 학습에서 제외
+_MIN_BASE_SAMPLES = 20
+
+# 종목마다 가격 수준과 변동성이 다르므로, 모든 피처를 가격에 대한 비율이나 종목별 변동성(최근 60일 일간 로그 수익률의
+# 표준편차)으로 나눈 값으로 바꿔 한 모델이 전 종목을 함께 학습할 수 있게 합니다. log_volatility는 종목의 변동성
+# 수준 자체를 알려 주는 종목별 스케일 피처입니다. 타깃도 h일 로그 수익률을 변동성 × √h로 나눈 값입니다.
+NORMALIZED_COLUMNS = [
+    'sma5_gap', 'sma20_gap', 'rsi', 'return_1', 'return_5', 'return_20', 'range', 'volume_ratio', 'log_volatility'
+]
+
+
+class GlobalModelUnavailableError(Exception):
+    """공통 모델이 아직 학습되지 않았거나, 현재 설정(버전/예측 기간)과 맞지 않는 경우"""
+
+
+def _ohlcv_frame(frame: pd.DataFrame) -> pd.DataFrame:
+    return frame.sort_index()[OHLCV_COLUMNS].dropna()
+
+
+def _panel_features(df: pd.DataFrame) -> pd.DataFrame:
+    """_create_features와 같은 기술적 지표를 지표 저장소 없이 계산합니다. (학습용)"""
+    panel = compute_panel_features(df[['closing_price']])
+    return pd.DataFrame({name: panel[name]['closing_price'] for name in FEATURE_COLUMNS}, index=df.index)
+
+
+def _normalized_features(df: pd.DataFrame, df_features: pd.DataFrame):
+    """
+    일봉과 기술적 지표(FEATURE_COLUMNS)를 종목에 상관없는 스케일의 피처로 바꿉니다.
+    (정규화 피처 데이터프레임, 종목별 변동성 시리즈)를 반환하며, 앞쪽 _WARMUP_ROWS행을 뺀 나머지에서
+    계산할 수 없는 값(거래 정지일의 0 가격 등)은 중립값인 0으로 채웁니다.
+    """
+    close = df['closing_price']
+    volatility = np.log(close).diff().rolling(VOLATILITY_WINDOW, min_periods=20).std().clip(lower=_MIN_VOLATILITY)
+    log_volume = np.log1p(df['volume'])
+    features = pd.DataFrame({
+        'sma5_gap': (df_features['sma5'] / close - 1) / volatility,
+        'sma20_gap': (df_features['sma20'] / close - 1) / volatility,
+        'rsi': df_features['rsi'] / 100 - 0.5,
+        'return_1': df_features['price_change_ratio'] / volatility,
+        'return_5': np.log(close / close.shift(5)) / (volatility * np.sqrt(5)),
+        'return_20': np.log(close / close.shift(20)) / (volatility * np.sqrt(20)),
+        'range': np.log(df['high_price'] / df['low_price']) / volatility,
+        'volume_ratio': log_volume - log_volume.rolling(20).mean(),
+        'log_volatility': np.log(volatility),
+    }, index=df.index).replace([np.inf, -np.inf], np.nan)
+    return features.iloc[_WARMUP_ROWS:].fillna(0.0), volatility.iloc[_WARMUP_ROWS:]
+
+
+def _windows(values: np.ndarray) -> np.ndarray:
+    """(행, 피처) 배열의 60일 시퀀스 view. j번째 시퀀스는 j ~ j+59 행이며 j+59 행 시점의 예측 입력입니다."""
+    return sliding_window_view(values, WINDOW, axis=0).transpose(0, 2, 1)
+
+
+def _code_samples(frame: pd.DataFrame, samples_per_code: int, rng: np.random.Generator):
+    """
+    한 종목의 학습 샘플을 시점 기준으로 나눕니다. (샘플이 부족하면 None)
+    - meta: 타깃이 있는 마지막 GLOBAL_MODEL_META_DAYS개 시점. 메타 모델 학습과 1차 모델 검증(hold-out)에 사용
+    - train/validation: meta 구간이 시작되기 전에 타깃까지 끝나는 시점. 최대 samples_per_code개를 뽑고 마지막
+      TRAINING_VALIDATION_FRACTION을 조기 종료 검증에 사용
+    각 묶음은 (60일 시퀀스, 정규화 타깃, 기간별 타깃 스케일) 배열입니다.
+    """
+    df = _ohlcv_frame(frame)
+    features, volatility = _normalized_features(df, _panel_features(df))
+    values = features.to_numpy(dtype=np.float32)
+    close = df['closing_price'].iloc[_WARMUP_ROWS:].to_numpy(dtype=np.float64)
+    scales = np.outer(volatility.to_numpy(), np.sqrt(HORIZONS))  # (행, 기간 수)
+    rows = len(values)
+
+    last_target = rows - 1 - MAX_HORIZON
+    meta_start = max(WINDOW - 1, last_target + 1 - GLOBAL_MODEL_META_DAYS)
+    base_positions = np.arange(WINDOW - 1, meta_start - MAX_HORIZON)
+    if last_target + 1 - meta_start < GLOBAL_MODEL_META_DAYS or len(base_positions) < _MIN_BASE_SAMPLES:
+        return None
+    if samples_per_code and len(base_positions) > samples_per_code:
+        base_positions = np.sort(rng.choice(base_positions, samples_per_code, replace=False))
+    validation_rows = int(len(base_positions) * TRAINING_VALIDATION_FRACTION)
+
+    windows = _windows(values)
+
+    def take(positions):
+        targets = np.stack([np.log(close[positions + h] / close[positions]) for h in HORIZONS], axis=1)
+        return windows[positions - WINDOW + 1], (targets / scales[positions]).astype(np.float32), scales[positions]
+
+    return {
+        'train': take(base_positions[:len(base_positions) - validation_rows]),
+        'validation': take(base_positions[len(base_positions) - validation_rows:]),
+        'meta': take(np.arange(meta_start, last_target + 1)),
+        'last_date': df.index[-1],
+    }
+
+
+def _build_global_lstm(feature_count: int) -> Sequential:
+    model = Sequential([
+        LSTM(units=64, return_sequences=True, input_shape=(WINDOW, feature_count)),
+        Dropout(0.2),
+        LSTM(units=32, return_sequences=False),
+        Dropout(0.2),
+        Dense(units=32, activation='relu'),
+        Dense(units=len(HORIZONS))
+    ])
+    model.compile(optimizer='adam', loss='mean_squared_error')
+    return model
+
+
+def _holdout_errors(predicted_z: dict, targets_z: np.ndarray, scales: np.ndarray) -> dict:
+    """
+    메타 구간(1차 모델 학습에 쓰지 않은 마지막 구간)에서 기간별 평균 절대 오차를 가격 대비 %로 계산합니다.
+    naive는 가격이 그대로라고 예측한 경우이며, stacked는 메타 모델이 학습한 구간이므로 참고용입니다.
+    """
+    actual = np.expm1(targets_z * scales)
+    errors = {}
+    for i, h in enumerate(HORIZONS):
+        errors[h] = {name: float(np.mean(np.abs(np.expm1(z[:, i] * scales[:, i]) - actual[:, i])) * 100)
+                     for name, z in predicted_z.items()}
+        errors[h]['naive'] = float(np.mean(np.abs(actual[:, i])) * 100)
+    return errors
+
+
+def train_global_model_from_frames(frames: dict, samples_per_code: int = GLOBAL_MODEL_SAMPLES_PER_CODE,
+                                   progress=None) -> dict:
+    """
+    {종목 코드: 일봉 데이터프레임}으로 전 종목 공통 스태킹 모델(LSTM + XGBoost + 기간별 메타 모델)을 학습해 저장하고
+    메타데이터(학습 종목 수, 샘플 수, hold-out 오차 등)를 반환합니다.
+    progress(비율, 메시지)가 주어지면 단계마다 호출합니다. (작업 취소는 progress 안에서 예외를 던지면 됩니다.)
+    """
+    def report(fraction, message):
+        if progress is not None:
+            progress(fraction, message)
+
+    started = time.time()
+    rng = np.random.default_rng(42)
+    parts = {'train': [], 'validation': [], 'meta': []}
+    used, skipped, last_dates = [], [], []
+    for index, (code, frame) in enumerate(frames.items()):
+        if index % 50 == 0:
+            report(0.3 * index / len(frames), f"학습 샘플 생성 중 ({index}/{len(frames)})")
+        try:
+            samples = _code_samples(frame, samples_per_code, rng)
+        except Exception as e:
+            logger.warning("Skipping %s for the global model: %s", code, e)
+            samples = None
+        if samples is None:
+            skipped.append(code)
+            continue
+        for name in parts:
+            parts[name].append(samples[name])
+        used.append(code)
+        last_dates.append(samples['last_date'])
+    if not used:
+        raise ValueError("Not enough historical data to train the global model.")
+
+    x_train, y_train, _ = (np.concatenate(arrays) for arrays in zip(*parts['train']))
+    x_val, y_val, _ = (np.concatenate(arrays) for arrays in zip(*parts['validation']))
+    x_meta, y_meta, meta_scales = (np.concatenate(arrays) for arrays in zip(*parts['meta']))
+    has_validation = len(x_val) > 0
+
+    report(0.3, f"LSTM 학습 중 ({len(used)}종목, 샘플 {len(x_train)}개)")
+    tf.keras.utils.set_random_seed(42)
+    lstm_model = _build_global_lstm(x_train.shape[2])
+    callbacks = [tf.keras.callbacks.EarlyStopping(
+        monitor='val_loss', patience=LSTM_EARLY_STOPPING_PATIENCE, restore_best_weights=True
+    )] if has_validation else []
+    with stage("global_lstm_train"):
+        history = lstm_model.fit(
+            x_train, y_train, batch_size=256, epochs=GLOBAL_MODEL_LSTM_EPOCHS,
+            validation_data=(x_val, y_val) if has_validation else None, callbacks=callbacks, verbose=0
+        )
+
+    report(0.7, "XGBoost 학습 중")
+    # XGBoost는 시퀀스의 마지막 행(예측 시점의 피처)만 사용합니다.
+    xgb_params = dict(
+        objective='reg:squarederror', n_estimators=XGB_MAX_TREES, learning_rate=0.05, max_depth=6,
+        tree_method='hist', random_state=42,
+    )
+    fit_kwargs = {}
+    if has_validation:
+        xgb_params['early_stopping_rounds'] = XGB_EARLY_STOPPING_ROUNDS
+        fit_kwargs['eval_set'] = [(x_val[:, -1, :], y_val)]
+    with stage("global_xgb_train"):
+        xgb_model = xgb.XGBRegressor(**xgb_params)
+        xgb_model.fit(x_train[:, -1, :], y_train, verbose=False, **fit_kwargs)
+
+    report(0.9, "메타 모델 학습 중")
+    lstm_meta = lstm_model.predict(x_meta, batch_size=1024, verbose=0)
+    xgb_meta = np.asarray(xgb_model.predict(x_meta[:, -1, :])).reshape(len(x_meta), len(HORIZONS))
+    meta_models = {}
+    for i, h in enumerate(HORIZONS):
+        meta_models[h] = LinearRegression().fit(np.c_[lstm_meta[:, i], xgb_meta[:, i]], y_meta[:, i])
+    stacked_meta = np.stack([
+        meta_models[h].predict(np.c_[lstm_meta[:, i], xgb_meta[:, i]]) for i, h in enumerate(HORIZONS)
+    ], axis=1)
+
+    metadata = {
+        'version': GLOBAL_MODEL_VERSION,
+        'trained_at': datetime.datetime.now().isoformat(timespec='seconds'),
+        'last_date': max(last_dates).strftime('%Y-%m-%d'),
+        'codes': len(used),
+        'skipped_codes': len(skipped),
+        'samples': {'train': len(x_train), 'validation': len(x_val), 'meta': len(x_meta)},
+        'lstm_epochs': len(history.epoch),
+        'xgb_trees': int(xgb_model.best_iteration + 1) if has_validation
+        else int(xgb_model.get_booster().num_boosted_rounds()),
+        'holdout_mape_pct': _holdout_errors(
+            {'lstm': lstm_meta, 'xgb': xgb_meta, 'stacked': stacked_meta}, y_meta, meta_scales
+        ),
+        'training_seconds': round(time.time() - started, 1),
+    }
+    report(0.95, "모델 저장 중")
+    global_model_store.save({'lstm_model': lstm_model, 'xgb_model': xgb_model, 'meta_models': meta_models}, metadata)
+    logger.info("Trained global model on %d codes (%d skipped) in %.0fs", len(used), len(skipped),
+                metadata['training_seconds'])
+    return metadata
+
+
+def train_global_model(codes: list, years: int, progress=None) -> dict:
+    """로컬 OHLCV 저장소에서 종목들의 years년 일봉을 읽어(필요하면 동기화) 공통 모델을 학습합니다."""
+    from .ohlcv_store import ohlcv_store
+
+    def report(fraction, message):
+        if progress is not None:
+            progress(fraction, message)
+
+    frames, failed = {}, 0
+    for index, code in enumerate(codes):
+        report(0.4 * index / len(codes), f"{code} 과거 데이터 동기화 중")
+        try:
+            frames[code] = ohlcv_store.get(code, years)
+        except Exception as e:
+            logger.warning("Could not load %s for the global model: %s", code, e)
+            failed += 1
+    metadata = train_global_model_from_frames(
+        frames, progress=lambda fraction, message: report(0.4 + 0.6 * fraction, message)
+    )
+    return dict(metadata, years=years, failed_codes=failed)
+
+
+def predict_with_global_model(df: pd.DataFrame, df_features: pd.DataFrame) -> dict:
+    """
+    저장된 공통 모델로 마지막 봉 이후 예측 기간별 종가를 예측합니다. (학습 없이 추론만 수행)
+    df는 _prepare_dataframe의 일봉, df_features는 _create_features의 결과입니다.
+    반환값은 predict_price_horizons_stacking_hybrid와 같은 {"predictions", "training"} 형식입니다.
+    """
+    with stage("model_load"):
+        models = global_model_store.load()
+    with stage("feature_build"):
+        features, volatility = _normalized_features(df, df_features)
+    if len(features) < WINDOW:
+        raise ValueError(
+            f"Not enough historical data for the global model (requires at least {WINDOW + _WARMUP_ROWS} days)."
+        )
+    window = features.to_numpy(dtype=np.float32)[-WINDOW:][np.newaxis]
+
+    with stage("global_predict"):
+        lstm_z = models['lstm_model'](window, training=False).numpy()[0]
+        xgb_z = np.asarray(models['xgb_model'].predict(window[:, -1, :])).reshape(len(HORIZONS))
+        latest_close, latest_volatility = float(df['closing_price'].iloc[-1]), float(volatility.iloc[-1])
+        predictions = {}
+        for i, h in enumerate(HORIZONS):
+            z = models['meta_models'][h].predict(np.c_[[lstm_z[i]], [xgb_z[i]]])[0]
+            predictions[h] = float(latest_close * np.exp(z * latest_volatility * np.sqrt(h)))
+
+    metadata = models['metadata']
+    return {
+        "predictions": predictions,
+        "training": {"mode": "global", "model_version": metadata['version'], "trained_at": metadata['trained_at'],
+                     "trained_through": metadata['last_date']},
+    }
+
+
+class GlobalModelStore:
+    """
+    학습한 공통 모델을 root 아래 학습 시각별 디렉토리에 저장하고, current.json이 사용할 디렉토리를 가리킵니다.
+    새 모델을 모두 저장한 뒤에 current.json을 원자적으로 바꾸므로, 다른 프로세스는 이전 모델이나 새 모델 중
+    하나를 온전히 읽습니다. 불러온 모델은 current.json이 다른 디렉토리를 가리킬 때까지 메모리에 유지합니다.
+    """
+
+    _CURRENT_FILE = "current.json"
+    _KEEP = 2  # 새 모델로 바뀌는 중에 이전 모델을 읽는 프로세스가 있을 수 있으므로 직전 모델까지 남겨 둡니다.
+
+    def __init__(self, root: str):
+        self.root = root
+        self._lock = threading.Lock()
+        self._loaded = None
+
+    def _current_directory(self):
+        try:
+            with open(os.path.join(self.root, self._CURRENT_FILE), encoding='utf-8') as f:
+                return json.load(f)['directory']
+        except FileNotFoundError:
+            return None
+
+    def metadata(self):
+        """현재 모델의 메타데이터. 학습된 모델이 없으면 None."""
+        directory = self._current_directory()
+        if directory is None:
+            return None
+        with open(os.path.join(self.root, directory, "metadata.json"), encoding='utf-8') as f:
+            return json.load(f)
+
+    def load(self) -> dict:
+        directory = self._current_directory()
+        if directory is None:
+            raise GlobalModelUnavailableError("No global model has been trained yet.")
+        with self._lock:
+            if self._loaded is None or self._loaded['directory'] != directory:
+                metadata = self.metadata()
+                if metadata['version'] != GLOBAL_MODEL_VERSION:
+                    raise GlobalModelUnavailableError(
+                        f"The global model was trained as {metadata['version']} but {GLOBAL_MODEL_VERSION} is "
+                        f"required; retrain it."
+                    )
+                path = os.path.join(self.root, directory)
+                xgb_model = xgb.XGBRegressor()
+                xgb_model.load_model(os.path.join(path, "xgb.json"))
+                self._loaded = {
+                    'directory': directory, 'metadata': metadata, 'xgb_model': xgb_model,
+                    'lstm_model': load_model(os.path.join(path, "lstm.keras"), compile=False),
+                    'meta_models': joblib.load(os.path.join(path, "meta.joblib")),
+                }
+                logger.info("Loaded global model %s (trained %s)", directory, metadata['trained_at'])
+            return self._loaded
+
+    def save(self, models: dict, metadata: dict) -> str:
+        directory = datetime.datetime.now().strftime('%Y%m%d-%H%M%S')
+        path = os.path.join(self.root, directory)
+        temp_path = os.path.join(self.root, f".{directory}.tmp")
+        shutil.rmtree(temp_path, ignore_errors=True)
+        os.makedirs(temp_path)
+        models['lstm_model'].save(os.path.join(temp_path, "lstm.keras"))
+        models['xgb_model'].save_model(os.path.join(temp_path, "xgb.json"))
+        joblib.dump(models['meta_models'], os.path.join(temp_path, "meta.joblib"))
+        with open(os.path.join(temp_path, "metadata.json"), 'w', encoding='utf-8') as f:
+            json.dump(metadata, f, indent=2, ensure_ascii=False)
+        shutil.rmtree(path, ignore_errors=True)
+        os.replace(temp_path, path)
+
+        current_path = os.path.join(self.root, self._CURRENT_FILE)
+        with open(current_path + ".tmp", 'w', encoding='utf-8') as f:
+            json.dump({'directory': directory}, f)
+        os.replace(current_path + ".tmp", current_path)
+
+        saved = sorted(name for name in os.listdir(self.root) if os.path.isdir(os.path.join(self.root, name))
+                       and not name.startswith('.'))
+        for name in saved[:-self._KEEP]:
+            shutil.rmtree(os.path.join(self.root, name), ignore_errors=True)
+        return directory
+
+
+global_model_store = GlobalModelStore(GLOBAL_MODEL_DIR)
@@ -0,0 +1,130 @@
+import time
+import asyncio
+import logging
+import datetime
+from collections import OrderedDict
+from contextlib import asynccontextmanager
+
+import pytz
+import pandas as pd
+
+from .crawler import get_intraday_data_async
+from ..observability import INTRADAY_SUBSCRIBERS, INTRADAY_POLLERS
+from ..config import INTRADAY_POLL_SECONDS, INTRADAY_CACHE_MAX_DAYS
+
+logger = logging.getLogger(__name__)
+
+_KST = pytz.timezone('Asia/Seoul')
+
+
+def today_kst() -> str:
+    return datetime.datetime.now(_KST).strftime('%Y%m%d')
+
+
+def bars_since(bars: pd.DataFrame, since: str = None) -> pd.DataFrame:
+    """since('HH:MM')를 주면 그 시각 이후의 분봉만 남깁니다."""
+    return bars if since is None else bars[bars['time'] > since]
+
+
+def bars_after(bars: pd.DataFrame, last: dict = None, since: str = None) -> list:
+    """
+    last 이후에 생긴 분봉을 dict 목록으로 반환합니다. 진행 중인 마지막 분봉은 값이 바뀔 수 있으므로
+    시간이 같더라도 값이 달라졌으면 다시 포함합니다. since('HH:MM')를 주면 그 시각까지의 분봉은 제외합니다.
+    (새로 보낼 분봉만 dict로 바꿉니다.)
+    """
+    bars = bars_since(bars, since)
+    if last is not None:
+        bars = bars[bars['time'] >= last['time']]
+    return [bar for bar in bars.to_dict(orient='records') if bar != last]
+
+
+class IntradayFeed:
+    """
+    종목별 당일 분봉을 메모리에 캐시하고, 구독자에게 새 분봉을 전달합니다.
+
+    - 당일 분봉은 poll_seconds 동안 재사용하고, 지난 날짜의 분봉은 바뀌지 않으므로 계속 재사용합니다.
+      (최근 조회한 max_days 개의 (종목, 날짜)만 보관)
+    - 같은 종목을 동시에 조회하면 업스트림(pykrx)에는 한 번만 요청합니다.
+    - 구독자가 있는 종목마다 폴러 하나가 poll_seconds 간격으로 분봉을 갱신하고, 바뀐 분봉 목록을
+      모든 구독자 큐에 넣습니다. 구독자가 모두 떠나면 폴러도 멈춥니다.
+
+    이벤트 루프 안에서만 사용합니다. fetch_fn(code, 'YYYYMMDD')은 분봉 데이터프레임(INTRADAY_COLUMNS) 또는
+    {"error": ...}를 반환하는 코루틴 함수여야 합니다.
+    """
+
+    def __init__(self, fetch_fn, poll_seconds: float, max_days: int):
+        self.fetch_fn = fetch_fn
+        self.poll_seconds = poll_seconds
+        self.max_days = max_days
+        self._bars = OrderedDict()  # (code, date) -> (분봉 데이터프레임, 조회 시각)
+        self._locks = {}
+        self._subscribers = {}  # code -> 구독자 큐 집합
+        self._pollers = {}  # code -> 폴러 태스크
+
+    def _is_fresh(self, date_str: str, fetched_at: float) -> bool:
+        return date_str != today_kst() or time.monotonic() - fetched_at < self.poll_seconds
+
+    async def get_bars(self, code: str, date_str: str, since: str = None):
+        """
+        해당 날짜의 분봉 데이터프레임을 반환합니다. since('HH:MM')를 주면 그 시각 이후의 분봉만 반환합니다.
+        업스트림 조회에 실패하면 {"error": ...}를 반환합니다.
+        """
+        key = (code, date_str)
+        async with self._locks.setdefault(code, asyncio.Lock()):
+            entry = self._bars.get(key)
+            if entry is None or not self._is_fresh(date_str, entry[1]):
+                bars = await self.fetch_fn(code, date_str)
+                if isinstance(bars, dict):
+                    return bars
+                entry = (bars, time.monotonic())
+                self._bars[key] = entry
+                while len(self._bars) > self.max_days:
+                    self._bars.popitem(last=False)
+            self._bars.move_to_end(key)
+        return bars_since(entry[0], since)
+
+    @asynccontextmanager
+    async def subscribe(self, code: str):
+        """
+        종목의 당일 분봉을 받는 큐를 반환합니다. 폴러가 분봉을 갱신할 때마다 전체 데이터프레임이 들어오므로,
+        구독자는 bars_after()로 마지막으로 받은 분봉 이후만 골라 씁니다.
+        """
+        queue = asyncio.Queue()
+        subscribers = self._subscribers.setdefault(code, set())
+        subscribers.add(queue)
+        INTRADAY_SUBSCRIBERS.inc()
+        if code not in self._pollers:
+            self._pollers[code] = asyncio.create_task(self._poll(code))
+            INTRADAY_POLLERS.inc()
+        try:
+            yield queue
+        finally:
+            subscribers.discard(queue)
+            INTRADAY_SUBSCRIBERS.dec()
+            if not subscribers:
+                del self._subscribers[code]
+                self._pollers.pop(code).cancel()
+                INTRADAY_POLLERS.dec()
+
+    async def _poll(self, code: str):
+        last_date, last_bar = None, None
+        while True:
+            date_str = today_kst()
+            bars = await self.get_bars(code, date_str)
+            if isinstance(bars, dict):
+                logger.warning("Intraday poll failed for %s: %s", code, bars["error"])
+            elif not bars.empty and (date_str != last_date or bars.iloc[-1].tolist() != last_bar):
+                last_date, last_bar = date_str, bars.iloc[-1].tolist()
+                for queue in self._subscribers.get(code, ()):
+                    queue.put_nowait(bars)
+            await asyncio.sleep(self.poll_seconds)
+
+    async def close(self):
+        """서버 종료 시 실행 중인 폴러를 모두 멈춥니다."""
+        pollers = list(self._pollers.values())
+        for task in pollers:
+            task.cancel()
+        await asyncio.gather(*pollers, return_exceptions=True)
+
+
+intraday_feed = IntradayFeed(get_intraday_data_async, INTRADAY_POLL_SECONDS, INTRADAY_CACHE_MAX_DAYS)
@@ -0,0 +1,204 @@
+import os
+import logging
+import json
+import time
+import shutil
+import threading
+from contextlib import contextmanager
+from collections import OrderedDict
+
+try:
+    import fcntl
+except ImportError:  # Windows: 프로세스 간 잠금 없이 동작
+    fcntl = None
+
+import joblib
+import xgboost as xgb
+from tensorflow.keras.models import load_model
+
+from ..config import (
+    MODEL_CACHE_DIR, MODEL_CACHE_MAX_ENTRIES, MODEL_CACHE_MAX_BYTES, MODEL_CACHE_MEMORY_ENTRIES
+)
+
+logger = logging.getLogger(__name__)
+
+_INDEX_FILE = "index.json"
+_LOCK_FILE = ".lock"
+_SKLEARN_FILE = "sklearn.joblib"
+
+# 모델 묶음 중 각 라이브러리의 네이티브 형식으로 저장할 항목 (나머지는 joblib으로 저장)
+_LSTM_KEYS = ('lstm_model', 'lstm_meta_model')
+_XGB_KEYS = ('xgb_model', 'xgb_meta_model')
+
+
+def make_model_key(code: str, years: int, last_date, version: str) -> str:
+    """(종목 코드, 조회 기간, 마지막 봉 날짜, 모델 버전)으로 캐시 키를 만듭니다."""
+    return f"{code}-{years}y-{last_date.strftime('%Y%m%d')}-{version}"
+
+
+def _dir_size(path: str) -> int:
+    total = 0
+    for root, _, files in os.walk(path):
+        for name in files:
+            total += os.path.getsize(os.path.join(root, name))
+    return total
+
+
+class ModelRegistry:
+    """
+    학습이 끝난 스태킹 모델(LSTM, XGBoost, 스케일러, 메타 모델)을 로컬 디스크에 보관합니다.
+    디스크 항목은 항목 수/전체 크기 한도를 넘으면 가장 오래 사용되지 않은 것부터 삭제(LRU)되며,
+    최근에 불러온 항목은 메모리에도 유지하여 반복 예측 시 디스크 로딩도 생략합니다.
+    여러 학습 프로세스가 같은 디렉토리를 공유할 수 있도록 인덱스는 파일 잠금 아래에서 매번 다시 읽습니다.
+    """
+
+    def __init__(self, root: str, max_entries: int, max_bytes: int, memory_entries: int):
+        self.root = root
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.memory_entries = memory_entries
+        self._lock = threading.RLock()
+        self._memory = OrderedDict()
+        self._index = {}
+
+    # --- 인덱스 관리 ---
+    def _index_path(self) -> str:
+        return os.path.join(self.root, _INDEX_FILE)
+
+    @contextmanager
+    def _locked(self):
+        """스레드 잠금과 (가능하면) 프로세스 간 파일 잠금을 함께 잡습니다."""
+        with self._lock:
+            if fcntl is None:
+                yield
+                return
+            os.makedirs(self.root, exist_ok=True)
+            with open(os.path.join(self.root, _LOCK_FILE), 'a') as lock_file:
+                fcntl.flock(lock_file, fcntl.LOCK_EX)
+                try:
+                    yield
+                finally:
+                    fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+    def _load_index(self) -> dict:
+        try:
+            with open(self._index_path(), encoding='utf-8') as f:
+                self._index = json.load(f)
+        except (OSError, ValueError):
+            self._index = {}
+        return self._index
+
+    def _save_index(self):
+        os.makedirs(self.root, exist_ok=True)
+        tmp_path = self._index_path() + ".tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(self._index, f, ensure_ascii=False)
+        os.replace(tmp_path, self._index_path())
+
+    # --- 조회 / 저장 ---
+    def load(self, key: str):
+        """캐시된 모델 묶음을 반환합니다. 없으면 None을 반환합니다."""
+        with self._locked():
+            index = self._load_index()
+            entry = index.get(key)
+            if entry is None:
+                return None
+
+            if key in self._memory:
+                self._memory.move_to_end(key)
+                artifacts = self._memory[key]
+            else:
+                entry_dir = os.path.join(self.root, key)
+                try:
+                    artifacts = joblib.load(os.path.join(entry_dir, _SKLEARN_FILE))
+                    for name in _LSTM_KEYS:
+                        path = os.path.join(entry_dir, f"{name}.keras")
+                        if os.path.exists(path):
+                            artifacts[name] = load_model(path)
+                    for name in _XGB_KEYS:
+                        path = os.path.join(entry_dir, f"{name}.json")
+                        if os.path.exists(path):
+                            xgb_model = xgb.XGBRegressor()
+                            xgb_model.load_model(path)
+                            artifacts[name] = xgb_model
+                except Exception as e:
+                    logger.warning("Failed to load cached models for %s: %s", key, e)
+                    self._remove(key)
+                    self._save_index()
+                    return None
+                self._remember(key, artifacts)
+
+            entry['last_access'] = time.time()
+            self._save_index()
+            return artifacts
+
+    def find_latest(self, code: str, years: int, version: str, before=None):
+        """
+        같은 종목/기간/버전의 항목 중 마지막 봉 날짜가 가장 최근인 항목의 (키, 메타데이터)를 반환합니다.
+        before가 주어지면 그 날짜보다 이전 항목만 찾습니다. 없으면 (None, None)을 반환합니다.
+        """
+        before_str = before.strftime('%Y-%m-%d') if before is not None else None
+        with self._locked():
+            candidates = [
+                (entry['last_date'], key) for key, entry in self._load_index().items()
+                if entry.get('code') == code and entry.get('years') == years and entry.get('version') == version
+                and (before_str is None or entry['last_date'] < before_str)
+            ]
+            if not candidates:
+                return None, None
+            _, key = max(candidates)
+            return key, dict(self._index[key])
+
+    def save(self, key: str, artifacts: dict, metadata: dict):
+        """모델 묶음을 디스크에 저장하고 용량 한도에 맞춰 오래된 항목을 정리합니다."""
+        with self._locked():
+            index = self._load_index()
+            entry_dir = os.path.join(self.root, key)
+            tmp_dir = entry_dir + ".tmp"
+            shutil.rmtree(tmp_dir, ignore_errors=True)
+            os.makedirs(tmp_dir)
+
+            sklearn_parts = {k: v for k, v in artifacts.items() if k not in _LSTM_KEYS + _XGB_KEYS}
+            joblib.dump(sklearn_parts, os.path.join(tmp_dir, _SKLEARN_FILE))
+            for name in _LSTM_KEYS:
+                if name in artifacts:
+                    artifacts[name].save(os.path.join(tmp_dir, f"{name}.keras"))
+            for name in _XGB_KEYS:
+                if name in artifacts:
+                    artifacts[name].save_model(os.path.join(tmp_dir, f"{name}.json"))
+
+            shutil.rmtree(entry_dir, ignore_errors=True)
+            os.replace(tmp_dir, entry_dir)
+
+            now = time.time()
+            index[key] = dict(metadata, size=_dir_size(entry_dir), created=now, last_access=now)
+            self._remember(key, artifacts)
+            self._evict()
+            self._save_index()
+
+    # --- 내부 도우미 ---
+    def _remember(self, key: str, artifacts: dict):
+        self._memory[key] = artifacts
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.memory_entries:
+            self._memory.popitem(last=False)
+
+    def _remove(self, key: str):
+        self._index.pop(key, None)
+        self._memory.pop(key, None)
+        shutil.rmtree(os.path.join(self.root, key), ignore_errors=True)
+
+    def _evict(self):
+        index = self._index
+        lru_order = sorted(index, key=lambda k: index[k].get('last_access', 0))
+        total_bytes = sum(entry.get('size', 0) for entry in index.values())
+        while lru_order and (len(index) > self.max_entries or total_bytes > self.max_bytes):
+            oldest = lru_order.pop(0)
+            total_bytes -= index[oldest].get('size', 0)
+            logger.info("Evicting cached models %s", oldest)
+            self._remove(oldest)
+
+
+model_registry = ModelRegistry(
+    MODEL_CACHE_DIR, MODEL_CACHE_MAX_ENTRIES, MODEL_CACHE_MAX_BYTES, MODEL_CACHE_MEMORY_ENTRIES
+)
@@ -0,0 +1,136 @@
+import os
+import json
+import time
+import hashlib
+import sqlite3
+import threading
+from contextlib import contextmanager
+
+from ..config import NEWS_CACHE_PATH, NEWS_ARTICLE_TTL_SECONDS, NEWS_LIST_TTL_SECONDS
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS articles (
+    url TEXT PRIMARY KEY,
+    title TEXT,
+    source TEXT,
+    date TEXT,
+    content TEXT,
+    content_hash TEXT,
+    fetched_at REAL
+);
+CREATE INDEX IF NOT EXISTS idx_articles_fetched_at ON articles (fetched_at);
+CREATE TABLE IF NOT EXISTS news_lists (
+    code TEXT,
+    page INTEGER,
+    items TEXT,
+    fetched_at REAL,
+    PRIMARY KEY (code, page)
+);
+CREATE INDEX IF NOT EXISTS idx_news_lists_fetched_at ON news_lists (fetched_at);
+"""
+
+# 이 횟수만큼 저장할 때마다 만료된 항목을 지워 캐시 파일이 계속 커지지 않게 합니다.
+_PURGE_EVERY_PUTS = 500
+
+
+def content_hash(content: str) -> str:
+    """공백을 제거한 본문의 해시. 여러 매체에 동시 송고된 같은 기사를 찾는 데 사용합니다."""
+    normalized = ''.join(content.split())
+    return hashlib.sha1(normalized.encode('utf-8')).hexdigest()
+
+
+class NewsCache:
+    """
+    뉴스 크롤러용 로컬 캐시(SQLite)입니다.
+    - 기사 URL -> 제목/출처/날짜/본문: 게시된 기사는 바뀌지 않으므로 긴 TTL
+    - (종목 코드, 목록 페이지) -> 기사 목록: 새 기사가 올라오므로 짧은 TTL
+    만료된 항목은 _PURGE_EVERY_PUTS번 저장할 때마다 한 번씩 지웁니다.
+    """
+
+    def __init__(self, path: str, article_ttl: float, list_ttl: float):
+        self.path = path
+        self.article_ttl = article_ttl
+        self.list_ttl = list_ttl
+        self._init_lock = threading.Lock()
+        self._initialized = False
+        self._puts = 0
+        self._puts_lock = threading.Lock()
+
+    @contextmanager
+    def _connect(self):
+        """요청마다 연결을 열고, 끝나면 커밋 후 닫습니다. (스레드 간 연결 공유 없음)"""
+        if not self._initialized:
+            with self._init_lock:
+                if not self._initialized:
+                    os.makedirs(os.path.dirname(self.path), exist_ok=True)
+                    conn = sqlite3.connect(self.path)
+                    try:
+                        conn.execute("PRAGMA journal_mode=WAL")
+                        conn.executescript(_SCHEMA)
+                    finally:
+                        conn.close()
+                    self._initialized = True
+        conn = sqlite3.connect(self.path, timeout=5)
+        try:
+            with conn:
+                yield conn
+        finally:
+            conn.close()
+
+    def get_list(self, code: str, page: int):
+        with self._connect() as conn:
+            row = conn.execute(
+                "SELECT items, fetched_at FROM news_lists WHERE code = ? AND page = ?", (code, page)
+            ).fetchone()
+        if row is None or time.time() - row[1] > self.list_ttl:
+            return None
+        return json.loads(row[0])
+
+    def put_list(self, code: str, page: int, items: list):
+        with self._connect() as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO news_lists (code, page, items, fetched_at) VALUES (?, ?, ?, ?)",
+                (code, page, json.dumps(items, ensure_ascii=False), time.time())
+            )
+        self._count_put()
+
+    def get_articles(self, urls: list) -> dict:
+        """캐시에 있는(만료되지 않은) 기사들을 {url: article} 형태로 반환합니다."""
+        if not urls:
+            return {}
+        placeholders = ','.join('?' * len(urls))
+        with self._connect() as conn:
+            rows = conn.execute(
+                f"SELECT url, title, source, date, content, content_hash, fetched_at FROM articles "
+                f"WHERE url IN ({placeholders})", urls
+            ).fetchall()
+        now = time.time()
+        return {
+            row[0]: {"title": row[1], "source": row[2], "date": row[3], "content": row[4], "content_hash": row[5]}
+            for row in rows if now - row[6] <= self.article_ttl
+        }
+
+    def put_article(self, url: str, title: str, source: str, date: str, content: str):
+        with self._connect() as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO articles (url, title, source, date, content, content_hash, fetched_at) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (url, title, source, date, content, content_hash(content), time.time())
+            )
+        self._count_put()
+
+    def _count_put(self):
+        with self._puts_lock:
+            self._puts += 1
+            due = self._puts % _PURGE_EVERY_PUTS == 0
+        if due:
+            self.purge_expired()
+
+    def purge_expired(self):
+        now = time.time()
+        with self._connect() as conn:
+            conn.execute("DELETE FROM articles WHERE fetched_at < ?", (now - self.article_ttl,))
+            conn.execute("DELETE FROM news_lists WHERE fetched_at < ?", (now - self.list_ttl,))
+
+
+news_cache = NewsCache(NEWS_CACHE_PATH, NEWS_ARTICLE_TTL_SECONDS, NEWS_LIST_TTL_SECONDS)
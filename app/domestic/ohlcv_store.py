@@ -0,0 +1,272 @@
+import os
+import logging
+import json
+import time
+import datetime
+import threading
+import uuid
+from collections import OrderedDict
+from contextlib import ExitStack
+
+import numpy as np
+import pandas as pd
+
+from ..timing import stage
+from ..engines import load_engine
+from ..config import (
+    OHLCV_STORE_DIR, OHLCV_STORE_MIN_YEARS, OHLCV_STORE_SYNC_TTL_SECONDS, OHLCV_STORE_MEMORY_ENTRIES
+)
+
+logger = logging.getLogger(__name__)
+
+OHLCV_COLUMNS = ['closing_price', 'change', 'opening_price', 'high_price', 'low_price', 'volume']
+PRICE_COLUMNS = ['closing_price', 'opening_price', 'high_price', 'low_price']
+# 다시 받은 확정 봉의 가격이 저장된 값과 이 비율 이상 다르면 수정주가가 반영된 것으로 봅니다.
+_ADJUSTMENT_TOLERANCE = 1e-4
+
+
+class OHLCVStore:
+    """
+    종목별 일봉 데이터를 로컬 Parquet 파일(종목당 하나의 파티션)로 보관합니다.
+
+    처음 조회할 때는 min_years 만큼의 이력을 한 번에 받아 두고, 이후에는 마지막 저장일부터 오늘까지의
+    빠진 구간만 업스트림에서 받아 병합합니다. 1/2/3/5년 등 어떤 기간 요청도 저장된 데이터를 잘라서 응답합니다.
+    마지막 봉은 장중에 값이 바뀔 수 있으므로 동기화할 때마다 다시 받습니다.
+    그 앞의 확정된 봉도 함께 다시 받아 저장된 값과 비교하고, 가격이 달라졌으면(액면분할/배당 등으로
+    업스트림의 수정주가가 바뀐 경우) 저장된 이력을 버리고 전체 구간을 다시 받습니다.
+
+    fetch_fn(code, start 'YYYYMMDD', end 'YYYYMMDD')는 날짜 인덱스와 OHLCV_COLUMNS 컬럼을 가진
+    데이터프레임을 반환해야 합니다. 여러 종목을 한 번에 받을 수 있는 업스트림이면
+    fetch_many_fn(codes, start, end) -> {code: DataFrame}도 지정할 수 있습니다. (sync_many에서 사용)
+
+    최근에 읽은 파티션은 memory_entries개까지 메모리에 두되, 파일의 수정 시각/크기가 바뀌었으면
+    (다른 프로세스가 저장한 경우) 다시 읽습니다.
+    """
+
+    def __init__(self, root: str, fetch_fn, min_years: int, sync_ttl_seconds: float, fetch_many_fn=None,
+                 memory_entries: int = OHLCV_STORE_MEMORY_ENTRIES):
+        self.root = root
+        self.fetch_fn = fetch_fn
+        self.fetch_many_fn = fetch_many_fn
+        self.min_years = min_years
+        self.sync_ttl_seconds = sync_ttl_seconds
+        self.memory_entries = memory_entries
+        self._locks = {}
+        self._locks_guard = threading.Lock()
+        self._frames = OrderedDict()  # 최근에 읽은 파티션 (code -> (파일 수정 시각, 크기), DataFrame)
+        self._frames_lock = threading.Lock()
+
+    def _code_lock(self, code: str) -> threading.Lock:
+        with self._locks_guard:
+            return self._locks.setdefault(code, threading.Lock())
+
+    def _paths(self, code: str):
+        return os.path.join(self.root, f"{code}.parquet"), os.path.join(self.root, f"{code}.json")
+
+    def _read(self, code: str):
+        data_path, meta_path = self._paths(code)
+        try:
+            with open(meta_path, encoding='utf-8') as f:
+                meta = json.load(f)
+        except (OSError, ValueError):
+            return None, {}
+        try:
+            signature = _file_signature(data_path)
+        except OSError:
+            return None, meta
+        with self._frames_lock:
+            cached = self._frames.get(code)
+            if cached is not None and cached[0] == signature:
+                self._frames.move_to_end(code)
+                return cached[1], meta
+        frame = pd.read_parquet(data_path)
+        self._remember(code, signature, frame)
+        return frame, meta
+
+    def _remember(self, code: str, signature: tuple, frame: pd.DataFrame):
+        with self._frames_lock:
+            self._frames[code] = (signature, frame)
+            self._frames.move_to_end(code)
+            while len(self._frames) > self.memory_entries:
+                self._frames.popitem(last=False)
+
+    def _write(self, code: str, frame: pd.DataFrame, meta: dict):
+        # 같은 종목을 여러 프로세스(학습 워커, 스케줄러 등)가 동시에 저장해도 서로의 임시 파일을 덮어쓰지 않도록
+        # 임시 파일 이름을 저장마다 다르게 합니다.
+        os.makedirs(self.root, exist_ok=True)
+        data_path, meta_path = self._paths(code)
+        temp_path = f"{data_path}.{uuid.uuid4().hex}.tmp"
+        frame.to_parquet(temp_path)
+        os.replace(temp_path, data_path)
+        temp_path = f"{meta_path}.{uuid.uuid4().hex}.tmp"
+        with open(temp_path, 'w', encoding='utf-8') as f:
+            json.dump(meta, f)
+        os.replace(temp_path, meta_path)
+        self._remember(code, _file_signature(data_path), frame)
+
+    def _window(self, years: int):
+        years = max(years or 0, self.min_years)
+        today = datetime.datetime.now()
+        return (today - datetime.timedelta(days=years * 365)).strftime('%Y%m%d'), today.strftime('%Y%m%d')
+
+    def _plan(self, frame: pd.DataFrame, meta: dict, history_start_str: str, today_str: str):
+        """업스트림에서 받아야 할 (시작일, 종료일) 구간 목록과 갱신 후의 이력 시작일을 반환합니다."""
+        ranges = []
+        # 1. 과거 구간: 이전에 요청한 시작일보다 더 오래된 이력이 필요하거나 저장된 봉이 없는 경우
+        #    (업스트림이 일시적으로 빈 결과를 준 뒤에도 다음 동기화에서 전체 구간을 다시 받도록)
+        stored_start = meta.get('history_start')
+        if stored_start is None or frame.empty or history_start_str < stored_start:
+            older_end = today_str if frame.empty else \
+                (frame.index[0] - datetime.timedelta(days=1)).strftime('%Y%m%d')
+            ranges.append((history_start_str, older_end))
+            stored_start = history_start_str
+        # 2. 최신 구간: 수정주가 비교용 확정 봉과 마지막 저장일(장중 값일 수 있으므로 포함)부터 오늘까지
+        if not frame.empty and time.time() - meta.get('last_sync', 0) >= self.sync_ttl_seconds:
+            ranges.append((frame.index[max(0, len(frame) - 2)].strftime('%Y%m%d'), today_str))
+        return ranges, stored_start
+
+    def _merge(self, code: str, frame: pd.DataFrame, parts: list, stored_start: str) -> pd.DataFrame:
+        parts = [part for part in [frame, *parts] if part is not None and not part.empty]
+        merged = pd.concat(parts) if parts else _empty_frame()
+        merged = merged[~merged.index.duplicated(keep='last')].sort_index()[OHLCV_COLUMNS]
+        if merged.empty:
+            # 빈 응답은 업스트림의 일시적인 실패일 수 있으므로 저장하지 않고 다음 동기화에서 다시 받습니다.
+            logger.warning("OHLCV store received no rows for %s, not saving", code)
+            return merged
+        self._write(code, merged, {'history_start': stored_start, 'last_sync': time.time()})
+        return merged
+
+    def sync(self, code: str, years: int = None) -> pd.DataFrame:
+        """
+        저장된 데이터를 최신 상태로 맞추고 전체 파티션을 반환합니다.
+        필요한 이력보다 오래된 구간이 없으면 그 구간도 받아 옵니다.
+        """
+        history_start_str, today_str = self._window(years)
+        with self._code_lock(code):
+            frame, meta = self._read(code)
+            if frame is None:
+                frame, meta = _empty_frame(), {}
+            ranges, stored_start = self._plan(frame, meta, history_start_str, today_str)
+            if not ranges:
+                return frame
+            parts = []
+            for start_str, end_str in ranges:
+                logger.info("OHLCV store fetching %s from %s to %s", code, start_str, end_str)
+                with stage("ohlcv_fetch"):
+                    parts.append(self.fetch_fn(code, start_str, end_str))
+            if _prices_adjusted(frame, parts):
+                logger.info("OHLCV store detected adjusted prices for %s, refetching from %s", code, stored_start)
+                with stage("ohlcv_fetch"):
+                    frame, parts = _empty_frame(), [self.fetch_fn(code, stored_start, today_str)]
+            return self._merge(code, frame, parts, stored_start)
+
+    def sync_many(self, codes: list, years: int = None) -> dict:
+        """
+        여러 종목을 한 번에 최신 상태로 맞추고 {code: 전체 파티션}을 반환합니다.
+        fetch_many_fn이 있으면 과거 구간과 최신 구간을 각각 여러 종목 묶음 요청 한 번으로 받습니다.
+        (종목마다 빠진 구간이 조금씩 달라도 가장 넓은 구간으로 한 번에 받고, 겹치는 날짜는 병합 시 정리됩니다.)
+        """
+        if self.fetch_many_fn is None:
+            return {code: self.sync(code, years) for code in codes}
+
+        codes = sorted(set(codes))
+        history_start_str, today_str = self._window(years)
+        with ExitStack() as locks:
+            for code in codes:
+                locks.enter_context(self._code_lock(code))
+
+            plans, frames = {}, {}
+            for code in codes:
+                frame, meta = self._read(code)
+                if frame is None:
+                    frame, meta = _empty_frame(), {}
+                frames[code] = frame
+                plans[code] = self._plan(frame, meta, history_start_str, today_str)
+
+            # 과거 구간끼리, 최신 구간끼리 묶어서 요청
+            batches = {}
+            for code, (ranges, _) in plans.items():
+                for start_str, end_str in ranges:
+                    kind = 'history' if start_str == history_start_str else 'delta'
+                    batch = batches.setdefault(kind, {'codes': [], 'start': start_str, 'end': end_str})
+                    batch['codes'].append(code)
+                    batch['start'], batch['end'] = min(batch['start'], start_str), max(batch['end'], end_str)
+
+            fetched = {code: [] for code in codes}
+            for batch in batches.values():
+                logger.info("OHLCV store fetching %d codes from %s to %s", len(batch['codes']), batch['start'], batch['end'])
+                with stage("ohlcv_fetch"):
+                    result = self.fetch_many_fn(batch['codes'], batch['start'], batch['end'])
+                for code in batch['codes']:
+                    fetched[code].append(result.get(code))
+
+            adjusted = [code for code in codes if _prices_adjusted(frames[code], fetched[code])]
+            if adjusted:
+                start_str = min(plans[code][1] for code in adjusted)
+                logger.info("OHLCV store detected adjusted prices for %d codes, refetching from %s", len(adjusted), start_str)
+                with stage("ohlcv_fetch"):
+                    result = self.fetch_many_fn(adjusted, start_str, today_str)
+                for code in adjusted:
+                    frames[code], fetched[code] = _empty_frame(), [result.get(code)]
+
+            return {
+                code: self._merge(code, frames[code], fetched[code], plans[code][1]) if plans[code][0] else frames[code]
+                for code in codes
+            }
+
+    def get(self, code: str, years: int) -> pd.DataFrame:
+        """최근 years년 구간의 일봉 데이터프레임(날짜 인덱스, 오름차순)을 반환합니다."""
+        return _trim(self.sync(code, years), years)
+
+    def get_many(self, codes: list, years: int) -> dict:
+        """여러 종목의 최근 years년 구간 일봉 데이터프레임을 {code: DataFrame}으로 반환합니다."""
+        return {code: _trim(frame, years) for code, frame in self.sync_many(codes, years).items()}
+
+
+def _file_signature(path: str) -> tuple:
+    stat = os.stat(path)
+    return stat.st_mtime_ns, stat.st_size
+
+
+def _prices_adjusted(frame: pd.DataFrame, parts: list) -> bool:
+    """
+    다시 받은 봉 중 저장된 확정 봉(장중 값일 수 있는 마지막 봉 제외)과 날짜가 같은 봉의 OHLC가
+    _ADJUSTMENT_TOLERANCE 이상 달라졌는지 확인합니다.
+    """
+    settled = frame.iloc[:-1]
+    for part in parts:
+        if part is None or part.empty:
+            continue
+        common = settled.index.intersection(part.index)
+        if common.empty:
+            continue
+        stored = settled.loc[common, PRICE_COLUMNS].to_numpy(dtype=float)
+        fetched = part.loc[common, PRICE_COLUMNS].to_numpy(dtype=float)
+        if not np.allclose(stored, fetched, rtol=_ADJUSTMENT_TOLERANCE, atol=0, equal_nan=True):
+            return True
+    return False
+
+
+def _trim(frame: pd.DataFrame, years: int) -> pd.DataFrame:
+    start = pd.Timestamp(datetime.datetime.now() - datetime.timedelta(days=years * 365)).normalize()
+    return frame[frame.index >= start]
+
+
+def _empty_frame() -> pd.DataFrame:
+    return pd.DataFrame(columns=OHLCV_COLUMNS, index=pd.DatetimeIndex([], name='date'), dtype=float)
+
+
+def _fetch_pykrx_ohlcv(code: str, start_date_str: str, end_date_str: str) -> pd.DataFrame:
+    df = load_engine("pykrx").get_market_ohlcv(start_date_str, end_date_str, code)
+    df = df.rename(columns={
+        '종가': 'closing_price', '시가': 'opening_price',
+        '고가': 'high_price', '저가': 'low_price', '거래량': 'volume', '등락률': 'change'
+    })
+    df.index = pd.to_datetime(df.index)
+    df.index.name = 'date'
+    return df[OHLCV_COLUMNS] if not df.empty else df
+
+
+ohlcv_store = OHLCVStore(
+    os.path.join(OHLCV_STORE_DIR, "domestic"), _fetch_pykrx_ohlcv, OHLCV_STORE_MIN_YEARS, OHLCV_STORE_SYNC_TTL_SECONDS
+)
@@ -0,0 +1,105 @@
+import os
+import json
+import time
+import sqlite3
+import datetime
+import threading
+from contextlib import contextmanager
+
+from ..config import PREDICTION_STORE_PATH, PREDICTION_STORE_RETENTION_DAYS
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS predictions (
+    code TEXT,
+    years INTEGER,
+    target_date TEXT,
+    stock_name TEXT,
+    last_data_date TEXT,
+    latest_closing_price REAL,
+    predicted_price REAL,
+    predictions TEXT,
+    computed_at REAL,
+    PRIMARY KEY (code, years, target_date)
+);
+"""
+
+
+class PredictionStore:
+    """
+    미리 계산한 예측 결과를 (종목 코드, 기간, 예측 대상 날짜) 단위로 보관합니다. (SQLite)
+    장 마감 후에는 다음 거래일 예측의 입력(오늘까지의 일봉)이 더 바뀌지 않으므로, 같은 대상 날짜의 요청에는
+    저장된 결과를 그대로 사용할 수 있습니다. 대상 날짜가 retention_days일보다 지난 결과는 purge_expired로 지웁니다.
+    """
+
+    def __init__(self, path: str, retention_days: int):
+        self.path = path
+        self.retention_days = retention_days
+        self._init_lock = threading.Lock()
+        self._initialized = False
+
+    @contextmanager
+    def _connect(self):
+        """요청마다 연결을 열고, 끝나면 커밋 후 닫습니다. (스레드 간 연결 공유 없음)"""
+        if not self._initialized:
+            with self._init_lock:
+                if not self._initialized:
+                    os.makedirs(os.path.dirname(self.path), exist_ok=True)
+                    conn = sqlite3.connect(self.path)
+                    try:
+                        conn.execute("PRAGMA journal_mode=WAL")
+                        conn.executescript(_SCHEMA)
+                    finally:
+                        conn.close()
+                    self._initialized = True
+        conn = sqlite3.connect(self.path, timeout=5)
+        try:
+            with conn:
+                yield conn
+        finally:
+            conn.close()
+
+    def get(self, code: str, years: int, target_date: datetime.date):
+        """
+        저장된 예측을 딕셔너리로 반환합니다. 없으면 None을 반환합니다.
+        predictions는 {예측 기간(거래일): 예측 종가}입니다.
+        """
+        with self._connect() as conn:
+            row = conn.execute(
+                "SELECT stock_name, last_data_date, latest_closing_price, predicted_price, predictions, computed_at "
+                "FROM predictions WHERE code = ? AND years = ? AND target_date = ?",
+                (code, years, target_date.isoformat())
+            ).fetchone()
+        if row is None:
+            return None
+        return {
+            "code": code, "years": years, "target_date": target_date,
+            "stock_name": row[0], "last_data_date": datetime.date.fromisoformat(row[1]),
+            "latest_closing_price": row[2], "predicted_price": row[3],
+            "predictions": {int(h): price for h, price in json.loads(row[4]).items()},
+            "computed_at": row[5],
+        }
+
+    def put(self, code: str, years: int, target_date: datetime.date, stock_name: str,
+            last_data_date: datetime.date, latest_closing_price: float, predictions: dict):
+        """predictions는 {예측 기간(거래일): 예측 종가}이며, target_date는 1일 예측의 대상 날짜입니다."""
+        with self._connect() as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO predictions (code, years, target_date, stock_name, last_data_date, "
+                "latest_closing_price, predicted_price, predictions, computed_at) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (code, years, target_date.isoformat(), stock_name, last_data_date.isoformat(),
+                 latest_closing_price, predictions[1], json.dumps(predictions), time.time())
+            )
+
+    def count(self, target_date: datetime.date) -> int:
+        with self._connect() as conn:
+            return conn.execute(
+                "SELECT COUNT(*) FROM predictions WHERE target_date = ?", (target_date.isoformat(),)
+            ).fetchone()[0]
+
+    def purge_expired(self):
+        cutoff = datetime.date.today() - datetime.timedelta(days=self.retention_days)
+        with self._connect() as conn:
+            conn.execute("DELETE FROM predictions WHERE target_date < ?", (cutoff.isoformat(),))
+
+
+prediction_store = PredictionStore(PREDICTION_STORE_PATH, PREDICTION_STORE_RETENTION_DAYS)
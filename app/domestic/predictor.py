@@ -1,162 +1,757 @@
+import os
+import time
+import logging
 import pandas as pd
 import numpy as np
 import warnings
+import threading
+import multiprocessing
+from concurrent.futures import Future, ProcessPoolExecutor
 import xgboost as xgb
+import tensorflow as tf
 from sklearn.preprocessing import MinMaxScaler
 from sklearn.linear_model import LinearRegression
 from tensorflow.keras.models import Sequential
 from tensorflow.keras.layers import LSTM, Dense, Dropout
+from numpy.lib.stride_tricks import sliding_window_view
+from .model_registry import model_registry, make_model_key
+from .feature_store import feature_stores, compute_panel_features, FEATURE_COLUMNS, FEATURE_MARKETS
+from .training_budget import TrainingBudget, lstm_epoch_cost, DEGRADED_MODES
+from .global_model import (
+    global_model_store, predict_with_global_model, train_global_model, GlobalModelUnavailableError
+)
+from ..timing import stage
+from ..config import (
+    WARM_START_ENABLED, WARM_START_LSTM_EPOCHS, WARM_START_XGB_TREES, WARM_START_MAX_UPDATES,
+    WARM_START_MAX_AGE_DAYS, WARM_START_MAX_NEW_BARS, WARM_START_DRIFT_TOLERANCE,
+    PARALLEL_TRAINING, PARALLEL_TRAINING_WORKERS, PARALLEL_TRAINING_THREADS, PREDICTION_HORIZONS,
+    TRAINING_BUDGET_SECONDS, TRAINING_VALIDATION_FRACTION, LSTM_MAX_EPOCHS, LSTM_EARLY_STOPPING_PATIENCE,
+    XGB_MAX_TREES, XGB_EARLY_STOPPING_ROUNDS, PREDICTION_MODELS, PREDICTION_MODEL
+)
+
+logger = logging.getLogger(__name__)
 
 # 경고 무시
 warnings.filterwarnings("ignore")
 
+# 한 번의 학습으로 함께 예측하는 기간(거래일). LSTM/XGBoost는 기간마다 하나씩 출력하고, 메타 모델은 기간마다 따로 둡니다.
+HORIZONS = PREDICTION_HORIZONS
+MAX_HORIZON = max(HORIZONS)
+TARGET_COLUMNS = [f'target_{h}' for h in HORIZONS]
+
+# 피처 구성이나 모델 구조(예측 기간 포함)가 바뀌면 버전을 올려 기존 캐시를 무효화합니다.
+MODEL_VERSION = "stacking-hybrid-v3-h" + "-".join(str(h) for h in HORIZONS)
+
+LSTM_FEATURES = ['closing_price', 'opening_price', 'high_price', 'low_price', 'volume']
+PREDICTION_DAYS = 60
+META_TRAIN_ROWS = 60  # 마지막 60개 학습 행을 메타 모델 학습에 사용
+# 메타 단계 LSTM이 검증 구간에 시퀀스를 하나 이상 남길 수 있는 최소 학습 시퀀스 수
+_MIN_LSTM_SAMPLES = int(np.ceil(1 / TRAINING_VALIDATION_FRACTION)) if TRAINING_VALIDATION_FRACTION > 0 else 1
+# 필요한 최소 봉 수: 메타 학습 구간(META_TRAIN_ROWS)과 그 타깃(MAX_HORIZON) 앞에, 메타 단계 LSTM이
+# _MIN_LSTM_SAMPLES개의 (60일 시퀀스, MAX_HORIZON 뒤 타깃) 쌍을 만들 수 있어야 합니다.
+MIN_HISTORY_ROWS = META_TRAIN_ROWS + MAX_HORIZON + PREDICTION_DAYS + MAX_HORIZON + _MIN_LSTM_SAMPLES - 2
+LSTM_UNITS = 50
+LSTM_REDUCED_UNITS = 25  # 예산이 빠듯할 때(reduced) 처음부터 학습하는 LSTM의 크기
+
 
-def _create_features(df: pd.DataFrame) -> pd.DataFrame:
-    """XGBoost 모델을 위한 기술적 지표(피처)를 생성합니다."""
+def _create_features(df: pd.DataFrame, code: str = None, market: str = "domestic") -> pd.DataFrame:
+    """
+    XGBoost 모델을 위한 기술적 지표(피처)를 생성합니다.
+    code가 주어지면 market의 지표 저장소에서 읽고(새로 바뀐 봉만 계산), 없으면 주어진 데이터로 바로 계산합니다.
+    """
     df_new = df.copy()
-    df_new['sma5'] = df_new['closing_price'].rolling(5).mean()
-    df_new['sma20'] = df_new['closing_price'].rolling(20).mean()
-    delta = df_new['closing_price'].diff(1)
-    gain = (delta.where(delta > 0, 0)).rolling(window=14).mean()
-    loss = (-delta.where(delta < 0, 0)).rolling(window=14).mean()
-    rs = gain / loss
-    df_new['rsi'] = 100 - (100 / (1 + rs))
-    df_new['price_change_ratio'] = df_new['closing_price'].pct_change()
+    features = None
+    if code is not None:
+        try:
+            features = feature_stores[market].get(code, df['closing_price'])
+        except Exception as e:
+            logger.warning("Feature store unavailable for %s: %s", code, e)
+    if features is None:
+        panel = compute_panel_features(df[['closing_price']])
+        features = pd.DataFrame({name: panel[name]['closing_price'] for name in FEATURE_COLUMNS})
+    df_new[FEATURE_COLUMNS] = features.values
     return df_new
 
-def _train_and_predict_lstm(train_df: pd.DataFrame, predict_df: pd.DataFrame) -> np.ndarray:
-    """주어진 데이터로 LSTM을 학습하고 예측합니다."""
-    features = ['closing_price', 'opening_price', 'high_price', 'low_price', 'volume']
-    train_data = train_df[features].values
-    
-    scaler = MinMaxScaler(feature_range=(0, 1))
-    scaler.fit(train_data)
-    train_data_scaled = scaler.transform(train_data)
-    
-    scaler_close = MinMaxScaler(feature_range=(0, 1))
-    scaler_close.fit(train_df[['closing_price']])
-
-    prediction_days = 60
-    x_train, y_train = [], []
-    for i in range(prediction_days, len(train_data_scaled)):
-        x_train.append(train_data_scaled[i-prediction_days:i])
-        y_train.append(train_data_scaled[i, 0])
-    x_train, y_train = np.array(x_train), np.array(y_train)
+def _training_rows(df_features: pd.DataFrame) -> pd.DataFrame:
+    """
+    각 예측 기간 h의 타깃(h 거래일 뒤 종가)을 붙이고, 지표와 모든 타깃이 있는 행만 남깁니다.
+    마지막 MAX_HORIZON개 봉은 타깃이 없으므로 학습에서는 빠지지만 예측 입력으로는 그대로 사용합니다.
+    """
+    df_train = df_features.copy()
+    for h, column in zip(HORIZONS, TARGET_COLUMNS):
+        df_train[column] = df_train['closing_price'].shift(-h)
+    return df_train.dropna()
 
+def _build_lstm_model(input_shape, units: int = LSTM_UNITS) -> Sequential:
+    """LSTM 모델 구조를 생성하고 컴파일합니다. (units: LSTM 층의 크기, 예산이 빠듯하면 줄임)"""
     model = Sequential([
-        LSTM(units=50, return_sequences=True, input_shape=(x_train.shape[1], x_train.shape[2])),
+        LSTM(units=units, return_sequences=True, input_shape=input_shape),
         Dropout(0.2),
-        LSTM(units=50, return_sequences=False),
+        LSTM(units=units, return_sequences=False),
         Dropout(0.2),
         Dense(units=25),
-        Dense(units=1)
+        Dense(units=len(HORIZONS))  # 예측 기간마다 하나의 출력
     ])
     model.compile(optimizer='adam', loss='mean_squared_error')
-    model.fit(x_train, y_train, batch_size=32, epochs=50, verbose=0)
+    return model
+
+def _fit_lstm_scaler(df: pd.DataFrame) -> MinMaxScaler:
+    """LSTM 입력 피처용 스케일러를 학습합니다. (메타 단계와 최종 단계에서 함께 사용)"""
+    scaler = MinMaxScaler(feature_range=(0, 1))
+    scaler.fit(df[LSTM_FEATURES].values)
+    return scaler
+
+def _scale_lstm_inputs(scaler: MinMaxScaler, df: pd.DataFrame) -> np.ndarray:
+    """LSTM 입력 피처를 스케일링하여 연속된 float32 배열로 반환합니다."""
+    return np.ascontiguousarray(scaler.transform(df[LSTM_FEATURES].values), dtype=np.float32)
+
+def _sliding_windows(data_scaled: np.ndarray) -> np.ndarray:
+    """
+    (행, 피처) 배열에서 60일 시퀀스를 복사 없이 strided view로 만듭니다.
+    반환값의 j번째 시퀀스는 j ~ j+59 행이며, 각 예측 기간 h에 대해 j+59+h 행의 종가를 예측하는 입력입니다.
+    """
+    windows = sliding_window_view(data_scaled, PREDICTION_DAYS, axis=0)  # (n-59, 피처, 60)
+    return windows.transpose(0, 2, 1)  # (n-59, 60, 피처)
+
+def _lstm_training_pairs(data_scaled: np.ndarray):
+    """모든 예측 기간의 타깃 종가가 있는 시퀀스와 (시퀀스 수, 기간 수) 타깃 배열을 반환합니다."""
+    count = _lstm_sample_count(len(data_scaled))
+    x_train = _sliding_windows(data_scaled)[:count]
+    y_train = np.stack([
+        data_scaled[PREDICTION_DAYS - 1 + h:PREDICTION_DAYS - 1 + h + count, 0] for h in HORIZONS
+    ], axis=1)
+    return x_train, y_train
+
+def _lstm_sample_count(rows: int) -> int:
+    return rows - PREDICTION_DAYS + 1 - MAX_HORIZON
+
+def _inverse_close(scaler: MinMaxScaler, values_scaled: np.ndarray) -> np.ndarray:
+    """스케일된 종가(첫 번째 피처)를 원래 가격으로 되돌립니다. (배열 모양 유지)"""
+    return (np.asarray(values_scaled, dtype=np.float64) - scaler.min_[0]) / scaler.scale_[0]
+
+class _KerasDeadline(tf.keras.callbacks.Callback):
+    """
+    epoch마다 소요 시간을 기록하고, 마감 시각(time.time() 기준, None이면 없음)이 지나면
+    현재 epoch이 끝난 뒤 학습을 멈춥니다.
+    """
 
-    # 예측할 데이터 준비
-    total_data = pd.concat([train_df[features], predict_df[features]], axis=0)
-    inputs = total_data[len(total_data) - len(predict_df) - prediction_days:].values
-    inputs_scaled = scaler.transform(inputs)
+    def __init__(self, deadline: float = None):
+        super().__init__()
+        self.deadline = deadline
+        self.hit = False
+        self.epoch_seconds = []
+        self._epoch_started = None
 
-    x_predict = []
-    for i in range(prediction_days, len(inputs_scaled)):
-        x_predict.append(inputs_scaled[i-prediction_days:i])
-    x_predict = np.array(x_predict)
+    def on_epoch_begin(self, epoch, logs=None):
+        self._epoch_started = time.perf_counter()
 
-    predictions_scaled = model.predict(x_predict, verbose=0)
-    predictions = scaler_close.inverse_transform(predictions_scaled)
-    return predictions.flatten()
+    def on_epoch_end(self, epoch, logs=None):
+        self.epoch_seconds.append(time.perf_counter() - self._epoch_started)
+        if self.deadline is not None and time.time() >= self.deadline:
+            self.hit = True
+            self.model.stop_training = True
 
-def predict_next_day_price_stacking_hybrid(historical_data: list) -> float:
+class _XgbDeadline(xgb.callback.TrainingCallback):
+    """마감 시각(time.time() 기준)이 지나면 트리 추가를 멈춥니다."""
+
+    def __init__(self, deadline: float):
+        super().__init__()
+        self.deadline = deadline
+        self.hit = False
+
+    def after_iteration(self, model, epoch, evals_log) -> bool:
+        if time.time() >= self.deadline:
+            self.hit = True
+        return self.hit
+
+def _fit_lstm(model, data_scaled: np.ndarray, epochs: int, deadline: float = None, validate: bool = True) -> dict:
     """
-    스태킹(Stacking) 하이브리드 모델을 사용하여 다음 날의 종가를 예측합니다.
-    1. LSTM과 XGBoost를 1차 모델로 사용하여 각각 예측을 생성합니다.
-    2. 두 모델의 예측 결과를 입력으로 받아, 최종 예측을 생성하는 2차 모델(메타 모델)을 학습시킵니다.
+    최대 epochs만큼 학습하되, validate이면 마지막 TRAINING_VALIDATION_FRACTION 구간을 검증에 떼어 두고
+    검증 손실이 LSTM_EARLY_STOPPING_PATIENCE epoch 동안 나아지지 않으면 멈춥니다. (best_epochs: 검증 손실이
+    가장 낮았던 epoch 수) validate가 아니면 모든 시퀀스로 epochs만큼 학습합니다.
+    deadline이 주어지면 그 시각 이후에는 epoch을 더 돌지 않습니다. 학습 통계를 반환합니다.
     """
-    if len(historical_data) < 90:
-        raise ValueError("Not enough historical data for Stacking model (requires at least 90 days initially).")
+    x_train, y_train = _lstm_training_pairs(data_scaled)
+    callbacks, validation_split = [], 0.0
+    if validate and int(len(x_train) * TRAINING_VALIDATION_FRACTION) > 0:
+        validation_split = TRAINING_VALIDATION_FRACTION
+        callbacks.append(tf.keras.callbacks.EarlyStopping(
+            monitor='val_loss', patience=LSTM_EARLY_STOPPING_PATIENCE, restore_best_weights=True
+        ))
+    deadline_callback = _KerasDeadline(deadline)
+    callbacks.append(deadline_callback)
+
+    with stage("lstm_train"):
+        history = model.fit(
+            x_train, y_train, batch_size=32, epochs=epochs, validation_split=validation_split,
+            callbacks=callbacks, verbose=0
+        )
+    val_loss = history.history.get('val_loss')
+    return {
+        'epochs': len(history.epoch), 'samples': len(x_train), 'epoch_seconds': deadline_callback.epoch_seconds,
+        'deadline_hit': deadline_callback.hit, 'validated': bool(val_loss),
+        'best_epochs': int(np.argmin(val_loss)) + 1 if val_loss else len(history.epoch),
+    }
 
-    df = pd.DataFrame(historical_data)
-    df['date'] = pd.to_datetime(df['date'])
-    df = df.set_index('date').sort_index()
+def _lstm_from_weights(weights: list):
+    """가중치 목록으로 같은 구조의 LSTM 모델을 복원합니다. (LSTM 크기는 첫 커널의 모양에서 구함)"""
+    model = _build_lstm_model((PREDICTION_DAYS, len(LSTM_FEATURES)), units=weights[0].shape[1] // 4)
+    model.set_weights(weights)
+    return model
+
+def _predict_lstm(model, scaler: MinMaxScaler, data_scaled: np.ndarray, positions) -> np.ndarray:
+    """
+    학습된 LSTM으로 각 위치(positions, data_scaled 기준 행 번호)에서 예측 기간별 종가를 예측합니다.
+    위치 p의 예측에는 바로 앞 60일(p-60 ~ p-1 행)을 사용하며, 기간 h의 예측은 p-1+h 행의 종가입니다.
+    (p가 len(data_scaled)이면 마지막 봉 이후를 예측) 반환값은 (위치 수, 기간 수) 배열입니다.
+    """
+    windows = _sliding_windows(data_scaled)
+    x_predict = windows[np.asarray(positions) - PREDICTION_DAYS]
+    with stage("lstm_predict"):
+        predictions_scaled = model.predict(x_predict, verbose=0)
+    return _inverse_close(scaler, predictions_scaled)
 
-    # --- Defensive data cleaning and type conversion ---
+def _fit_xgb(X: pd.DataFrame, y: pd.DataFrame, trees: int, base_booster: xgb.Booster = None,
+             deadline: float = None, eval_set: tuple = None):
+    """XGBoost를 최대 trees개 트리만큼 학습하고 (모델, 마감 시각에 걸렸는지)를 반환합니다. eval_set이 있으면 조기 종료합니다."""
+    deadline_callback = _XgbDeadline(deadline) if deadline is not None else None
+    params = dict(
+        objective='reg:squarederror', random_state=42, n_jobs=_worker_threads, n_estimators=trees,
+        callbacks=[deadline_callback] if deadline_callback is not None else None,
+    )
+    fit_kwargs = {}
+    if eval_set is not None:
+        params['early_stopping_rounds'] = XGB_EARLY_STOPPING_ROUNDS
+        fit_kwargs['eval_set'] = [eval_set]
+    if base_booster is not None:
+        fit_kwargs['xgb_model'] = base_booster
+
+    with stage("xgb_train"):
+        model = xgb.XGBRegressor(**params)
+        model.fit(X, y, verbose=False, **fit_kwargs)
+    # 콜백은 저장/프로세스 간 전달이 필요 없으므로 학습이 끝나면 떼어 냅니다.
+    model.set_params(callbacks=None)
+    return model, bool(deadline_callback is not None and deadline_callback.hit)
+
+def _used_trees(booster: xgb.Booster) -> int:
+    """
+    예측에 쓰는 트리 수입니다. 조기 종료했으면 가장 좋았던 트리까지이고, 조기 종료가 기록되기 전에
+    마감 시각으로 멈췄거나 조기 종료 없이 학습했으면 학습한 트리 전부입니다.
+    """
+    if 'best_iteration' in booster.attributes():
+        return int(booster.best_iteration) + 1
+    return booster.num_boosted_rounds()
+
+def _train_xgb(X: pd.DataFrame, y: pd.DataFrame, previous_model: xgb.XGBRegressor = None,
+               deadline: float = None):
+    """
+    XGBoost를 학습하고 (모델, 학습 통계)를 반환합니다. y의 컬럼(예측 기간)마다 출력이 하나씩인 다중 출력 모델입니다.
+    먼저 마지막 TRAINING_VALIDATION_FRACTION 구간을 검증에 사용해 XGB_EARLY_STOPPING_ROUNDS 동안 나아지지 않으면
+    멈추는 방식으로 트리 수를 고르고, 그 트리 수로 검증 구간(가장 최근 봉)까지 포함한 전체 행에서 다시 학습합니다.
+    다시 학습할 시간이 마감 시각까지 남지 않으면 검증 구간을 뺀 모델을 그대로 쓰고 refit을 False로 보고합니다.
+    previous_model이 주어지면 기존 부스터(예측에 쓰던 트리까지)에 이어서 트리를 추가로 학습합니다.
+    """
+    base_booster, base_trees, max_new_trees = None, 0, XGB_MAX_TREES
+    if previous_model is not None:
+        # 조기 종료 뒤에 더 만들어진(검증 손실을 나쁘게 한) 트리는 버리고, 예측에 쓰던 트리까지만 이어서 학습합니다.
+        previous_booster = previous_model.get_booster()
+        base_trees = _used_trees(previous_booster)
+        # 갱신을 거듭해도 전체 트리 수가 XGB_MAX_TREES를 넘지 않게 하고, 더 추가할 수 없으면 처음부터 학습합니다.
+        if base_trees < XGB_MAX_TREES:
+            base_booster = previous_booster[:base_trees]
+            max_new_trees = min(WARM_START_XGB_TREES, XGB_MAX_TREES - base_trees)
+        else:
+            base_trees = 0
+
+    validation_rows = int(len(X) * TRAINING_VALIDATION_FRACTION)
+    if validation_rows == 0:
+        model, hit = _fit_xgb(X, y, max_new_trees, base_booster, deadline)
+        return model, {'trees': _used_trees(model.get_booster()), 'deadline_hit': hit, 'refit': True}
+
+    started = time.time()
+    selected, hit = _fit_xgb(
+        X.iloc[:-validation_rows], y.iloc[:-validation_rows], max_new_trees, base_booster, deadline,
+        eval_set=(X.iloc[-validation_rows:], y.iloc[-validation_rows:])
+    )
+    selection_seconds = time.time() - started
+    booster = selected.get_booster()
+    built, trees = booster.num_boosted_rounds(), _used_trees(booster)
+    new_trees = max(1, trees - base_trees)
+
+    # 다시 학습하는 시간은 트리 수와 행 수에 비례한다고 보고 추정합니다.
+    refit_seconds = selection_seconds * new_trees / max(1, built - base_trees) * len(X) / (len(X) - validation_rows)
+    if not hit and (deadline is None or time.time() + refit_seconds < deadline):
+        model, refit_hit = _fit_xgb(X, y, new_trees, base_booster, deadline)
+        if not refit_hit:
+            return model, {'trees': int(base_trees + new_trees), 'deadline_hit': False, 'refit': True}
+    # 예산 때문에 다시 학습하지 못했으면 예산에 맞춰 줄인 학습과 같으므로 마감 시각에 걸린 것으로 보고합니다.
+    return selected, {'trees': int(trees), 'deadline_hit': True, 'refit': False}
+
+def _predict_xgb(model: xgb.XGBRegressor, X: pd.DataFrame) -> np.ndarray:
+    """XGBoost의 예측 기간별 예측을 (행 수, 기간 수) 배열로 반환합니다."""
+    with stage("xgb_predict"):
+        return np.asarray(model.predict(X), dtype=np.float64).reshape(len(X), len(HORIZONS))
+
+# --- 병렬 학습 (프로세스 풀) ---
+# 워커 프로세스에서는 initializer가 스레드 수를 설정합니다. 메인 프로세스에서는 None(라이브러리 기본값)입니다.
+_worker_threads = None
+_training_pool = None
+_training_pool_lock = threading.Lock()
+
+def _init_training_worker(threads: int):
+    """
+    워커 프로세스마다 TensorFlow/XGBoost가 사용할 스레드 수를 제한합니다.
+    (initializer는 numpy/xgboost를 import한 뒤에 실행되므로 OMP_NUM_THREADS 대신 XGBoost의 n_jobs와
+    tf.config.threading으로 제한)
+    """
+    global _worker_threads
+    _worker_threads = threads
+    tf.config.threading.set_intra_op_parallelism_threads(threads)
+    tf.config.threading.set_inter_op_parallelism_threads(1)
+
+def get_training_pool() -> ProcessPoolExecutor:
+    """학습용 프로세스 풀을 처음 사용할 때 생성합니다. (TensorFlow와의 호환을 위해 spawn 방식 사용)"""
+    global _training_pool
+    with _training_pool_lock:
+        if _training_pool is None:
+            threads = PARALLEL_TRAINING_THREADS or max(1, (os.cpu_count() or 1) // PARALLEL_TRAINING_WORKERS)
+            _training_pool = ProcessPoolExecutor(
+                max_workers=PARALLEL_TRAINING_WORKERS,
+                mp_context=multiprocessing.get_context('spawn'),
+                initializer=_init_training_worker,
+                initargs=(threads,),
+            )
+        return _training_pool
+
+def _lstm_task(data_scaled: np.ndarray, initial_weights: list = None, epochs: int = LSTM_MAX_EPOCHS,
+               units: int = LSTM_UNITS, deadline: float = None):
+    """
+    LSTM 학습 작업. initial_weights가 없으면 처음부터 학습하고, 있으면 이전 가중치에서 이어서 학습합니다.
+    (캐시에 남아 있는 이전 모델이 바뀌지 않도록 가중치를 복사한 새 모델을 학습)
+    검증 구간으로 고른 epoch 수만큼 같은 시작점에서 전체 시퀀스로 다시 학습하며, 마감 시각까지 다시 학습할
+    시간이 없으면 검증 구간을 뺀 모델을 그대로 쓰고 refit을 False로 보고합니다.
+    프로세스 간에는 모델 대신 (가중치 목록, 학습 통계)만 주고받습니다.
+    """
+    def build():
+        if initial_weights is None:
+            return _build_lstm_model((PREDICTION_DAYS, len(LSTM_FEATURES)), units=units)
+        return _lstm_from_weights(initial_weights)
+
+    model = build()
+    stats = _fit_lstm(model, data_scaled, epochs, deadline)
+    if not stats['validated']:
+        return model.get_weights(), dict(stats, refit=True)
+
+    best_epochs = stats['best_epochs']
+    refit_seconds = sum(stats['epoch_seconds'][:best_epochs]) / (1 - TRAINING_VALIDATION_FRACTION)
+    if not stats['deadline_hit'] and (deadline is None or time.time() + refit_seconds < deadline):
+        refit_model = build()
+        refit_stats = _fit_lstm(refit_model, data_scaled, best_epochs, deadline, validate=False)
+        if not refit_stats['deadline_hit']:
+            return refit_model.get_weights(), dict(stats, epochs=refit_stats['epochs'], refit=True)
+    # 예산 때문에 다시 학습하지 못했으면 예산에 맞춰 줄인 학습과 같으므로 마감 시각에 걸린 것으로 보고합니다.
+    return model.get_weights(), dict(stats, deadline_hit=True, refit=False)
+
+def _submit(executor, fn, *args) -> Future:
+    """executor가 있으면 작업을 제출하고, 없으면 바로 실행한 결과를 Future로 감싸 반환합니다."""
+    if executor is not None:
+        return executor.submit(fn, *args)
+    future = Future()
+    future.set_result(fn(*args))
+    return future
+
+def _check_history_rows(rows: int):
+    if rows < MIN_HISTORY_ROWS:
+        raise ValueError(
+            f"Not enough historical data for {MAX_HORIZON}-day forecasts "
+            f"(requires at least {MIN_HISTORY_ROWS} valid trading days, found {rows})."
+        )
+
+def _prepare_dataframe(historical_data) -> pd.DataFrame:
+    """
+    과거 시세를 날짜 인덱스의 숫자형 데이터프레임으로 정리합니다.
+    OHLCV 저장소의 데이터프레임(날짜 인덱스, 숫자형 컬럼)은 그대로 사용하고,
+    list of dicts 형식이면 날짜 파싱과 숫자 변환을 거칩니다.
+    """
+    _check_history_rows(len(historical_data))
     numeric_cols = ['closing_price', 'opening_price', 'high_price', 'low_price', 'volume']
-    for col in numeric_cols:
-        df[col] = pd.to_numeric(df[col], errors='coerce')
+    if isinstance(historical_data, pd.DataFrame):
+        df = historical_data.sort_index()[numeric_cols].dropna()
+    else:
+        df = pd.DataFrame(historical_data)
+        df['date'] = pd.to_datetime(df['date'])
+        df = df.set_index('date').sort_index()
+
+        # --- Defensive data cleaning and type conversion ---
+        for col in numeric_cols:
+            df[col] = pd.to_numeric(df[col], errors='coerce')
 
-    if 'change' in df.columns:
-        df = df.drop(columns=['change'])
+        if 'change' in df.columns:
+            df = df.drop(columns=['change'])
 
-    df.dropna(inplace=True) # Drop rows with any NaN values after coercion
+        df.dropna(inplace=True) # Drop rows with any NaN values after coercion
 
-    if len(df) < 90:
-        raise ValueError(f"Not enough valid historical data after cleaning (requires at least 90 days, found {len(df)}).")
+    _check_history_rows(len(df))
     # --- End of cleaning ---
+    return df
 
-    # --- XGBoost 모델을 위한 피처 및 타겟 생성 ---
-    df_features = _create_features(df)
-    # 예측 타겟(다음 날 종가) 생성
-    df_features['target'] = df_features['closing_price'].shift(-1)
-    df_features.dropna(inplace=True)
+def _split_for_meta(df: pd.DataFrame, df_train: pd.DataFrame):
+    """
+    학습 행을 1차 모델 학습용과 메타 모델 학습용(마지막 META_TRAIN_ROWS행)으로 분리하고,
+    메타 학습 행마다 같은 날까지의 60일로 예측하는 LSTM 위치(원본 행 번호 + 1)를 함께 반환합니다.
+    """
+    # 피처 데이터프레임 분리
+    train_features_df = df_train[:-META_TRAIN_ROWS]
+    meta_features_df = df_train[-META_TRAIN_ROWS:]
 
-    # --- 데이터 분리 (학습용 / 메타 모델 학습용) ---
-    meta_model_train_size = 60 # 마지막 60일을 메타 모델 학습에 사용
-    
-    # 원본 데이터프레임 분리
-    train_df = df[df.index.isin(df_features.index)][:-meta_model_train_size]
-    meta_train_df = df[df.index.isin(df_features.index)][-meta_model_train_size:]
+    # 메타 학습 구간의 LSTM 위치 (LSTM은 첫 위치 이전 데이터로만 학습)
+    meta_positions = df.index.get_indexer(meta_features_df.index) + 1
+    if train_features_df.empty or meta_positions[0] < PREDICTION_DAYS + MAX_HORIZON:
+        raise ValueError(
+            f"Not enough historical data for {MAX_HORIZON}-day forecasts "
+            f"(found {len(df_train)} rows with complete features and targets)."
+        )
+    return train_features_df, meta_features_df, meta_positions
 
-    # 피처 데이터프레임 분리
-    train_features_df = df_features[:-meta_model_train_size]
-    meta_features_df = df_features[-meta_model_train_size:]
+def _fit_meta_models(lstm_preds_for_meta: np.ndarray, xgb_preds_for_meta: np.ndarray,
+                     meta_features_df: pd.DataFrame) -> dict:
+    """예측 기간마다 두 1차 모델의 해당 기간 예측을 피처로 사용하는 메타 모델(선형 회귀)을 학습합니다."""
+    meta_models = {}
+    with stage("meta_fit"):
+        for i, (h, column) in enumerate(zip(HORIZONS, TARGET_COLUMNS)):
+            X_meta_train = np.c_[lstm_preds_for_meta[:, i], xgb_preds_for_meta[:, i]] # 두 모델의 예측을 피처로 사용
+            meta_models[h] = LinearRegression().fit(X_meta_train, meta_features_df[column].values)
+    return meta_models
+
+def _train_stacking_models(df: pd.DataFrame, df_train: pd.DataFrame, base_models: dict = None,
+                           executor: ProcessPoolExecutor = None, budget: TrainingBudget = None) -> dict:
+    """
+    1차 모델(LSTM, XGBoost)과 예측 기간별 메타 모델을 학습하여 모델 묶음을 반환합니다.
+    1차 모델은 모든 예측 기간을 한 번에 출력하므로 기간이 늘어도 학습 횟수는 같습니다.
+    LSTM 스케일러는 한 번만 학습하여 메타 단계와 최종 단계에서 같은 스케일 데이터를 공유합니다.
+
+    base_models가 주어지면 이전 거래일의 모델을 이어서 학습(warm start)합니다.
+    LSTM은 기존 가중치에서 몇 epoch만 미세 조정하고, XGBoost는 기존 부스터에 트리를 추가하며,
+    메타 모델은 갱신된 1차 모델의 예측으로 다시 학습합니다.
+
+    서로 독립적인 4개의 1차 모델 학습(메타 단계/최종 단계 × LSTM/XGBoost)은 executor가 주어지면
+    동시에 실행되며, 메타 모델 학습만 메타 단계의 두 결과를 기다립니다.
+
+    budget(TrainingBudget)에 맞춰 학습 모드를 정합니다. 예산이 빠듯하면 LSTM의 epoch 수와 크기를 줄이고(reduced),
+    그마저 어려우면 LSTM과 메타 모델 없이 XGBoost만 학습합니다(xgboost_only). 모든 1차 모델은 검증 손실로
+    epoch/트리 수를 고른 뒤 검증 구간까지 포함해 다시 학습하며, 단계별 마감 시각이 지나면 멈춥니다.
+    모드와 학습 통계는 묶음의 'training'에 담기고, 다시 학습하지 못해 가장 최근 봉을 학습하지 않은 모델은
+    'holdout_excluded'에 적힙니다.
+    """
+    budget = budget or TrainingBudget()
+    train_features_df, meta_features_df, meta_positions = _split_for_meta(df, df_train)
+
+    if base_models is None:
+        features_to_use = [col for col in df_train.columns if col not in TARGET_COLUMNS]
+        lstm_scaler = _fit_lstm_scaler(df)
+        lstm_meta_weights, lstm_weights = None, None
+        xgb_meta_base, xgb_base = None, None
+        max_epochs = LSTM_MAX_EPOCHS
+    else:
+        features_to_use = base_models['features_to_use']
+        lstm_scaler = base_models['lstm_scaler']
+        lstm_meta_weights = base_models['lstm_meta_model'].get_weights()
+        lstm_weights = base_models['lstm_model'].get_weights()
+        xgb_meta_base, xgb_base = base_models['xgb_meta_model'], base_models['xgb_model']
+        max_epochs = WARM_START_LSTM_EPOCHS
+
+    plan = budget.plan(_lstm_sample_count(len(df)), max_epochs, warm=base_models is not None)
+    mode = plan['mode']
+    training = {'mode': mode, 'lstm_epochs': {}, 'xgb_trees': {}}
+
+    if mode == 'xgboost_only':
+        # LSTM을 학습할 시간이 없으면 최종 XGBoost의 기간별 예측을 그대로 사용합니다.
+        xgb_model, xgb_stats = _train_xgb(
+            df_train[features_to_use], df_train[TARGET_COLUMNS], xgb_base, budget.stage_deadline('xgb')
+        )
+        training['xgb_trees']['final'] = xgb_stats['trees']
+        training['holdout_excluded'] = [] if xgb_stats['refit'] else ['xgb']
+        return {'xgb_model': xgb_model, 'features_to_use': features_to_use, 'training': training}
+
+    data_scaled = _scale_lstm_inputs(lstm_scaler, df)
+    lstm_units = LSTM_REDUCED_UNITS if mode == 'reduced' and base_models is None else LSTM_UNITS
+    epochs = plan['lstm_epochs']
+
+    # --- 1차 모델 학습 작업 제출 ---
+    # 메타 단계: LSTM은 메타 학습 구간 이전 데이터로만 학습
+    lstm_meta_future = _submit(
+        executor, _lstm_task, data_scaled[:meta_positions[0]], lstm_meta_weights, epochs, lstm_units,
+        budget.stage_deadline('lstm_meta')
+    )
+    xgb_meta_future = _submit(
+        executor, _train_xgb, train_features_df[features_to_use], train_features_df[TARGET_COLUMNS], xgb_meta_base,
+        budget.stage_deadline('xgb_meta')
+    )
+    # 최종 단계: 전체 데이터로 학습
+    lstm_future = _submit(
+        executor, _lstm_task, data_scaled, lstm_weights, epochs, lstm_units, budget.stage_deadline('lstm')
+    )
+    xgb_future = _submit(
+        executor, _train_xgb, df_train[features_to_use], df_train[TARGET_COLUMNS], xgb_base,
+        budget.stage_deadline('xgb')
+    )
 
     # --- 1차 모델들로 메타 모델의 학습 데이터 생성 ---
-    # LSTM 예측
-    lstm_preds_for_meta = _train_and_predict_lstm(train_df, meta_train_df)
-    
-    # XGBoost 예측
-    features_to_use = [col for col in df_features.columns if col not in ['target']]
-    X_train_xgb = train_features_df[features_to_use]
-    y_train_xgb = train_features_df['target']
-    X_meta_xgb = meta_features_df[features_to_use]
-
-    xgb_model = xgb.XGBRegressor(objective='reg:squarederror', n_estimators=500, random_state=42)
-    xgb_model.fit(X_train_xgb, y_train_xgb)
-    xgb_preds_for_meta = xgb_model.predict(X_meta_xgb)
-
-    # --- 메타 모델 학습 ---
-    X_meta_train = np.c_[lstm_preds_for_meta, xgb_preds_for_meta] # 두 모델의 예측을 피처로 사용
-    y_meta_train = meta_features_df['target'].values
-
-    meta_model = LinearRegression()
-    meta_model.fit(X_meta_train, y_meta_train)
-
-    # --- 최종 예측 (내일 예측) ---
-    # 1. 전체 데이터로 LSTM 재학습 및 예측
-    lstm_final_pred = _train_and_predict_lstm(df, df.iloc[[-1]])[0]
-
-    # 2. 전체 데이터로 XGBoost 재학습 및 예측
-    X_full_xgb = df_features[features_to_use]
-    y_full_xgb = df_features['target']
-    
-    xgb_model_final = xgb.XGBRegressor(objective='reg:squarederror', n_estimators=500, random_state=42)
-    xgb_model_final.fit(X_full_xgb, y_full_xgb)
-    
-    # XGBoost 예측에는 마지막 피처 행 사용
-    xgb_final_pred = xgb_model_final.predict(df_features[features_to_use].iloc[[-1]])[0]
-
-    # 3. 학습된 메타 모델로 최종 결과 조합
-    final_input_for_meta = np.c_[[lstm_final_pred], [xgb_final_pred]]
-    final_prediction = meta_model.predict(final_input_for_meta)
+    lstm_meta_weights, lstm_meta_stats = lstm_meta_future.result()
+    lstm_meta_model = _lstm_from_weights(lstm_meta_weights)
+    lstm_preds_for_meta = _predict_lstm(lstm_meta_model, lstm_scaler, data_scaled, meta_positions)
+
+    xgb_meta_model, xgb_meta_stats = xgb_meta_future.result()
+    xgb_preds_for_meta = _predict_xgb(xgb_meta_model, meta_features_df[features_to_use])
+
+    # --- 예측 기간별 메타 모델 학습 ---
+    meta_models = _fit_meta_models(lstm_preds_for_meta, xgb_preds_for_meta, meta_features_df)
+
+    lstm_weights, lstm_stats = lstm_future.result()
+    xgb_model, xgb_stats = xgb_future.result()
+
+    stats = {'lstm_meta': lstm_meta_stats, 'lstm': lstm_stats, 'xgb_meta': xgb_meta_stats, 'xgb': xgb_stats}
+    for name in ('lstm_meta', 'lstm'):
+        lstm_epoch_cost.observe(stats[name]['samples'], stats[name]['epoch_seconds'])
+    if any(s['deadline_hit'] for s in stats.values()):
+        # 마감 시각에 걸려 일찍 멈춘 모델은 예산에 맞춰 줄인 학습과 같으므로 reduced로 보고합니다.
+        training['mode'] = 'reduced'
+    training['lstm_epochs'] = {'meta': lstm_meta_stats['epochs'], 'final': lstm_stats['epochs']}
+    training['xgb_trees'] = {'meta': xgb_meta_stats['trees'], 'final': xgb_stats['trees']}
+    # 검증 구간(가장 최근 봉)까지 다시 학습하지 못한 모델
+    training['holdout_excluded'] = [name for name, s in stats.items() if not s['refit']]
+
+    return {
+        'lstm_meta_model': lstm_meta_model,
+        'xgb_meta_model': xgb_meta_model,
+        'lstm_model': _lstm_from_weights(lstm_weights),
+        'lstm_scaler': lstm_scaler,
+        'xgb_model': xgb_model,
+        'meta_models': meta_models,
+        'features_to_use': features_to_use,
+        'training': training,
+    }
+
+def _detect_drift(models: dict, df: pd.DataFrame, previous_last_date) -> bool:
+    """
+    이전 학습 이후 새로 들어온 봉이 기존 스케일러의 학습 범위를 크게 벗어나면 드리프트로 판단합니다.
+    (스케일러를 다시 학습하지 않는 warm start에서는 범위를 벗어난 입력의 예측 품질이 떨어집니다.)
+    """
+    scaler = models['lstm_scaler']
+    new_rows = df[df.index > previous_last_date][LSTM_FEATURES].values
+    if len(new_rows) == 0:
+        return False
+    data_range = scaler.data_max_ - scaler.data_min_
+    tolerance = data_range * WARM_START_DRIFT_TOLERANCE
+    below = new_rows < scaler.data_min_ - tolerance
+    above = new_rows > scaler.data_max_ + tolerance
+    return bool((below | above).any())
+
+def _find_warm_start_base(code: str, years: int, df: pd.DataFrame):
+    """
+    warm start에 사용할 이전 모델 묶음을 찾습니다.
+    정해진 횟수/기간마다, 또는 새 봉이 너무 많거나 드리프트가 감지되면 None을 반환하여 전체 재학습을 유도합니다.
+    """
+    if not WARM_START_ENABLED:
+        return None, None
+
+    base_key, base_entry = model_registry.find_latest(code, years, MODEL_VERSION, before=df.index[-1])
+    if base_key is None:
+        return None, None
+
+    previous_last_date = pd.Timestamp(base_entry['last_date'])
+    new_bars = int((df.index > previous_last_date).sum())
+    full_trained_date = pd.Timestamp(base_entry.get('full_trained_date', base_entry['last_date']))
+
+    if base_entry.get('warm_starts', 0) >= WARM_START_MAX_UPDATES:
+        logger.info("%s reached %d warm starts, scheduling full retrain.", base_key, WARM_START_MAX_UPDATES)
+        return None, None
+    if (df.index[-1] - full_trained_date).days > WARM_START_MAX_AGE_DAYS:
+        logger.info("Last full training of %s is too old, scheduling full retrain.", base_key)
+        return None, None
+    if new_bars == 0 or new_bars > WARM_START_MAX_NEW_BARS:
+        return None, None
+
+    models = model_registry.load(base_key)
+    if models is None or 'lstm_meta_model' not in models:
+        return None, None
+    if _detect_drift(models, df, previous_last_date):
+        logger.info("Drift detected since %s, scheduling full retrain.", base_key)
+        return None, None
+    return models, base_entry
+
+def _predict_with_models(models: dict, df: pd.DataFrame, df_features: pd.DataFrame) -> dict:
+    """학습된 모델 묶음으로 마지막 봉 이후 예측 기간별 종가를 예측합니다. (추론만 수행)"""
+    # 1. XGBoost 예측에는 마지막 봉의 피처 행 사용 (학습에서 빠진 타깃 없는 행)
+    xgb_final_preds = _predict_xgb(models['xgb_model'], df_features[models['features_to_use']].iloc[[-1]])[0]
+    if 'lstm_model' not in models:
+        # xgboost_only 모드: 메타 모델 없이 XGBoost의 기간별 예측을 그대로 사용
+        return {h: float(xgb_final_preds[i]) for i, h in enumerate(HORIZONS)}
+
+    # 2. LSTM 예측
+    lstm_scaler = models['lstm_scaler']
+    data_scaled = _scale_lstm_inputs(lstm_scaler, df.iloc[-PREDICTION_DAYS:])
+    lstm_final_preds = _predict_lstm(models['lstm_model'], lstm_scaler, data_scaled, [PREDICTION_DAYS])[0]
+
+    # 3. 예측 기간별 메타 모델로 최종 결과 조합
+    predictions = {}
+    with stage("meta_predict"):
+        for i, h in enumerate(HORIZONS):
+            final_input_for_meta = np.c_[[lstm_final_preds[i]], [xgb_final_preds[i]]]
+            predictions[h] = float(models['meta_models'][h].predict(final_input_for_meta)[0])
 
     # --- DEBUGGING OUTPUT ---
-    print("\n--- PREDICTION DEBUGGING ---")
-    print(f"LSTM Final Prediction: {lstm_final_pred}")
-    print(f"XGBoost Final Prediction: {xgb_final_pred}")
-    print(f"Meta-Model Input: {final_input_for_meta}")
-    print(f"Final Combined Prediction: {final_prediction[0]}")
-    print("--------------------------\n")
-
-    return float(final_prediction[0])
\ No newline at end of file
+    logger.debug(
+        "LSTM predictions %s, XGBoost predictions %s, combined predictions %s",
+        lstm_final_preds, xgb_final_preds, predictions
+    )
+
+    return predictions
+
+def _predict_per_ticker(df: pd.DataFrame, df_features: pd.DataFrame, code: str, years: int,
+                        incremental: bool, parallel: bool, budget: TrainingBudget) -> dict:
+    """종목별 스태킹 모델로 예측합니다. (캐시된 모델이 있으면 추론만, 없으면 예산 안에서 학습)"""
+    with stage("feature_build"):
+        df_train = _training_rows(df_features)
+
+    cache_key = None
+    if code is not None and years is not None:
+        cache_key = make_model_key(code, years, df.index[-1], MODEL_VERSION)
+        with stage("model_load"):
+            models = model_registry.load(cache_key)
+        if models is not None:
+            logger.info("Using cached models for %s", cache_key)
+            return {
+                "predictions": _predict_with_models(models, df, df_features),
+                "training": {"mode": "cached", "budget_seconds": budget.seconds,
+                             "elapsed_seconds": round(budget.elapsed(), 3)},
+            }
+
+    base_models, base_entry = (None, None)
+    if cache_key is not None and incremental:
+        base_models, base_entry = _find_warm_start_base(code, years, df)
+
+    last_date_str = df.index[-1].strftime('%Y-%m-%d')
+    executor = get_training_pool() if parallel else None
+
+    if base_models is not None:
+        logger.info("Warm-starting models for %s from %s", cache_key, base_entry['last_date'])
+        warm_starts = base_entry.get('warm_starts', 0) + 1
+        full_trained_date = base_entry.get('full_trained_date', base_entry['last_date'])
+    else:
+        warm_starts = 0
+        full_trained_date = last_date_str
+    models = _train_stacking_models(df, df_train, base_models=base_models, executor=executor, budget=budget)
+    mode = models['training']['mode']
+
+    if cache_key is not None and mode not in DEGRADED_MODES:
+        try:
+            with stage("model_save"):
+                model_registry.save(cache_key, models, {
+                    'code': code, 'years': years, 'last_date': last_date_str, 'version': MODEL_VERSION,
+                    'warm_starts': warm_starts, 'full_trained_date': full_trained_date,
+                })
+        except Exception as e:
+            logger.warning("Failed to cache models for %s: %s", cache_key, e)
+    elif mode in DEGRADED_MODES:
+        logger.info("Trained %s in %s mode within a %ss budget; not caching.", cache_key or "models", mode, budget.seconds)
+
+    predictions = _predict_with_models(models, df, df_features)
+    training = dict(models['training'], budget_seconds=budget.seconds, elapsed_seconds=round(budget.elapsed(), 3))
+    return {"predictions": predictions, "training": training}
+
+def _timed(fn, *args) -> tuple:
+    """fn(*args)의 (결과, 경과 시간(초), 이 프로세스의 CPU 시간(초))을 반환합니다."""
+    wall_start, cpu_start = time.perf_counter(), time.process_time()
+    result = fn(*args)
+    return result, round(time.perf_counter() - wall_start, 3), round(time.process_time() - cpu_start, 3)
+
+def predict_price_horizons_stacking_hybrid(historical_data, code: str = None, years: int = None,
+                                           incremental: bool = True, parallel: bool = None,
+                                           budget_seconds: float = None, model: str = None,
+                                           market: str = "domestic") -> dict:
+    """
+    스태킹(Stacking) 하이브리드 모델을 사용하여 예측 기간(HORIZONS, 거래일)별 종가를 예측합니다.
+    1. LSTM과 XGBoost를 1차 모델로 사용하여 각각 모든 기간의 예측을 한 번에 생성합니다.
+    2. 기간마다 두 모델의 예측 결과를 입력으로 받아 최종 예측을 생성하는 2차 모델(메타 모델)을 학습시킵니다.
+
+    반환값은 {"predictions": {기간: 예측 종가}, "training": 학습 보고}입니다. (기간 1은 다음 거래일)
+    학습 보고의 mode는 cached, full, warm_start, reduced, xgboost_only, global 중 하나이며, 학습했다면
+    단계별 LSTM epoch 수/XGBoost 트리 수와 예산, 소요 시간이 함께 들어 있습니다.
+
+    code와 years가 주어지면 (종목 코드, 기간, 마지막 봉 날짜, 모델 버전) 단위로 학습된 모델을
+    디스크에 캐시하고, 같은 조건의 재요청에는 학습 없이 추론만 수행합니다. 예산 때문에 줄여서 학습한
+    모델(reduced, xgboost_only)은 캐시하지 않으므로 다음 요청에서 다시 학습합니다.
+    incremental이 True이면 같은 종목/기간의 직전 모델이 있을 때 처음부터 학습하지 않고
+    이어서 학습(warm start)하며, 정해진 주기나 드리프트 감지 시에는 전체 재학습으로 되돌아갑니다.
+    parallel이 True이면 서로 독립적인 1차 모델 학습을 프로세스 풀에서 동시에 실행합니다.
+    (None이면 PREDICTIBOOT_PARALLEL_TRAINING 설정을 따릅니다.)
+    budget_seconds는 이 예측의 학습 시간 예산입니다. (None이면 PREDICTIBOOT_TRAINING_BUDGET_SECONDS, 0이면 제한 없음)
+
+    model은 per_ticker(위의 종목별 모델), global(전 종목으로 미리 학습한 공통 모델로 추론만 수행, 공통 모델이
+    없으면 종목별 모델로 대신 예측), compare(둘 다 실행) 중 하나입니다. (None이면 PREDICTIBOOT_PREDICTION_MODEL)
+    compare는 종목별 모델의 결과를 반환하면서 "comparison"에 모델별 예측과 경과 시간/CPU 시간을 함께 담습니다.
+    CPU 시간을 같은 기준으로 재기 위해 compare에서는 종목별 모델도 이 프로세스에서 순차 학습합니다.
+    market(domestic, international)은 code의 지표를 저장할 지표 저장소를 고릅니다.
+    """
+    if market not in FEATURE_MARKETS:
+        raise ValueError(f"Unknown market '{market}' (expected one of {', '.join(FEATURE_MARKETS)}).")
+    if model is None:
+        model = PREDICTION_MODEL
+    if model not in PREDICTION_MODELS:
+        raise ValueError(f"Unknown prediction model '{model}' (expected one of {', '.join(PREDICTION_MODELS)}).")
+    if budget_seconds is None:
+        budget_seconds = TRAINING_BUDGET_SECONDS
+    if model == "compare":
+        parallel = False
+    elif parallel is None:
+        parallel = PARALLEL_TRAINING
+
+    with stage("data_clean"):
+        df = _prepare_dataframe(historical_data)
+
+    # --- XGBoost 모델을 위한 피처 생성 (공통 모델도 같은 지표를 정규화해 사용) ---
+    with stage("feature_build"):
+        df_features = _create_features(df, code, market)
+
+    global_result, global_error = None, None
+    if model in ("global", "compare"):
+        try:
+            global_result, global_seconds, global_cpu_seconds = _timed(predict_with_global_model, df, df_features)
+        except GlobalModelUnavailableError as e:
+            global_error = str(e)
+            logger.warning("Global model unavailable, using the per-ticker model: %s", e)
+    if model == "global" and global_result is not None:
+        global_result["training"]["elapsed_seconds"] = global_seconds
+        return global_result
+
+    budget = TrainingBudget(budget_seconds, parallel=parallel)
+    result, per_ticker_seconds, per_ticker_cpu_seconds = _timed(
+        _predict_per_ticker, df, df_features, code, years, incremental, parallel, budget
+    )
+    if global_error is not None:
+        result["training"]["global_model_error"] = global_error
+    if model == "compare":
+        result["comparison"] = {
+            "per_ticker": {"predictions": result["predictions"], "mode": result["training"]["mode"],
+                           "elapsed_seconds": per_ticker_seconds, "cpu_seconds": per_ticker_cpu_seconds},
+            "global": {"error": global_error} if global_result is None else {
+                "predictions": global_result["predictions"], "trained_at": global_result["training"]["trained_at"],
+                "elapsed_seconds": global_seconds, "cpu_seconds": global_cpu_seconds,
+            },
+        }
+    return result
+
+def predict_next_day_price_stacking_hybrid(historical_data, code: str = None, years: int = None,
+                                            incremental: bool = True, parallel: bool = None,
+                                            budget_seconds: float = None, model: str = None,
+                                            market: str = "domestic") -> float:
+    """
+    스태킹 하이브리드 모델로 다음 거래일의 종가를 예측합니다.
+    predict_price_horizons_stacking_hybrid와 같은 모델(캐시, 공통 모델 포함)을 사용하며, 1일 예측만 반환합니다.
+    model이 global이면 학습 없이 공통 모델을 불러와 추론만 수행합니다.
+    """
+    return predict_price_horizons_stacking_hybrid(
+        historical_data, code=code, years=years, incremental=incremental, parallel=parallel,
+        budget_seconds=budget_seconds, model=model, market=market
+    )["predictions"][1]
@@ -1,36 +1,26 @@
+import logging
 
-from pykrx import stock
-import pandas as pd
+from .ticker_index import ticker_index
+
+logger = logging.getLogger(__name__)
 
 def find_stock_code(query: str) -> list:
     """
     회사 이름으로 종목 코드를 검색합니다.
 
     Args:
-        query: 검색할 회사 이름 (일부만 입력해도 가능)
+        query: 검색할 회사 이름 (일부만 입력하거나 초성만 입력해도 가능)
 
     Returns:
-        검색된 종목 리스트 ([{'code': '005930', 'name': '삼성전자'}, ...])
+        검색된 종목 리스트 ([{'code': '005930', 'name': '삼성전자', 'market': 'KOSPI'}, ...])
     """
     try:
-        # KOSPI와 KOSDAQ의 모든 종목 티커를 가져옵니다.
-        tickers_kospi = stock.get_market_ticker_list(market="KOSPI")
-        tickers_kosdaq = stock.get_market_ticker_list(market="KOSDAQ")
-        all_tickers = tickers_kospi + tickers_kosdaq
-
-        results = []
-        for ticker in all_tickers:
-            name = stock.get_market_ticker_name(ticker)
-            if query.lower() in name.lower():
-                results.append({
-                    "code": ticker,
-                    "name": name
-                })
-        
-        return results
+        # 거래일마다 한 번 만들어 두는 메모리 인덱스에서 검색합니다.
+        # (이름 부분/접두 일치와 초성 검색 지원, 예: 'ㅅㅅㅈㅈ')
+        return ticker_index.search(query)
 
     except Exception as e:
-        print(f"Error finding stock code: {e}")
+        logger.warning("Error finding stock code: %s", e)
         return []
 
 if __name__ == '__main__':
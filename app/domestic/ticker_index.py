@@ -0,0 +1,175 @@
+import os
+import logging
+import json
+import datetime
+import threading
+import time
+
+import pytz
+
+from ..timing import stage
+from ..engines import load_engine
+from ..config import TICKER_INDEX_DIR, TICKER_INDEX_RETRY_SECONDS
+
+logger = logging.getLogger(__name__)
+
+_CHOSUNG = [
+    'ㄱ', 'ㄲ', 'ㄴ', 'ㄷ', 'ㄸ', 'ㄹ', 'ㅁ', 'ㅂ', 'ㅃ', 'ㅅ',
+    'ㅆ', 'ㅇ', 'ㅈ', 'ㅉ', 'ㅊ', 'ㅋ', 'ㅌ', 'ㅍ', 'ㅎ'
+]
+_CHOSUNG_SET = set(_CHOSUNG)
+_MARKETS = ("KOSPI", "KOSDAQ")
+
+
+def to_chosung(text: str) -> str:
+    """한글 음절을 초성으로 바꿉니다. (예: '삼성전자' -> 'ㅅㅅㅈㅈ') 한글이 아닌 문자는 소문자로 유지합니다."""
+    result = []
+    for ch in text:
+        code = ord(ch) - 0xAC00
+        if 0 <= code < 11172:
+            result.append(_CHOSUNG[code // 588])
+        else:
+            result.append(ch.lower())
+    return ''.join(result)
+
+
+def _is_chosung_query(query: str) -> bool:
+    return any(ch in _CHOSUNG_SET for ch in query) and all(ch in _CHOSUNG_SET or ch.isspace() for ch in query)
+
+
+def _today_kst() -> str:
+    return datetime.datetime.now(pytz.timezone('Asia/Seoul')).strftime('%Y%m%d')
+
+
+class TickerIndex:
+    """
+    KOSPI/KOSDAQ 전 종목의 (코드, 이름, 시장) 목록을 메모리에 보관하는 검색 인덱스입니다.
+    거래일(KST 날짜)마다 한 번 pykrx로 다시 만들고, 만든 결과는 디스크에도 저장해 재시작 시 바로 불러옵니다.
+    다시 만들지 못하면 retry_seconds 동안은 이전 인덱스로 응답하고 그 뒤에 다시 시도합니다.
+    """
+
+    def __init__(self, root: str, retry_seconds: float = TICKER_INDEX_RETRY_SECONDS):
+        self.root = root
+        self.retry_seconds = retry_seconds
+        self._lock = threading.Lock()
+        self._built_date = None
+        self._retry_at = 0.0  # 마지막 빌드 실패 후 다시 시도할 시각 (time.monotonic 기준)
+        self._entries = []  # (code, name, market, 소문자 이름, 초성)
+        self._by_code = {}
+
+    def _path(self) -> str:
+        return os.path.join(self.root, "tickers.json")
+
+    def _load_entries(self, rows: list):
+        self._entries = [
+            (row['code'], row['name'], row['market'], row['name'].lower(), to_chosung(row['name']))
+            for row in rows
+        ]
+        self._by_code = {entry[0]: entry for entry in self._entries}
+
+    def _build(self, date_str: str) -> list:
+        stock = load_engine("pykrx")
+        rows = []
+        for market in _MARKETS:
+            for ticker in stock.get_market_ticker_list(date_str, market=market):
+                rows.append({'code': ticker, 'name': stock.get_market_ticker_name(ticker), 'market': market})
+        return rows
+
+    def _backing_off(self) -> bool:
+        """빌드 실패 후 재시도 대기 중이라 이전 인덱스를 그대로 쓰는지 반환합니다."""
+        return bool(self._entries) and time.monotonic() < self._retry_at
+
+    def is_fresh(self) -> bool:
+        """
+        검색 시 인덱스를 새로 만들 필요가 없는지 반환합니다.
+        (오늘 날짜의 인덱스가 메모리에 있거나, 빌드 실패 후 재시도 대기 중이라 이전 인덱스를 쓰는 경우)
+        """
+        return self._built_date == _today_kst() or self._backing_off()
+
+    def ensure_fresh(self):
+        """오늘 날짜의 인덱스가 메모리에 없으면 디스크에서 불러오거나 새로 만듭니다."""
+        today = _today_kst()
+        if self._built_date == today or self._backing_off():
+            return
+        with self._lock:
+            if self._built_date == today or self._backing_off():
+                return
+            try:
+                with open(self._path(), encoding='utf-8') as f:
+                    saved = json.load(f)
+                if saved.get('date') == today:
+                    self._load_entries(saved['tickers'])
+                    self._built_date = today
+                    return
+            except (OSError, ValueError, KeyError):
+                pass
+
+            logger.info("Building ticker index for %s", today)
+            try:
+                with stage("ticker_index_build"):
+                    rows = self._build(today)
+            except Exception as e:
+                # 업스트림 실패 시 이전 인덱스가 있으면 재시도 시각까지 그대로 사용
+                if self._entries:
+                    self._retry_at = time.monotonic() + self.retry_seconds
+                    logger.warning("Failed to build ticker index, serving the previous one for %.0f seconds: %s",
+                                   self.retry_seconds, e)
+                    return
+                logger.warning("Failed to build ticker index: %s", e)
+                raise
+            self._load_entries(rows)
+            self._built_date = today
+
+            os.makedirs(self.root, exist_ok=True)
+            with open(self._path() + ".tmp", 'w', encoding='utf-8') as f:
+                json.dump({'date': today, 'tickers': rows}, f, ensure_ascii=False)
+            os.replace(self._path() + ".tmp", self._path())
+
+    def search(self, query: str, limit: int = None) -> list:
+        """
+        이름 부분 일치, 이름/코드 접두 일치, 초성 검색(예: 'ㅅㅅㅈㅈ')을 지원합니다.
+        정확히 일치 > 접두 일치 > 부분 일치 순으로 정렬합니다.
+        """
+        self.ensure_fresh()
+        query = query.strip()
+        if not query:
+            return []
+
+        if _is_chosung_query(query):
+            needle = query.replace(' ', '')
+            field = 4
+        else:
+            needle = query.lower()
+            field = 3
+
+        matches = []
+        for entry in self._entries:
+            haystack = entry[field]
+            if haystack == needle or entry[0] == needle:
+                rank = 0
+            elif haystack.startswith(needle) or entry[0].startswith(needle):
+                rank = 1
+            elif needle in haystack:
+                rank = 2
+            else:
+                continue
+            matches.append((rank, entry[1], entry))
+
+        matches.sort(key=lambda m: (m[0], m[1]))
+        if limit is not None:
+            matches = matches[:limit]
+        return [{"code": entry[0], "name": entry[1], "market": entry[2]} for _, _, entry in matches]
+
+    def codes(self) -> list:
+        """인덱스에 있는 전 종목 코드를 반환합니다."""
+        self.ensure_fresh()
+        return [entry[0] for entry in self._entries]
+
+    def get_name(self, code: str):
+        """종목 코드로 이름을 찾습니다. 없으면 None을 반환합니다."""
+        self.ensure_fresh()
+        entry = self._by_code.get(code)
+        return entry[1] if entry else None
+
+
+ticker_index = TickerIndex(TICKER_INDEX_DIR)
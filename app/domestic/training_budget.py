@@ -0,0 +1,102 @@
+import time
+import threading
+
+from ..config import TRAINING_BUDGET_RESERVE_FRACTION, LSTM_MIN_EPOCHS
+
+# 예산 모드
+# - full: 처음부터 전체 학습 / warm_start: 직전 모델에서 이어서 학습 (둘 다 조기 종료 적용)
+# - reduced: 예산에 맞춰 epoch 수와 LSTM 크기를 줄이거나, 학습 중 마감 시각에 걸려 일찍 멈춘 경우
+# - xgboost_only: LSTM을 학습할 시간이 없어 XGBoost만 사용
+# - cached: 같은 조건의 캐시된 모델로 추론만 수행
+DEGRADED_MODES = ('reduced', 'xgboost_only')
+
+# 순차 학습(프로세스 풀 없음) 시 1차 모델 학습 순서와, 사용 가능한 시간 중 각 단계까지의 누적 비율
+_SEQUENTIAL_DEADLINES = {'lstm_meta': 0.4, 'xgb_meta': 0.45, 'lstm': 0.95, 'xgb': 1.0}
+_SEQUENTIAL_LSTM_SHARE = 0.4
+# 검증 구간으로 epoch 수를 고르는 학습과, 고른 epoch 수로 전체 데이터를 다시 학습하는 학습이 시간을 나눠 씁니다.
+_REFIT_SHARE = 0.5
+
+
+class EpochCostEstimator:
+    """
+    LSTM 학습 시간을 (고정 비용 + epoch 수 × epoch 시간)으로 보고, 최근 학습 결과의 지수 이동 평균으로 추정합니다.
+    첫 epoch에는 그래프 생성 같은 고정 비용이 들어가므로 둘째 epoch부터의 평균을 epoch 시간으로 쓰고
+    (학습 샘플 수에 비례), 첫 epoch에서 이를 뺀 값을 고정 비용으로 씁니다.
+    프로세스마다 따로 추정하며, 아직 두 epoch 이상 학습한 적이 없으면 추정하지 않습니다.
+    """
+
+    def __init__(self, alpha: float = 0.3):
+        self.alpha = alpha
+        self._seconds_per_sample = None
+        self._overhead_seconds = None
+        self._lock = threading.Lock()
+
+    def observe(self, samples: int, epoch_seconds: list):
+        if samples <= 0 or len(epoch_seconds) < 2:
+            return
+        per_epoch = sum(epoch_seconds[1:]) / (len(epoch_seconds) - 1)
+        per_sample, overhead = per_epoch / samples, max(0.0, epoch_seconds[0] - per_epoch)
+        with self._lock:
+            if self._seconds_per_sample is None:
+                self._seconds_per_sample, self._overhead_seconds = per_sample, overhead
+            else:
+                self._seconds_per_sample += self.alpha * (per_sample - self._seconds_per_sample)
+                self._overhead_seconds += self.alpha * (overhead - self._overhead_seconds)
+
+    def affordable_epochs(self, samples: int, seconds: float):
+        """seconds 안에 학습할 수 있는 epoch 수를 추정합니다. 추정할 수 없으면 None."""
+        with self._lock:
+            if self._seconds_per_sample is None:
+                return None
+            return max(0, int((seconds - self._overhead_seconds) / (self._seconds_per_sample * samples)))
+
+
+lstm_epoch_cost = EpochCostEstimator()
+
+
+class TrainingBudget:
+    """
+    예측 한 번의 학습 시간 예산입니다. (seconds가 None이나 0이면 제한 없음)
+    마감 시각은 time.time() 기준이므로 프로세스 풀의 워커에도 그대로 넘겨 사용할 수 있습니다.
+
+    예산 중 reserve_fraction은 메타 모델 학습/예측/저장을 위해 남겨 두고, 나머지를 1차 모델 학습에 씁니다.
+    병렬 학습이면 네 학습이 모두 같은 마감 시각을 쓰고, 순차 학습이면 학습 순서대로 누적 마감 시각을 나눠
+    앞 단계가 남긴 시간은 뒤 단계가 쓸 수 있게 합니다.
+    """
+
+    def __init__(self, seconds: float = None, parallel: bool = False,
+                 reserve_fraction: float = TRAINING_BUDGET_RESERVE_FRACTION):
+        self.seconds = seconds or None
+        self.parallel = parallel
+        self.started = time.time()
+        self.usable = self.seconds * (1 - reserve_fraction) if self.seconds else None
+
+    def elapsed(self) -> float:
+        return time.time() - self.started
+
+    def stage_deadline(self, stage: str):
+        """1차 모델 학습 단계(lstm_meta, xgb_meta, lstm, xgb)의 마감 시각을 반환합니다. 제한이 없으면 None."""
+        if self.usable is None:
+            return None
+        share = 1.0 if self.parallel else _SEQUENTIAL_DEADLINES[stage]
+        return self.started + self.usable * share
+
+    def plan(self, lstm_samples: int, max_epochs: int, warm: bool) -> dict:
+        """
+        학습 전에 모드와 LSTM epoch 상한을 정합니다. LSTM 한 번의 학습에 쓸 수 있는 시간 안에 최대 epoch을
+        다 돌 수 있으면 full(warm_start), LSTM_MIN_EPOCHS 이상이면 reduced, 그보다 적으면 xgboost_only입니다.
+        LSTM은 검증 구간으로 epoch 수를 고른 뒤 같은 epoch 수 이하로 전체 데이터에서 다시 학습하므로,
+        쓸 수 있는 시간의 절반을 기준으로 epoch 수를 정합니다.
+        학습 시간을 아직 추정할 수 없으면 최대 epoch으로 시작하고 마감 시각에서 멈춥니다.
+        """
+        mode = 'warm_start' if warm else 'full'
+        if self.usable is None:
+            return {'mode': mode, 'lstm_epochs': max_epochs}
+
+        lstm_seconds = self.usable * (1.0 if self.parallel else _SEQUENTIAL_LSTM_SHARE)
+        affordable = lstm_epoch_cost.affordable_epochs(lstm_samples, lstm_seconds * _REFIT_SHARE)
+        if affordable is None or affordable >= max_epochs:
+            return {'mode': mode, 'lstm_epochs': max_epochs}
+        if affordable >= min(LSTM_MIN_EPOCHS, max_epochs):
+            return {'mode': 'reduced', 'lstm_epochs': affordable}
+        return {'mode': 'xgboost_only', 'lstm_epochs': 0}
@@ -0,0 +1,62 @@
+import time
+import logging
+import threading
+import importlib
+
+from .timing import stage
+
+logger = logging.getLogger(__name__)
+
+# 무거운 의존성(엔진) 이름 -> 모듈. 서버 시작 시에는 불러오지 않고, 처음 사용할 때나 백그라운드 워밍업에서 불러옵니다.
+ENGINES = {
+    "predictor": "app.domestic.predictor",  # TensorFlow, XGBoost, scikit-learn 포함
+    "pykrx": "pykrx.stock",
+    "bs4": "bs4",
+    "yfinance": "yfinance",
+}
+
+_locks = {name: threading.Lock() for name in ENGINES}
+_status = {name: {"status": "not_loaded", "seconds": None, "error": None} for name in ENGINES}
+_warmup_thread = None
+
+
+def load_engine(name: str):
+    """엔진 모듈을 반환합니다. 아직 불러오지 않았다면 지금 불러옵니다. (여러 스레드에서 동시에 불러도 한 번만 import)"""
+    with _locks[name]:
+        if _status[name]["status"] != "loaded":
+            _status[name].update(status="loading", error=None)
+            start = time.perf_counter()
+            try:
+                with stage(f"load_{name}"):
+                    importlib.import_module(ENGINES[name])
+            except Exception as e:
+                _status[name].update(status="failed", error=str(e))
+                raise
+            _status[name].update(status="loaded", seconds=round(time.perf_counter() - start, 3))
+            logger.info("Loaded engine %s in %.2fs", name, _status[name]["seconds"])
+    return importlib.import_module(ENGINES[name])
+
+
+def engine_status() -> dict:
+    return {name: dict(state) for name, state in _status.items()}
+
+
+def is_loaded(names) -> bool:
+    return all(_status[name]["status"] == "loaded" for name in names)
+
+
+def start_warmup(names: list):
+    """주어진 엔진들을 데몬 스레드에서 차례로 불러옵니다. 실패한 엔진은 처음 사용할 때 다시 시도합니다."""
+    global _warmup_thread
+    if not names or _warmup_thread is not None:
+        return
+
+    def warmup():
+        for name in names:
+            try:
+                load_engine(name)
+            except Exception as e:
+                logger.warning("Warm-up of engine %s failed: %s", name, e)
+
+    _warmup_thread = threading.Thread(target=warmup, name="engine-warmup", daemon=True)
+    _warmup_thread.start()
@@ -0,0 +1,48 @@
+import datetime
+
+# 국내/해외 예측 응답이 함께 쓰는 날짜 계산과 기간별 예측(forecasts) 형식입니다.
+# 거래일은 주말만 건너뛰어 계산합니다. (공휴일은 고려하지 않음)
+
+
+def next_business_day(date: datetime.date) -> datetime.date:
+    """date 다음 평일을 반환합니다."""
+    target = date + datetime.timedelta(days=1)
+    while target.weekday() >= 5:  # 5: 토요일, 6: 일요일
+        target += datetime.timedelta(days=1)
+    return target
+
+
+def business_days_after(date: datetime.date, days: int) -> datetime.date:
+    """date로부터 days 거래일 뒤의 날짜를 반환합니다."""
+    for _ in range(days):
+        date = next_business_day(date)
+    return date
+
+
+def change_pct(predicted_price: float, latest_closing_price: float):
+    """최신 종가 대비 예측 종가의 등락률(%)을 반환합니다. 최신 종가가 0 이하이면 None입니다."""
+    if latest_closing_price <= 0:
+        return None
+    return ((predicted_price / latest_closing_price) - 1) * 100
+
+
+def change_suffix(predicted_price: float, latest_closing_price: float) -> str:
+    """예측 메시지 끝에 붙는 ' (최신 종가 대비 +1.23%)' 문구입니다. 등락률을 계산할 수 없으면 빈 문자열입니다."""
+    percentage_change = change_pct(predicted_price, latest_closing_price)
+    if percentage_change is None:
+        return ""
+    sign = "+" if percentage_change >= 0 else ""
+    return f" (최신 종가 대비 {sign}{percentage_change:.2f}%)"
+
+
+def format_forecasts(last_data_date: datetime.date, latest_closing_price: float, predictions: dict) -> list:
+    """예측 기간(마지막 봉 이후 거래일 수)마다 대상 날짜, 예측 종가, 등락률을 담은 항목 목록을 반환합니다."""
+    return [
+        {
+            "horizon_days": horizon,
+            "target_date": business_days_after(last_data_date, horizon).isoformat(),
+            "predicted_price": predicted_price,
+            "change_pct": change_pct(predicted_price, latest_closing_price),
+        }
+        for horizon, predicted_price in sorted(predictions.items())
+    ]
@@ -0,0 +1,103 @@
+import asyncio
+import threading
+from urllib.parse import urlsplit
+
+import httpx
+import requests
+from requests.adapters import HTTPAdapter
+
+from .timing import stage
+from .config import (
+    HTTP_TIMEOUT_SECONDS, HTTP_CONNECT_TIMEOUT_SECONDS, HTTP_MAX_CONNECTIONS,
+    HTTP_MAX_KEEPALIVE_CONNECTIONS, HTTP_PER_HOST_CONCURRENCY, KRX_CONCURRENCY
+)
+
+USER_AGENT = 'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/108.0.0.0 Safari/537.36'
+DEFAULT_HEADERS = {'User-Agent': USER_AGENT}
+
+# --- 비동기 클라이언트 (라우터/크롤러 공용) ---
+_async_client = None
+_host_semaphores = {}
+_krx_semaphore = None
+
+
+def get_async_client() -> httpx.AsyncClient:
+    """keep-alive 연결을 재사용하는 공용 비동기 HTTP 클라이언트를 반환합니다."""
+    global _async_client
+    if _async_client is None or _async_client.is_closed:
+        _async_client = httpx.AsyncClient(
+            headers=DEFAULT_HEADERS,
+            timeout=httpx.Timeout(HTTP_TIMEOUT_SECONDS, connect=HTTP_CONNECT_TIMEOUT_SECONDS),
+            limits=httpx.Limits(
+                max_connections=HTTP_MAX_CONNECTIONS,
+                max_keepalive_connections=HTTP_MAX_KEEPALIVE_CONNECTIONS,
+            ),
+            follow_redirects=True,
+        )
+    return _async_client
+
+
+def _host_semaphore(url: str) -> asyncio.Semaphore:
+    host = urlsplit(url).netloc
+    if host not in _host_semaphores:
+        _host_semaphores[host] = asyncio.Semaphore(HTTP_PER_HOST_CONCURRENCY)
+    return _host_semaphores[host]
+
+
+async def fetch_text(url: str, headers: dict = None, params: dict = None) -> str:
+    """
+    공용 클라이언트로 GET 요청을 보내고 본문을 반환합니다.
+    같은 호스트에 대한 동시 요청 수는 HTTP_PER_HOST_CONCURRENCY로 제한됩니다.
+    """
+    async with _host_semaphore(url):
+        with stage("upstream_fetch"):
+            response = await get_async_client().get(url, headers=headers, params=params)
+    response.raise_for_status()
+    return response.text
+
+
+async def run_krx(func, *args, **kwargs):
+    """
+    pykrx 호출(동기 I/O)을 스레드에서 실행하여 이벤트 루프를 막지 않도록 합니다.
+    KRX에 대한 동시 호출 수는 KRX_CONCURRENCY로 제한됩니다.
+    """
+    global _krx_semaphore
+    if _krx_semaphore is None:
+        _krx_semaphore = asyncio.Semaphore(KRX_CONCURRENCY)
+    async with _krx_semaphore:
+        return await asyncio.to_thread(func, *args, **kwargs)
+
+
+async def close_async_client():
+    global _async_client
+    if _async_client is not None:
+        await _async_client.aclose()
+        _async_client = None
+    _host_semaphores.clear()
+
+
+# --- 동기 세션 (스레드/백그라운드 작업용) ---
+_thread_local = threading.local()
+
+
+def get_session() -> requests.Session:
+    """스레드별로 keep-alive 연결을 재사용하는 requests 세션을 반환합니다."""
+    session = getattr(_thread_local, 'session', None)
+    if session is None:
+        session = requests.Session()
+        session.headers.update(DEFAULT_HEADERS)
+        adapter = HTTPAdapter(pool_connections=HTTP_PER_HOST_CONCURRENCY, pool_maxsize=HTTP_PER_HOST_CONCURRENCY)
+        session.mount('http://', adapter)
+        session.mount('https://', adapter)
+        _thread_local.session = session
+    return session
+
+
+def get_text(url: str, headers: dict = None, params: dict = None) -> str:
+    """동기 GET 요청. 항상 타임아웃을 적용합니다."""
+    with stage("upstream_fetch"):
+        response = get_session().get(
+            url, headers=headers, params=params, timeout=(HTTP_CONNECT_TIMEOUT_SECONDS, HTTP_TIMEOUT_SECONDS)
+        )
+    response.raise_for_status()
+    return response.text
@@ -1,20 +1,32 @@
-import yfinance as yf
+import os
+import logging
+import datetime
+
 import pandas as pd
 
-def get_historical_data_international(ticker: str, period: str = "1y"):
+from ..domestic.ohlcv_store import OHLCVStore, OHLCV_COLUMNS
+from ..engines import load_engine
+from ..config import OHLCV_STORE_DIR, OHLCV_STORE_MIN_YEARS, OHLCV_STORE_SYNC_TTL_SECONDS
+
+logger = logging.getLogger(__name__)
+
+# 구간 첫날의 등락률을 계산하기 위해 요청 시작일보다 앞서 받아 오는 기간
+_CHANGE_LOOKBACK_DAYS = 10
+
+def get_historical_frame_international(ticker: str, period: str = "1y"):
     """
-    Yahoo Finance에서 외국 주식의 과거 데이터를 가져옵니다.
+    Yahoo Finance에서 외국 주식의 과거 데이터를 데이터프레임으로 가져옵니다.
 
     Args:
         ticker (str): 주식 티커 (예: 'AAPL', 'MSFT')
         period (str): 데이터 기간 (예: '1d', '5d', '1mo', '3mo', '6mo', '1y', '2y', '5y', '10y', 'ytd', 'max')
 
     Returns:
-        list: 과거 데이터 리스트 (딕셔너리 형태) 또는 에러 딕셔너리
+        DataFrame: date, open, high, low, close, volume 컬럼의 데이터프레임 또는 에러 딕셔너리
     """
     try:
         # yfinance를 사용하여 데이터 다운로드
-        stock = yf.Ticker(ticker)
+        stock = load_engine("yfinance").Ticker(ticker)
         hist = stock.history(period=period)
 
         if hist.empty:
@@ -23,14 +35,74 @@ def get_historical_data_international(ticker: str, period: str = "1y"):
         # 필요한 컬럼만 선택하고 이름 변경
         hist = hist.reset_index()
         hist.columns = hist.columns.str.lower() # 컬럼명을 소문자로 변경
-        
-        # 필요한 컬럼만 선택
-        df = hist[['date', 'open', 'high', 'low', 'close', 'volume']]
-        
-        # 날짜 형식을 YYYY-MM-DD로 통일
-        df['date'] = df['date'].dt.strftime('%Y-%m-%d')
 
-        return df.to_dict(orient='records')
+        # 필요한 컬럼만 선택
+        return hist[['date', 'open', 'high', 'low', 'close', 'volume']]
 
     except Exception as e:
         return {"error": f"Failed to fetch data for {ticker}: {e}"}
+
+def _normalize_yfinance_frame(df: pd.DataFrame, start: pd.Timestamp) -> pd.DataFrame:
+    """yfinance 일봉을 국내 종목과 같은 OHLCV 스키마(OHLCV_COLUMNS, 'date' 인덱스)로 변환합니다."""
+    df = df.dropna(subset=['Close'])
+    frame = pd.DataFrame({
+        'closing_price': df['Close'],
+        'change': df['Close'].pct_change() * 100,  # 등락률(%)
+        'opening_price': df['Open'],
+        'high_price': df['High'],
+        'low_price': df['Low'],
+        'volume': df['Volume'],
+    })[OHLCV_COLUMNS]
+    frame.index = pd.to_datetime(frame.index)
+    if frame.index.tz is not None:
+        frame.index = frame.index.tz_localize(None)
+    frame.index.name = 'date'
+    return frame[frame.index >= start]
+
+def _fetch_yfinance_ohlcv_many(tickers: list, start_date_str: str, end_date_str: str) -> dict:
+    """
+    여러 티커의 일봉을 yfinance 묶음 요청 한 번으로 받아 {ticker: DataFrame}으로 반환합니다.
+    데이터가 없는 티커는 결과에서 빠집니다.
+    저장소에 나눠 받은 구간을 이어 붙이므로 배당/분할 조정 전 가격(auto_adjust=False)을 사용합니다.
+    """
+    start = pd.Timestamp(start_date_str)
+    data = load_engine("yfinance").download(
+        tickers,
+        start=(start - datetime.timedelta(days=_CHANGE_LOOKBACK_DAYS)).strftime('%Y-%m-%d'),
+        # yfinance의 end는 해당 날짜를 포함하지 않음
+        end=(pd.Timestamp(end_date_str) + datetime.timedelta(days=1)).strftime('%Y-%m-%d'),
+        group_by='ticker', auto_adjust=False, progress=False, threads=True,
+    )
+    if data is None or data.empty:
+        return {}
+    if not isinstance(data.columns, pd.MultiIndex):
+        data = pd.concat({tickers[0]: data}, axis=1)
+
+    frames = {}
+    for ticker in tickers:
+        if ticker not in data.columns.get_level_values(0):
+            continue
+        frame = _normalize_yfinance_frame(data[ticker], start)
+        if not frame.empty:
+            frames[ticker] = frame
+    return frames
+
+def _fetch_yfinance_ohlcv(ticker: str, start_date_str: str, end_date_str: str) -> pd.DataFrame:
+    return _fetch_yfinance_ohlcv_many([ticker], start_date_str, end_date_str).get(ticker)
+
+international_ohlcv_store = OHLCVStore(
+    os.path.join(OHLCV_STORE_DIR, "international"), _fetch_yfinance_ohlcv, OHLCV_STORE_MIN_YEARS,
+    OHLCV_STORE_SYNC_TTL_SECONDS, fetch_many_fn=_fetch_yfinance_ohlcv_many,
+)
+
+def get_historical_frames_international(tickers: list, years: int = 1):
+    """
+    여러 해외 종목의 최근 years년 일봉을 로컬 OHLCV 저장소를 거쳐 가져옵니다.
+    업스트림에서 빠진 구간만 yfinance 묶음 요청으로 받아 오며, 국내 종목과 같은 형식의
+    데이터프레임(날짜 인덱스, OHLCV_COLUMNS)으로 {ticker: DataFrame}을 반환합니다.
+    """
+    try:
+        return international_ohlcv_store.get_many(tickers, years)
+    except Exception as e:
+        logger.warning("An error occurred in get_historical_frames_international: %s", e)
+        return {"error": f"Failed to fetch data for {', '.join(tickers)}: {e}"}
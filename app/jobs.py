@@ -0,0 +1,157 @@
+import time
+import uuid
+import threading
+import contextvars
+from concurrent.futures import ThreadPoolExecutor
+
+from .config import JOB_WORKERS, JOB_MAX_PENDING, JOB_RESULT_TTL_SECONDS
+from .observability import request_id_var, JOBS_FINISHED, JOB_SECONDS
+
+
+class JobQueueFullError(Exception):
+    """대기 중인 작업 수가 한도를 넘었을 때 발생합니다."""
+
+
+class JobCancelledError(Exception):
+    """실행 중인 작업이 취소 요청을 확인하고 중단될 때 발생합니다."""
+
+
+class Job:
+    """
+    백그라운드에서 실행되는 작업 하나의 상태입니다.
+    작업 함수는 update_progress로 진행 상황을 알리고, 단계 사이마다 raise_if_cancelled로 취소 여부를 확인합니다.
+    """
+
+    def __init__(self, kind: str, params: dict):
+        self.id = uuid.uuid4().hex
+        self.kind = kind
+        self.params = params
+        self.request_id = request_id_var.get()  # 작업을 등록한 요청의 ID
+        self.status = "queued"  # queued, running, succeeded, failed, cancelled
+        self.progress = 0.0
+        self.message = "대기 중"
+        self.result = None
+        self.error = None
+        self.created_at = time.time()
+        self.started_at = None
+        self.finished_at = None
+        self.version = 0  # 상태가 바뀔 때마다 증가 (구독자 알림용)
+        self.future = None
+        self._cancel_requested = threading.Event()
+
+    @property
+    def done(self) -> bool:
+        return self.status in ("succeeded", "failed", "cancelled")
+
+    def update_progress(self, progress: float, message: str):
+        self.progress = progress
+        self.message = message
+        self.version += 1
+
+    def raise_if_cancelled(self):
+        if self._cancel_requested.is_set():
+            raise JobCancelledError()
+
+    def to_dict(self) -> dict:
+        return {
+            "job_id": self.id,
+            "kind": self.kind,
+            "params": self.params,
+            "request_id": self.request_id,
+            "status": self.status,
+            "progress": round(self.progress, 3),
+            "message": self.message,
+            "result": self.result,
+            "error": self.error,
+            "created_at": self.created_at,
+            "started_at": self.started_at,
+            "finished_at": self.finished_at,
+        }
+
+
+class JobManager:
+    """
+    작업을 제한된 크기의 스레드 풀에서 실행합니다.
+    대기 중인 작업이 max_pending개를 넘으면 새 작업을 거부하고, 끝난 작업은 result_ttl초 동안만 보관합니다.
+    """
+
+    def __init__(self, max_workers: int, max_pending: int, result_ttl: float):
+        self.max_pending = max_pending
+        self.result_ttl = result_ttl
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="job")
+        self._jobs = {}
+        self._lock = threading.Lock()
+
+    def submit(self, kind: str, params: dict, fn, *args) -> Job:
+        """fn(job, *args)를 백그라운드에서 실행하는 작업을 등록합니다."""
+        with self._lock:
+            self._purge_expired()
+            pending = sum(1 for job in self._jobs.values() if job.status == "queued")
+            if pending >= self.max_pending:
+                raise JobQueueFullError(f"Too many pending jobs ({pending}). Try again later.")
+            job = Job(kind, params)
+            self._jobs[job.id] = job
+            # 요청 ID 등 컨텍스트 변수가 작업 스레드의 로그/지표에도 이어지도록 현재 컨텍스트에서 실행합니다.
+            job.future = self._executor.submit(contextvars.copy_context().run, self._run, job, fn, *args)
+        return job
+
+    def get(self, job_id: str) -> Job:
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    def cancel(self, job_id: str) -> Job:
+        """
+        작업을 취소합니다. 대기 중인 작업은 바로 취소되고,
+        실행 중인 작업은 다음 단계 경계에서 중단됩니다.
+        """
+        job = self.get(job_id)
+        if job is None or job.done:
+            return job
+        job._cancel_requested.set()
+        if job.future.cancel():
+            self._finish(job, "cancelled", message="취소됨")
+        return job
+
+    def shutdown(self):
+        for job in list(self._jobs.values()):
+            if not job.done:
+                job._cancel_requested.set()
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+    def _run(self, job: Job, fn, *args):
+        if job._cancel_requested.is_set():
+            self._finish(job, "cancelled", message="취소됨")
+            return
+        job.status = "running"
+        job.started_at = time.time()
+        job.update_progress(0.0, "실행 중")
+        try:
+            result = fn(job, *args)
+        except JobCancelledError:
+            self._finish(job, "cancelled", message="취소됨")
+        except Exception as e:
+            self._finish(job, "failed", error=getattr(e, "detail", None) or str(e), message="실패")
+        else:
+            self._finish(job, "succeeded", result=result, message="완료")
+
+    def _finish(self, job: Job, status: str, result=None, error=None, message: str = ""):
+        job.status = status
+        job.result = result
+        job.error = error
+        job.finished_at = time.time()
+        job.update_progress(1.0 if status == "succeeded" else job.progress, message)
+        JOBS_FINISHED.labels(job.kind, status).inc()
+        if job.started_at is not None:
+            JOB_SECONDS.labels(job.kind).observe(job.finished_at - job.started_at)
+
+    def _purge_expired(self):
+        now = time.time()
+        expired = [
+            job_id for job_id, job in self._jobs.items()
+            if job.done and now - job.finished_at > self.result_ttl
+        ]
+        for job_id in expired:
+            del self._jobs[job_id]
+
+
+job_manager = JobManager(JOB_WORKERS, JOB_MAX_PENDING, JOB_RESULT_TTL_SECONDS)
@@ -1,43 +1,116 @@
-import openai
+import os
 import sys
+import json
+import time
+import hashlib
+import sqlite3
 import logging
+import threading
+from contextlib import contextmanager
+
+import openai
+
+from .timing import stage
+from .config import LLM_MODEL, LLM_BASE_URL, LLM_TIMEOUT_SECONDS, LLM_CACHE_PATH, LLM_CACHE_TTL_SECONDS
 
 # 강제로 stdout 인코딩을 UTF-8로 설정 (환경 문제 우회용)
 sys.stdout.reconfigure(encoding='utf-8')
 
 logger = logging.getLogger(__name__)
-logger.setLevel(logging.INFO)
-if not logger.handlers: # Ensure a handler is added if not already present
-    handler = logging.StreamHandler()
-    formatter = logging.Formatter('%(asctime)s - %(name)s - %(levelname)s - %(message)s')
-    handler.setFormatter(formatter)
-    logger.addHandler(handler)
 
-def analyze_prediction_with_llm(api_key: str, stock_name: str, prediction_message: str, predicted_price_value: str, news_articles: list):
-    print("--- LLM Analyzer: Function Entry (via print) ---")
-    logger.info("--- LLM Analyzer: Function Entry (via logger) ---")
+_SYSTEM_PROMPT = "당신은 수년간의 경험을 가진 전문 주식 트레이더입니다."
+# 프롬프트 문구를 바꾸면 올려서 이전 캐시 결과를 쓰지 않도록 합니다.
+_PROMPT_VERSION = 1
 
-    print(f"Stock Name: {stock_name}")
-    print(f"Prediction Message: {prediction_message}")
-    print(f"Predicted Price Value: {predicted_price_value}")
-    print(f"Number of News Articles: {len(news_articles)}")
+_clients = {}
+_clients_lock = threading.Lock()
 
-    if not api_key:
-        print("--- LLM Analyzer: Error - API Key not provided (via print) ---")
-        logger.error("--- LLM Analyzer: Error - API Key not provided (via logger) ---")
-        return "오류: OpenAI API 키가 제공되지 않았습니다."
 
-    try:
-        print("--- LLM Analyzer: Initializing OpenAI client (via print) ---")
-        logger.info("--- LLM Analyzer: Initializing OpenAI client (via logger) ---")
-        client = openai.OpenAI(api_key=api_key)
-        print("--- LLM Analyzer: OpenAI client initialized (via print) ---")
-        logger.info("--- LLM Analyzer: OpenAI client initialized (via logger) ---")
-    except Exception as e:
-        print(f"--- LLM Analyzer: Error - Client initialization failed: {e} (via print) ---")
-        logger.error(f"--- LLM Analyzer: Error - Client initialization failed: {e} (via logger) ---")
-        return f"오류: OpenAI 클라이언트 초기화에 실패했습니다. {e}"
+def _get_client(api_key: str) -> openai.OpenAI:
+    """API 키별로 OpenAI 클라이언트(연결 풀 포함)를 한 번만 만들어 재사용합니다."""
+    with _clients_lock:
+        client = _clients.get(api_key)
+        if client is None:
+            logger.info("Initializing OpenAI client")
+            client = openai.OpenAI(api_key=api_key, base_url=LLM_BASE_URL, timeout=LLM_TIMEOUT_SECONDS)
+            _clients[api_key] = client
+        return client
+
 
+class AnalysisCache:
+    """
+    LLM 분석 결과를 입력 내용의 해시로 보관하는 로컬 캐시(SQLite)입니다.
+    종목, 예측 결과, 뉴스 묶음(제목/본문)이 같으면 ttl초 동안 저장된 분석을 그대로 반환합니다.
+    """
+
+    def __init__(self, path: str, ttl: float):
+        self.path = path
+        self.ttl = ttl
+        self._init_lock = threading.Lock()
+        self._initialized = False
+
+    @contextmanager
+    def _connect(self):
+        if not self._initialized:
+            with self._init_lock:
+                if not self._initialized:
+                    os.makedirs(os.path.dirname(self.path), exist_ok=True)
+                    conn = sqlite3.connect(self.path)
+                    try:
+                        conn.execute(
+                            "CREATE TABLE IF NOT EXISTS analyses (key TEXT PRIMARY KEY, result TEXT, created_at REAL)"
+                        )
+                    finally:
+                        conn.close()
+                    self._initialized = True
+        conn = sqlite3.connect(self.path, timeout=5)
+        try:
+            with conn:
+                yield conn
+        finally:
+            conn.close()
+
+    def get(self, key: str):
+        if self.ttl <= 0:
+            return None
+        with self._connect() as conn:
+            row = conn.execute("SELECT result, created_at FROM analyses WHERE key = ?", (key,)).fetchone()
+        if row is None or time.time() - row[1] > self.ttl:
+            return None
+        return row[0]
+
+    def put(self, key: str, result: str):
+        if self.ttl <= 0:
+            return
+        with self._connect() as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO analyses (key, result, created_at) VALUES (?, ?, ?)",
+                (key, result, time.time())
+            )
+            conn.execute("DELETE FROM analyses WHERE created_at < ?", (time.time() - self.ttl,))
+
+
+analysis_cache = AnalysisCache(LLM_CACHE_PATH, LLM_CACHE_TTL_SECONDS)
+
+
+def _analysis_cache_key(stock_name: str, prediction_message: str, predicted_price_value, news_articles: list) -> str:
+    """분석 입력(모델, 프롬프트 버전, 종목, 예측 결과, 뉴스 묶음)의 해시. API 키는 포함하지 않습니다."""
+    payload = {
+        "model": LLM_MODEL,
+        "prompt_version": _PROMPT_VERSION,
+        "stock_name": stock_name,
+        "prediction_message": prediction_message,
+        "predicted_price_value": str(predicted_price_value),
+        "news": [
+            [article.get('title'), article.get('source'), article.get('date'), article.get('content', '')[:500]]
+            for article in news_articles
+        ],
+    }
+    encoded = json.dumps(payload, ensure_ascii=False, sort_keys=True).encode('utf-8')
+    return hashlib.sha256(encoded).hexdigest()
+
+
+def _build_prompt(stock_name: str, prediction_message: str, predicted_price_value, news_articles: list) -> str:
     # 뉴스 기사들을 하나의 문자열로 조합
     news_summary = "\n".join([
         f"- 제목: {article['title']}\n  출처: {article['source']}\n  날짜: {article['date']}\n  내용: {article.get('content', '내용 없음')[:500]}..."
@@ -47,9 +120,6 @@ def analyze_prediction_with_llm(api_key: str, stock_name: str, prediction_messag
     if not news_articles:
         news_summary = "제공된 최신 뉴스가 없습니다."
 
-    print("--- LLM Analyzer: News Summary constructed (via print) ---")
-    logger.info("--- LLM Analyzer: News Summary constructed (via logger) ---")
-
     # LLM에게 보낼 프롬프트 구성
     prompt = f"""
     당신은 수년간의 경험을 가진 전문 주식 트레이더입니다. 당신 앞에는 자체 개발한 예측 프로그램의 결과와 관련 최신 뉴스가 있습니다. 
@@ -73,43 +143,105 @@ def analyze_prediction_with_llm(api_key: str, stock_name: str, prediction_messag
     **주의: 위에 제공된 '분석 대상 정보'는 절대 다시 출력하지 마세요. 바로 1번 항목부터 분석을 시작하세요.**
     """
 
-    print("--- LLM Analyzer: Prompt constructed (via print) ---")
-    logger.info("--- LLM Analyzer: Prompt constructed (via logger) ---")
-    # print(f"Full Prompt: {prompt[:500]}...") # 프롬프트가 너무 길면 터미널에 부담
+    return prompt
 
-    try:
-        print("--- LLM Analyzer: Calling OpenAI API (via print) ---")
-        logger.info("--- LLM Analyzer: Calling OpenAI API (via logger) ---")
-        response = client.chat.completions.create(
-            model="gpt-3.5-turbo",
-            messages=[
-                {"role": "system", "content": "당신은 수년간의 경험을 가진 전문 주식 트레이더입니다."},
-                {"role": "user", "content": prompt.encode('utf-8').decode('utf-8')} # Force UTF-8 encoding/decoding
-            ],
-            temperature=0.5,
-        )
-        print("--- LLM Analyzer: OpenAI API call successful (via print) ---")
-        logger.info("--- LLM Analyzer: OpenAI API call successful (via logger) ---")
-        return response.choices[0].message.content
-
-    except openai.APIConnectionError as e:
-        print(f"--- LLM Analyzer: Error - API Connection Failed: {e} (via print) ---")
-        logger.error(f"--- LLM Analyzer: Error - API Connection Failed: {e} (via logger) ---")
+
+def _error_message(e: Exception) -> str:
+    """OpenAI 호출 예외를 화면에 표시할 메시지로 바꿉니다."""
+    if isinstance(e, openai.APIConnectionError):
+        logger.error("API connection failed: %s", e)
         return f"OpenAI 서버 연결에 실패했습니다: {e}"
-    except openai.RateLimitError as e:
-        print(f"--- LLM Analyzer: Error - Rate Limit Exceeded: {e} (via print) ---")
-        logger.error(f"--- LLM Analyzer: Error - Rate Limit Exceeded: {e} (via logger) ---")
+    if isinstance(e, openai.RateLimitError):
+        logger.error("Rate limit exceeded: %s", e)
         return f"OpenAI API 사용량 한도 초과입니다: {e}"
-    except openai.AuthenticationError as e:
-        print(f"--- LLM Analyzer: Error - Authentication Failed: {e} (via print) ---")
-        logger.error(f"--- LLM Analyzer: Error - Authentication Failed: {e} (via logger) ---")
+    if isinstance(e, openai.AuthenticationError):
+        logger.error("Authentication failed: %s", e)
         return f"OpenAI API 키가 유효하지 않거나 인증에 실패했습니다: {e}"
-    except openai.APIStatusError as e:
-        print(f"--- LLM Analyzer: Error - API Status Error ({e.status_code}): {e.response} (via print) ---")
-        logger.error(f"--- LLM Analyzer: Error - API Status Error ({e.status_code}): {e.response} (via logger) ---")
+    if isinstance(e, openai.APIStatusError):
+        logger.error("API status error (%s): %s", e.status_code, e.response)
         return f"OpenAI API 에러가 발생했습니다 (상태 코드: {e.status_code}): {e.response}"
+    safe_error_message = str(e).encode('ascii', 'replace').decode('ascii')
+    logger.error("Unexpected error: %s", safe_error_message)
+    return f"예상치 못한 오류가 발생했습니다: {safe_error_message}"
+
+
+def _request_kwargs(prompt: str) -> dict:
+    return dict(
+        model=LLM_MODEL,
+        messages=[
+            {"role": "system", "content": _SYSTEM_PROMPT},
+            {"role": "user", "content": prompt}
+        ],
+        temperature=0.5,
+    )
+
+
+def analyze_prediction_with_llm(api_key: str, stock_name: str, prediction_message: str, predicted_price_value: str, news_articles: list):
+    """
+    예측 결과와 뉴스를 LLM으로 분석하여 전체 답변을 한 번에 반환합니다.
+    같은 입력의 분석 결과가 캐시에 있으면 API를 호출하지 않습니다. 오류는 메시지 문자열로 반환합니다.
+    """
+    logger.info("Analyzing %s with %d news articles", stock_name, len(news_articles))
+    if not api_key:
+        logger.error("API key not provided")
+        return "오류: OpenAI API 키가 제공되지 않았습니다."
+
+    cache_key = _analysis_cache_key(stock_name, prediction_message, predicted_price_value, news_articles)
+    cached = analysis_cache.get(cache_key)
+    if cached is not None:
+        logger.info("Analysis cache hit")
+        return cached
+
+    prompt = _build_prompt(stock_name, prediction_message, predicted_price_value, news_articles)
+    try:
+        logger.debug("Calling OpenAI API")
+        with stage("llm_call"):
+            response = _get_client(api_key).chat.completions.create(**_request_kwargs(prompt))
+        result = response.choices[0].message.content
     except Exception as e:
-        safe_error_message = str(e).encode('ascii', 'replace').decode('ascii')
-        print(f"--- LLM Analyzer: Error - Unexpected Error: {safe_error_message} (via print) ---")
-        logger.error(f"--- LLM Analyzer: Error - Unexpected Error: {safe_error_message} (via logger) ---")
-        return f"예상치 못한 오류가 발생했습니다: {safe_error_message}"
\ No newline at end of file
+        return _error_message(e)
+
+    logger.debug("OpenAI API call successful")
+    analysis_cache.put(cache_key, result)
+    return result
+
+
+def stream_prediction_analysis(api_key: str, stock_name: str, prediction_message: str, predicted_price_value: str, news_articles: list):
+    """
+    analyze_prediction_with_llm의 스트리밍 버전. 생성되는 토큰(텍스트 조각)을 차례로 yield 합니다.
+    캐시에 결과가 있으면 전체 결과를 한 번에 yield 하고, 스트림이 끝까지 완료된 경우에만 결과를 캐시에 저장합니다.
+    오류가 나면 오류 메시지를 마지막 조각으로 yield 합니다.
+    """
+    logger.info("Analyzing %s with %d news articles (stream)", stock_name, len(news_articles))
+    if not api_key:
+        logger.error("API key not provided")
+        yield "오류: OpenAI API 키가 제공되지 않았습니다."
+        return
+
+    cache_key = _analysis_cache_key(stock_name, prediction_message, predicted_price_value, news_articles)
+    cached = analysis_cache.get(cache_key)
+    if cached is not None:
+        logger.info("Analysis cache hit")
+        yield cached
+        return
+
+    prompt = _build_prompt(stock_name, prediction_message, predicted_price_value, news_articles)
+    chunks = []
+    try:
+        logger.debug("Calling OpenAI API (stream)")
+        # 스트림을 끝까지 받는 데 걸린 시간을 기록합니다. (화면 표시 시간 포함)
+        with stage("llm_call"):
+            stream = _get_client(api_key).chat.completions.create(stream=True, **_request_kwargs(prompt))
+            for event in stream:
+                if not event.choices:
+                    continue
+                delta = event.choices[0].delta.content
+                if delta:
+                    chunks.append(delta)
+                    yield delta
+    except Exception as e:
+        yield ("\n\n" if chunks else "") + _error_message(e)
+        return
+
+    logger.debug("OpenAI API stream completed")
+    analysis_cache.put(cache_key, ''.join(chunks))
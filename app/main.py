@@ -1,6 +1,8 @@
 import sys
 import os
-from fastapi import FastAPI
+from contextlib import asynccontextmanager
+from typing import Optional
+from fastapi import FastAPI, HTTPException, Query, Response
 
 # Add project root to Python path to enable absolute imports
 project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
@@ -8,12 +10,73 @@ if project_root not in sys.path:
     sys.path.insert(0, project_root)
 
 from app.routers import prediction, international
+from app.jobs import job_manager
+from app.workers import worker_client, start_local_workers, stop_local_workers
+from app.domestic.intraday import intraday_feed
+from app.http_client import close_async_client
+from app.observability import configure_logging, observe_requests, metrics_response
+from app.engines import ENGINES, start_warmup, engine_status, is_loaded
+from app.scheduler import precompute_scheduler
+from app.config import WARMUP_ENGINES, PRECOMPUTE_CODES, PRECOMPUTE_UNIVERSE, WORKER_MODE, WORKER_BROKER
 
-app = FastAPI()
+configure_logging()
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # 무거운 엔진(TensorFlow 등)은 요청을 받기 시작한 뒤 백그라운드에서 불러옵니다.
+    start_warmup(WARMUP_ENGINES)
+    # 관심 종목이 설정된 경우 장 마감 후 예측을 미리 계산합니다.
+    if PRECOMPUTE_CODES or PRECOMPUTE_UNIVERSE:
+        precompute_scheduler.start(prediction.submit_domestic_precompute, catch_up=prediction.domestic_precompute_pending)
+    # 큐 모드에서 메모리 브로커를 쓰면 학습 워커도 이 프로세스 안에서 실행합니다. (개발/테스트용)
+    if worker_client is not None and WORKER_BROKER == "memory":
+        start_local_workers()
+    yield
+    stop_local_workers()
+    precompute_scheduler.stop()
+    await intraday_feed.close()
+    job_manager.shutdown()
+    await close_async_client()
+
+app = FastAPI(lifespan=lifespan)
+app.middleware("http")(observe_requests)
 
 app.include_router(prediction.router)
 app.include_router(international.router)
 
 @app.get("/")
 def read_root():
-    return {"message": "Welcome to PredictiBoot"}
\ No newline at end of file
+    return {"message": "Welcome to PredictiBoot"}
+
+@app.get("/metrics", include_in_schema=False)
+def read_metrics():
+    """Prometheus-format stage/request/job metrics for this server process."""
+    return metrics_response()
+
+@app.get("/workers")
+def read_workers():
+    """
+    Show the worker mode and, in queue mode, the training workers currently on the hash ring
+    (workers that sent a heartbeat within `PREDICTIBOOT_WORKER_TIMEOUT_SECONDS`).
+    """
+    if worker_client is None:
+        return {"mode": WORKER_MODE, "workers": []}
+    return {"mode": WORKER_MODE, "broker": WORKER_BROKER, "workers": worker_client.fleet()}
+
+@app.get("/ready")
+def read_readiness(
+    response: Response,
+    require: Optional[str] = Query(None, description="Comma-separated engines that must be loaded (default: the warm-up engines)")
+):
+    """
+    Report which heavy engines (predictor = TensorFlow/XGBoost, pykrx, bs4, yfinance) are loaded.
+    Returns 503 until all required engines are ready.
+    """
+    required = WARMUP_ENGINES if require is None else [name.strip() for name in require.split(",") if name.strip()]
+    unknown = [name for name in required if name not in ENGINES]
+    if unknown:
+        raise HTTPException(status_code=400, detail=f"Unknown engines: {', '.join(unknown)}")
+    ready = is_loaded(required)
+    if not ready:
+        response.status_code = 503
+    return {"ready": ready, "required": required, "engines": engine_status()}
\ No newline at end of file
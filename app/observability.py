@@ -0,0 +1,95 @@
+import re
+import time
+import uuid
+import logging
+import contextvars
+
+from fastapi import Request
+from fastapi.responses import Response
+from prometheus_client import Counter, Gauge, Histogram, generate_latest, CONTENT_TYPE_LATEST
+
+from .config import LOG_LEVEL
+
+# 현재 처리 중인 요청의 ID. 로그와 백그라운드 작업에 함께 남깁니다.
+request_id_var = contextvars.ContextVar("request_id", default="-")
+_REQUEST_ID_PATTERN = re.compile(r"[\w.\-]{1,64}")
+
+# 수 ms(캐시 조회)부터 수 분(LSTM 학습)까지 다루는 구간
+_DURATION_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120, 300, 600)
+
+STAGE_SECONDS = Histogram(
+    "predictiboot_stage_duration_seconds", "Duration of instrumented stages (fetch, features, model fit/predict, LLM).",
+    ["stage"], buckets=_DURATION_BUCKETS
+)
+STAGE_FAILURES = Counter("predictiboot_stage_failures_total", "Stages that raised an exception.", ["stage"])
+HTTP_REQUESTS = Counter("predictiboot_http_requests_total", "HTTP requests handled.", ["method", "route", "status"])
+HTTP_REQUEST_SECONDS = Histogram(
+    "predictiboot_http_request_duration_seconds", "Time until the response headers were ready.",
+    ["method", "route"], buckets=_DURATION_BUCKETS
+)
+JOBS_FINISHED = Counter("predictiboot_jobs_finished_total", "Background jobs by final status.", ["kind", "status"])
+JOB_SECONDS = Histogram(
+    "predictiboot_job_duration_seconds", "Run time of background jobs.", ["kind"], buckets=_DURATION_BUCKETS
+)
+WORKER_TASKS = Counter(
+    "predictiboot_worker_tasks_total", "Tasks dispatched to training workers (queue mode).", ["worker", "kind"]
+)
+WORKER_REASSIGNED = Counter(
+    "predictiboot_worker_tasks_reassigned_total", "Unfinished tasks moved to another worker after theirs left the ring."
+)
+COALESCED_WAITERS = Counter(
+    "predictiboot_coalesced_waiters_total",
+    "Requests that attached to an identical in-flight computation instead of starting their own.", ["name"]
+)
+INFLIGHT_COMPUTATIONS = Gauge(
+    "predictiboot_inflight_computations", "Distinct coalesced computations currently running.", ["name"]
+)
+INTRADAY_SUBSCRIBERS = Gauge("predictiboot_intraday_subscribers", "Open intraday stream subscriptions.")
+INTRADAY_POLLERS = Gauge("predictiboot_intraday_pollers", "Codes with a running upstream intraday poller.")
+
+
+class RequestIdFilter(logging.Filter):
+    def filter(self, record: logging.LogRecord) -> bool:
+        record.request_id = request_id_var.get()
+        return True
+
+
+def configure_logging():
+    """app 패키지 로거에 요청 ID를 포함하는 핸들러를 한 번만 붙입니다."""
+    logger = logging.getLogger("app")
+    if any(isinstance(f, RequestIdFilter) for handler in logger.handlers for f in handler.filters):
+        return
+    handler = logging.StreamHandler()
+    handler.setFormatter(logging.Formatter("%(asctime)s %(levelname)s [%(request_id)s] %(name)s: %(message)s"))
+    handler.addFilter(RequestIdFilter())
+    logger.addHandler(handler)
+    logger.setLevel(LOG_LEVEL)
+    logger.propagate = False
+
+
+async def observe_requests(request: Request, call_next):
+    """
+    요청마다 ID(X-Request-ID 헤더 값 또는 새로 생성)를 지정하고 라우트별 요청 수/처리 시간을 기록합니다.
+    스트리밍 응답은 응답 헤더가 준비될 때까지의 시간만 기록됩니다.
+    """
+    request_id = request.headers.get("X-Request-ID", "")
+    if not _REQUEST_ID_PATTERN.fullmatch(request_id):
+        request_id = uuid.uuid4().hex
+    token = request_id_var.set(request_id)
+    start = time.perf_counter()
+    status = 500
+    try:
+        response = await call_next(request)
+        status = response.status_code
+    finally:
+        route = getattr(request.scope.get("route"), "path", "unmatched")
+        HTTP_REQUESTS.labels(request.method, route, str(status)).inc()
+        HTTP_REQUEST_SECONDS.labels(request.method, route).observe(time.perf_counter() - start)
+        request_id_var.reset(token)
+    response.headers["X-Request-ID"] = request_id
+    return response
+
+
+def metrics_response() -> Response:
+    """Prometheus 텍스트 형식의 지표 응답을 만듭니다."""
+    return Response(generate_latest(), media_type=CONTENT_TYPE_LATEST)
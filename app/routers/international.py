@@ -1,5 +1,28 @@
+import re
+import json
+import asyncio
+import logging
+import datetime
+from functools import partial
+from typing import List, Optional
+
+import pytz
+import pandas as pd
 from fastapi import APIRouter, Query, HTTPException
-from ..international.crawler import get_historical_data_international
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import StreamingResponse
+from pydantic import BaseModel, Field
+
+from ..international.crawler import get_historical_frame_international, get_historical_frames_international
+from ..columnar import ResponseFormat, table_response
+from ..forecasts import next_business_day, change_suffix, format_forecasts
+from ..engines import load_engine
+from ..workers import worker_client, run_on_worker, task_handler
+from ..config import BATCH_MAX_CODES, PARALLEL_TRAINING_WORKERS
+
+logger = logging.getLogger(__name__)
+
+_TICKER_PATTERN = re.compile(r"[A-Z0-9.\-^=]{1,20}")
 
 router = APIRouter(
     prefix="/stocks/international",
@@ -9,14 +32,202 @@ router = APIRouter(
 @router.get("/historical")
 async def get_international_historical_data(
     ticker: str = Query(..., description="Stock ticker (e.g., 'AAPL', 'MSFT')"),
-    period: str = Query("1y", description="Data period (e.g., '1y', '5y', 'max')")
+    period: str = Query("1y", description="Data period (e.g., '1y', '5y', 'max')"),
+    response_format: ResponseFormat = Query(
+        "records", alias="format",
+        description="Response format: 'records' (one object per row), 'columns' (one array per column) or 'arrow' (Arrow IPC stream)"
+    )
 ):
     """
     Get historical data for an international stock.
+    For long periods (e.g. 'max') `format=columns` or `format=arrow` is much smaller than per-row records.
     """
-    data = get_historical_data_international(ticker, period)
+    data = get_historical_frame_international(ticker, period)
     if isinstance(data, dict) and "error" in data:
         raise HTTPException(status_code=500, detail=data["error"])
-    if not data:
+    if data.empty:
         raise HTTPException(status_code=404, detail="No historical data found for the given ticker and period.")
-    return {"historical_data": data}
+    if response_format != "arrow":
+        data = data.assign(date=data['date'].dt.strftime('%Y-%m-%d'))
+    return table_response("historical_data", data, response_format)
+
+def _normalize_tickers(tickers: List[str]) -> List[str]:
+    normalized = list(dict.fromkeys(ticker.strip().upper() for ticker in tickers))
+    invalid = [ticker for ticker in normalized if not _TICKER_PATTERN.fullmatch(ticker)]
+    if invalid:
+        raise HTTPException(status_code=400, detail=f"Invalid tickers: {', '.join(invalid)}")
+    return normalized
+
+def _validate_years(years: int):
+    if years not in [1, 2, 3, 5]:
+        raise HTTPException(status_code=400, detail="Years must be 1, 2, 3, or 5.")
+
+def _select_prediction_range(historical_data: pd.DataFrame) -> dict:
+    """
+    Drop today's still-trading bar (US market hours) so the prediction targets today's close.
+    Raises HTTPException on missing data.
+    """
+    if historical_data is None or historical_data.empty:
+        raise HTTPException(status_code=404, detail="Could not retrieve historical data.")
+
+    now_ny = datetime.datetime.now(pytz.timezone('America/New_York'))
+    if now_ny.time() < datetime.time(16, 0) and historical_data.index[-1].date() == now_ny.date():
+        data_for_prediction = historical_data.iloc[:-1]
+        prediction_type_message = "오늘"
+    else:
+        data_for_prediction = historical_data
+        prediction_type_message = "다음 거래일"
+
+    if data_for_prediction.empty:
+        raise HTTPException(status_code=404, detail="Not enough historical data to make a prediction.")
+    return {"data_for_prediction": data_for_prediction, "prediction_type_message": prediction_type_message}
+
+def _format_prediction(ticker: str, inputs: dict, predictions: dict) -> dict:
+    """
+    Build the prediction response for the predicted closing prices ({horizon: price}, in the
+    ticker's trading currency). The message describes the next-day prediction.
+    """
+    data_for_prediction = inputs["data_for_prediction"]
+    latest_closing_price = float(data_for_prediction['closing_price'].iloc[-1])
+    last_data_date = data_for_prediction.index[-1].date()
+    predicted_price = predictions[1]
+    percentage_change_str = change_suffix(predicted_price, latest_closing_price)
+
+    prediction_target_date = next_business_day(last_data_date)
+    formatted_date = f"{prediction_target_date.month}월 {prediction_target_date.day}일"
+    prediction_message = f"{ticker}의 {formatted_date}({inputs['prediction_type_message']}) 예상 종가는 **{predicted_price:,.2f}** 입니다.{percentage_change_str} (스태킹 하이브리드 모델)"
+    return {
+        "prediction_message": prediction_message, "predicted_price": predicted_price,
+        "forecasts": format_forecasts(last_data_date, latest_closing_price, predictions),
+    }
+
+def _fetch_histories(tickers: List[str], years: int) -> dict:
+    """Sync all tickers through the local store (one batched yfinance request for the missing ranges)."""
+    histories = get_historical_frames_international(tickers, years)
+    if "error" in histories:
+        raise HTTPException(status_code=502, detail=histories["error"])
+    return histories
+
+def _run_international_prediction(ticker: str, years: int, inputs: dict, budget_seconds: float = None) -> dict:
+    try:
+        # TensorFlow/XGBoost는 처음 예측할 때(또는 백그라운드 워밍업에서) 불러옵니다.
+        predictor = load_engine("predictor")
+        result = predictor.predict_price_horizons_stacking_hybrid(
+            inputs["data_for_prediction"], code=ticker, years=years, budget_seconds=budget_seconds,
+            model="per_ticker",  # 공통 모델은 국내 종목으로만 학습하므로 해외 종목은 항상 종목별 모델 사용
+            market="international",
+        )
+        return {**_format_prediction(ticker, inputs, result["predictions"]), "training": result["training"]}
+    except ValueError as e:
+        logger.warning("Prediction failed for %s: %s", ticker, e)
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"An unexpected error occurred during prediction: {e}")
+
+@task_handler("international_predict")
+def _international_prediction_task(job, ticker: str, years: int, budget_seconds: float = None) -> dict:
+    """Training worker entry point (queue mode): sync the ticker's history, train and format on the worker."""
+    histories = _fetch_histories([ticker], years)
+    job.raise_if_cancelled()
+    return _run_international_prediction(ticker, years, _select_prediction_range(histories.get(ticker)), budget_seconds)
+
+@router.get("/predict", response_model=dict)
+async def predict_international_stock(
+    ticker: str = Query(..., description="Stock ticker to predict (e.g., 'AAPL')"),
+    years: int = Query(1, description="Number of years of historical data to use (1, 2, 3, or 5)"),
+    budget_seconds: Optional[float] = Query(
+        None, ge=0, description="Training time budget in seconds (default: server setting, 0: unlimited)"
+    )
+):
+    """
+    Predict the next closing price of an international stock with the stacking hybrid model,
+    plus the closing prices several trading days ahead (`forecasts`) from the same training run.
+    `training.mode` reports how the model was trained within the budget.
+    """
+    _validate_years(years)
+    ticker = _normalize_tickers([ticker])[0]
+    if worker_client is not None:
+        # Queue mode: the worker that owns this ticker fetches, trains and formats the response.
+        return await run_on_worker(
+            "international_predict", ticker, {"ticker": ticker, "years": years, "budget_seconds": budget_seconds}
+        )
+    histories = await run_in_threadpool(_fetch_histories, [ticker], years)
+    inputs = _select_prediction_range(histories.get(ticker))
+    return await run_in_threadpool(_run_international_prediction, ticker, years, inputs, budget_seconds)
+
+
+class InternationalBatchPredictionRequest(BaseModel):
+    tickers: List[str] = Field(..., description="Tickers to predict (e.g., ['AAPL', 'MSFT', 'NVDA'])")
+    years: int = Field(1, description="Number of years of historical data to use (1, 2, 3, or 5)")
+    budget_seconds: Optional[float] = Field(
+        None, ge=0, description="Training time budget per ticker in seconds (default: server setting, 0: unlimited)"
+    )
+
+async def _predict_batch_item(ticker: str, years: int, history, train_limit: asyncio.Semaphore,
+                              budget_seconds: Optional[float] = None) -> dict:
+    """
+    Predict one ticker of a batch in a server thread whose base-model fits run on the training
+    process pool (or, in queue mode, on the training worker that owns the ticker, which syncs
+    its own history). At most `train_limit` tickers of the batch train at once.
+    """
+    try:
+        if worker_client is not None:
+            response = await run_on_worker(
+                "international_predict", ticker, {"ticker": ticker, "years": years, "budget_seconds": budget_seconds}
+            )
+            return {"ticker": ticker, "status": "ok", **response}
+        inputs = _select_prediction_range(history)
+        predictor = await run_in_threadpool(load_engine, "predictor")
+        # The model registry and its stage metrics stay in this process; only the fits go to the pool.
+        async with train_limit:
+            result = await run_in_threadpool(partial(
+                predictor.predict_price_horizons_stacking_hybrid, inputs["data_for_prediction"],
+                code=ticker, years=years, parallel=True, budget_seconds=budget_seconds, model="per_ticker",
+                market="international",
+            ))
+        return {
+            "ticker": ticker, "status": "ok",
+            **_format_prediction(ticker, inputs, result["predictions"]), "training": result["training"],
+        }
+    except HTTPException as e:
+        return {"ticker": ticker, "status": "error", "status_code": e.status_code, "detail": e.detail}
+    except ValueError as e:
+        return {"ticker": ticker, "status": "error", "status_code": 400, "detail": str(e)}
+    except Exception as e:
+        return {"ticker": ticker, "status": "error", "status_code": 500,
+                "detail": f"An unexpected error occurred during prediction: {e}"}
+
+@router.post("/predict/batch")
+async def predict_international_stocks_batch(request: InternationalBatchPredictionRequest):
+    """
+    Refresh and predict many international tickers in one pass. Missing history for all
+    tickers is downloaded with a single batched yfinance request (through the local OHLCV
+    store), then training is scheduled across the training process pool. Results are
+    streamed back as newline-delimited JSON, one line per ticker in completion order.
+    """
+    _validate_years(request.years)
+    tickers = _normalize_tickers(request.tickers)
+    if not tickers:
+        raise HTTPException(status_code=400, detail="Provide at least one ticker.")
+    if len(tickers) > BATCH_MAX_CODES:
+        raise HTTPException(status_code=400, detail=f"A batch can contain at most {BATCH_MAX_CODES} tickers.")
+
+    # In queue mode each worker syncs the histories of the tickers it owns.
+    histories = {} if worker_client is not None else await run_in_threadpool(_fetch_histories, tickers, request.years)
+
+    async def stream_results():
+        train_limit = asyncio.Semaphore(PARALLEL_TRAINING_WORKERS)
+        tasks = [
+            asyncio.ensure_future(
+                _predict_batch_item(ticker, request.years, histories.get(ticker), train_limit, request.budget_seconds)
+            )
+            for ticker in tickers
+        ]
+        try:
+            for task in asyncio.as_completed(tasks):
+                yield json.dumps(await task, ensure_ascii=False) + "\n"
+        finally:
+            for task in tasks:
+                task.cancel()
+
+    return StreamingResponse(stream_results(), media_type="application/x-ndjson")
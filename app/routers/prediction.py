@@ -1,20 +1,58 @@
-from fastapi import APIRouter, Query, HTTPException
-from ..domestic.crawler import get_historical_data, get_stock_name, get_stock_news, get_intraday_data
-from ..domestic.predictor import predict_next_day_price_stacking_hybrid
+import logging
+from fastapi import APIRouter, Query, HTTPException, Request
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import StreamingResponse
+from pydantic import BaseModel, Field
+from typing import List, Literal, Optional
+from ..domestic.crawler import (
+    get_historical_frame, get_historical_frame_async, get_stock_name, get_stock_name_async,
+    get_stock_news_async, get_index_constituents, INDEX_UNIVERSES
+)
 from ..domestic.search import find_stock_code
+from ..domestic.intraday import intraday_feed, bars_after, today_kst
+from ..domestic.ticker_index import ticker_index
+from ..engines import load_engine
+from ..columnar import ResponseFormat, table_response
+from ..forecasts import next_business_day, change_suffix, format_forecasts
+from ..domestic.prediction_store import prediction_store
+from ..jobs import job_manager, Job, JobCancelledError, JobQueueFullError
+from ..workers import worker_client, run_on_worker, task_handler
+from ..coalescing import SingleFlight
+from ..scheduler import precompute_scheduler, KST
+from ..config import (
+    BATCH_FETCH_CONCURRENCY, BATCH_MAX_CODES, JOB_EVENT_POLL_SECONDS, INTRADAY_POLL_SECONDS,
+    PRECOMPUTE_CODES, PRECOMPUTE_UNIVERSE, PRECOMPUTE_YEARS, PREDICTION_MODEL, GLOBAL_MODEL_YEARS,
+    PARALLEL_TRAINING_WORKERS,
+)
+from functools import partial
+from concurrent.futures import ThreadPoolExecutor, as_completed
 import pandas as pd
+import asyncio
+import json
 import datetime
-import pytz
 import locale
 
+logger = logging.getLogger(__name__)
+
 # 가격을 원화(KRW) 형식으로 포맷하기 위해 로케일 설정
 locale.setlocale(locale.LC_ALL, 'ko_KR.UTF-8')
 
+_MARKET_CLOSE_TIME = datetime.time(15, 30)
+
 router = APIRouter(
     prefix="/stocks",
     tags=["stocks"],
 )
 
+# Concurrent identical on-demand predictions share one fetch + training run.
+domestic_predictions = SingleFlight("domestic_predict")
+
+PredictionModel = Literal["per_ticker", "global", "compare"]
+_MODEL_DESCRIPTION = (
+    "Model to predict with: 'per_ticker' (train per stock), 'global' (inference with the shared cross-ticker "
+    "model) or 'compare' (run both and report predictions and timings side by side). Default: server setting"
+)
+
 @router.get("/domestic/search")
 async def search_stock_code(
     query: str = Query(..., description="Name of the company to search for (e.g., '삼성')")
@@ -22,7 +60,11 @@ async def search_stock_code(
     """
     Search for stock codes by company name.
     """
-    results = find_stock_code(query)
+    if ticker_index.is_fresh():
+        results = find_stock_code(query)
+    else:
+        # The first search of the trading day builds the ticker index from KRX.
+        results = await run_in_threadpool(find_stock_code, query)
     if not results:
         raise HTTPException(status_code=404, detail=f"No stocks found for query: '{query}'")
     return {"results": results}
@@ -35,99 +77,611 @@ async def get_domestic_stock_news(
     """
     Get the latest news for a given stock code.
     """
-    news_result = get_stock_news(code, limit)
+    news_result = await get_stock_news_async(code, limit)
     
     if isinstance(news_result, dict) and "error" in news_result:
         raise HTTPException(status_code=500, detail=news_result["error"])
     
     return {"news": news_result}
 
-@router.get("/domestic/predict", response_model=dict)
-async def predict_domestic_stock(
-    code: str = Query(..., description="Stock code to predict (e.g., '005930')"),
-    years: int = Query(1, description="Number of years of historical data to use (1, 2, 3, or 5)")
+_FORMAT_DESCRIPTION = "Response format: 'records' (one object per row), 'columns' (one array per column) or 'arrow' (Arrow IPC stream)"
+
+@router.get("/domestic/historical")
+async def get_domestic_historical_data(
+    code: str = Query(..., description="Stock code (e.g., '005930')"),
+    years: int = Query(1, description="Number of years of history (1, 2, 3, or 5)"),
+    response_format: ResponseFormat = Query("records", alias="format", description=_FORMAT_DESCRIPTION)
 ):
+    """
+    Get daily OHLCV history for a stock code from the local OHLCV store.
+    For multi-year ranges `format=columns` or `format=arrow` is much smaller and faster
+    to produce than per-row records.
+    """
     if years not in [1, 2, 3, 5]:
         raise HTTPException(status_code=400, detail="Years must be 1, 2, 3, or 5.")
+    frame = await get_historical_frame_async(code, years)
+    if isinstance(frame, dict):
+        raise HTTPException(status_code=500, detail=frame["error"])
+    if frame.empty:
+        raise HTTPException(status_code=404, detail=f"No historical data found for {code}.")
 
-    # 1. Get stock name and current time in KST
-    stock_name = get_stock_name(code)
-    kst = pytz.timezone('Asia/Seoul')
-    now_kst = datetime.datetime.now(kst)
-    market_close_time = datetime.time(15, 30)
+    table = frame.reset_index()
+    if response_format != "arrow":
+        # Arrow keeps the native timestamp type; JSON formats use the crawler's 'YYYY.MM.DD' dates.
+        table['date'] = table['date'].dt.strftime('%Y.%m.%d')
+    return table_response("historical_data", table, response_format)
 
-    # 2. Fetch historical data
-    historical_data = get_historical_data(code, years)
-    if not isinstance(historical_data, list) or not historical_data:
+def _select_prediction_range(stock_name: str, historical_data: pd.DataFrame) -> dict:
+    """
+    Pick the data range (a date-indexed OHLCV frame) based on the current KST time.
+    Raises HTTPException on missing data.
+    """
+    # 1. Get current time in KST
+    now_kst = datetime.datetime.now(KST)
+
+    # 2. Check historical data
+    if not isinstance(historical_data, pd.DataFrame) or historical_data.empty:
         raise HTTPException(status_code=404, detail="Could not retrieve historical data.")
 
+    # 3. Determine data range based on current time
+    if now_kst.time() < _MARKET_CLOSE_TIME:
+        # Before market close: Use data up to yesterday to predict for today
+        today = pd.Timestamp(now_kst.date())
+        data_for_prediction = historical_data[historical_data.index.normalize() != today]
+        prediction_type_message = "오늘"
+    else:
+        # After market close: Use data up to today to predict for tomorrow
+        data_for_prediction = historical_data
+        prediction_type_message = "내일"
+
+    if data_for_prediction.empty:
+        raise HTTPException(status_code=404, detail="Not enough historical data to make a prediction.")
+
+    return {
+        "stock_name": stock_name,
+        "data_for_prediction": data_for_prediction,
+        "prediction_type_message": prediction_type_message,
+    }
+
+def _prepare_prediction_inputs(code: str, years: int) -> dict:
+    """Fetch the stock name and history for a prediction (blocking; for worker threads)."""
+    return _select_prediction_range(get_stock_name(code), get_historical_frame(code, years))
+
+async def _prepare_prediction_inputs_async(code: str, years: int) -> dict:
+    """Fetch the stock name and history concurrently on the shared async I/O layer."""
+    stock_name, historical_data = await asyncio.gather(
+        get_stock_name_async(code), get_historical_frame_async(code, years)
+    )
+    return _select_prediction_range(stock_name, historical_data)
+
+def _expected_target_date(now_kst: datetime.datetime) -> datetime.date:
+    """
+    The date a prediction made now targets (see _select_prediction_range), assuming the data
+    ends on the last weekday: today before the close on a weekday, otherwise the next weekday.
+    """
+    if now_kst.weekday() < 5 and now_kst.time() < _MARKET_CLOSE_TIME:
+        return now_kst.date()
+    return next_business_day(now_kst.date())
+
+def _format_prediction(code: str, inputs: dict, predictions: dict) -> dict:
+    """Build the prediction response for the predicted closing prices ({horizon: price})."""
+    data_for_prediction = inputs["data_for_prediction"]
+    return _format_prediction_message(
+        code, inputs["stock_name"], float(data_for_prediction['closing_price'].iloc[-1]),
+        data_for_prediction.index[-1].date(), inputs["prediction_type_message"], predictions,
+    )
+
+def _format_prediction_message(code: str, stock_name: str, latest_closing_price: float,
+                               last_data_date: datetime.date, prediction_type_message: str,
+                               predictions: dict) -> dict:
+    # 6. Calculate percentage change of the next-day prediction
+    predicted_price = predictions[1]
+    percentage_change_str = change_suffix(predicted_price, latest_closing_price)
+
+    # 7. Determine the target date for the prediction message
+    prediction_target_date = next_business_day(last_data_date)
+
+    # 8. Format the response
+    formatted_date = f"{prediction_target_date.month}월 {prediction_target_date.day}일"
+    formatted_price = f"{locale.format_string('%d', int(predicted_price), grouping=True)}원"
+
+    prediction_message = f"{stock_name}({code})의 {formatted_date}({prediction_type_message}) 예상 종가는 **{formatted_price}** 입니다.{percentage_change_str} (스태킹 하이브리드 모델)"
+
+    return {
+        "prediction_message": prediction_message,
+        "forecasts": format_forecasts(last_data_date, latest_closing_price, predictions),
+    }
+
+def _run_domestic_prediction(code: str, years: int, job: Job = None, inputs: dict = None,
+                             budget_seconds: float = None, model: str = None) -> dict:
+    """
+    Fetch data (unless already fetched), train/predict and format the response for one stock.
+    When run as a background job, progress is reported on the job and
+    cancellation is checked between stages. `budget_seconds` caps the training time
+    (None: the configured default); the response reports the training mode that was used.
+    `model` picks the per-ticker, global or compare mode (None: the configured default).
+    """
+    if inputs is None:
+        if job is not None:
+            job.update_progress(0.05, "과거 데이터 수집 중")
+        inputs = _prepare_prediction_inputs(code, years)
+
     try:
-        # 3. Determine data range based on current time
-        if now_kst.time() < market_close_time:
-            # Before market close: Use data up to yesterday to predict for today
-            today_str = now_kst.strftime('%Y.%m.%d')
-            data_for_prediction = [d for d in historical_data if d.get('date') != today_str]
-            prediction_type_message = "오늘"
-        else:
-            # After market close: Use data up to today to predict for tomorrow
-            data_for_prediction = historical_data
-            prediction_type_message = "내일"
-
-        if not data_for_prediction:
-            raise HTTPException(status_code=404, detail="Not enough historical data to make a prediction.")
-
-        # 4. Predict the next day's price
-        predicted_price = predict_next_day_price_stacking_hybrid(data_for_prediction)
-
-        # 5. Get latest closing price for comparison
-        latest_closing_price = float(data_for_prediction[-1]['closing_price'])
-
-        # 6. Calculate percentage change
-        percentage_change_str = ""
-        if latest_closing_price > 0:
-            percentage_change = ((predicted_price / latest_closing_price) - 1) * 100
-            sign = "+" if percentage_change >= 0 else ""
-            percentage_change_str = f" (최신 종가 대비 {sign}{percentage_change:.2f}%)"
-
-        # 7. Determine the target date for the prediction message
-        last_data_date_str = data_for_prediction[-1]['date']
-        last_data_date = datetime.datetime.strptime(last_data_date_str, '%Y.%m.%d')
-        
-        prediction_target_date = last_data_date + datetime.timedelta(days=1)
-        # Skip weekends to find the next business day
-        while prediction_target_date.weekday() >= 5:  # 5: Saturday, 6: Sunday
-            prediction_target_date += datetime.timedelta(days=1)
-
-        # 8. Format the response
-        formatted_date = f"{prediction_target_date.month}월 {prediction_target_date.day}일"
-        formatted_price = f"{locale.format_string('%d', int(predicted_price), grouping=True)}원"
-
-        prediction_message = f"{stock_name}({code})의 {formatted_date}({prediction_type_message}) 예상 종가는 **{formatted_price}** 입니다.{percentage_change_str} (스태킹 하이브리드 모델)"
-
-        return {"prediction_message": prediction_message}
+        # 4. Predict the closing prices for every horizon (one training run)
+        if job is not None:
+            job.raise_if_cancelled()
+            job.update_progress(0.2, "모델 학습 및 예측 중")
+        # TensorFlow/XGBoost는 처음 예측할 때(또는 백그라운드 워밍업에서) 불러옵니다.
+        predictor = load_engine("predictor")
+        result = predictor.predict_price_horizons_stacking_hybrid(
+            inputs["data_for_prediction"], code=code, years=years, budget_seconds=budget_seconds, model=model
+        )
+        if job is not None:
+            job.raise_if_cancelled()
+        return _with_model_report(_format_prediction(code, inputs, result["predictions"]), result)
 
+    except JobCancelledError:
+        raise
     except ValueError as e:
-        print(f"DEBUG: ValueError occurred: {e}")
+        logger.warning("Prediction failed for %s: %s", code, e)
         raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"An unexpected error occurred during prediction: {e}")
 
+@task_handler("domestic_predict")
+def _domestic_prediction_task(job, code: str, years: int, budget_seconds: float = None, model: str = None) -> dict:
+    """Training worker entry point (queue mode): fetch, train and format on the worker."""
+    return _run_domestic_prediction(code, years, job=job, budget_seconds=budget_seconds, model=model)
+
+def _dispatch_domestic_prediction(code: str, years: int, job: Job = None, budget_seconds: float = None,
+                                  model: str = None) -> dict:
+    """Predict in this process, or on the training worker that owns `code` in queue mode."""
+    if worker_client is None:
+        return _run_domestic_prediction(code, years, job=job, budget_seconds=budget_seconds, model=model)
+    return worker_client.run(
+        "domestic_predict", code, {"code": code, "years": years, "budget_seconds": budget_seconds, "model": model},
+        job=job,
+    )
+
+def _with_model_report(response: dict, result: dict) -> dict:
+    """Attach the training report (and the model comparison in compare mode) to a formatted prediction."""
+    response = {**response, "training": result["training"]}
+    if "comparison" in result:
+        response["comparison"] = result["comparison"]
+    return response
+
+def _uses_precomputed(model: Optional[str]) -> bool:
+    """The store holds predictions of the configured model, so only requests for that model can use it."""
+    return model in (None, PREDICTION_MODEL) and PREDICTION_MODEL != "compare"
+
+def _load_precomputed_prediction(code: str, years: int):
+    """Format the stored prediction for the date a prediction made now would target, if any."""
+    now_kst = datetime.datetime.now(KST)
+    stored = prediction_store.get(code, years, _expected_target_date(now_kst))
+    if stored is None:
+        return None
+    prediction_type_message = "오늘" if now_kst.time() < _MARKET_CLOSE_TIME else "내일"
+    response = _format_prediction_message(
+        code, stored["stock_name"], stored["latest_closing_price"], stored["last_data_date"],
+        prediction_type_message, stored["predictions"],
+    )
+    return {**response, "training": {"mode": "precomputed"}}
+
+@router.get("/domestic/predict", response_model=dict)
+async def predict_domestic_stock(
+    code: str = Query(..., description="Stock code to predict (e.g., '005930')"),
+    years: int = Query(1, description="Number of years of historical data to use (1, 2, 3, or 5)"),
+    budget_seconds: Optional[float] = Query(
+        None, ge=0, description="Training time budget in seconds (default: server setting, 0: unlimited)"
+    ),
+    model: Optional[PredictionModel] = Query(None, description=_MODEL_DESCRIPTION)
+):
+    """
+    Predict the next closing price, plus the closing prices `PREDICTIBOOT_PREDICTION_HORIZONS`
+    trading days ahead (`forecasts`), from a single training run. Codes on the precompute
+    watchlist are answered from the prediction store; other codes are trained on demand.
+    Training stops early once validation loss stops improving and degrades (fewer epochs,
+    smaller LSTM, or XGBoost only) when the budget is tight; `training.mode` reports which.
+    With `model=global` the shared cross-ticker model only runs inference (`training.mode`
+    is `global`); `model=compare` adds a `comparison` of both models' predictions and timings.
+    Concurrent requests with the same parameters and data cutoff attach to one in-flight
+    computation and all receive its result.
+    """
+    if years not in [1, 2, 3, 5]:
+        raise HTTPException(status_code=400, detail="Years must be 1, 2, 3, or 5.")
+
+    if _uses_precomputed(model):
+        precomputed = _load_precomputed_prediction(code, years)
+        if precomputed is not None:
+            return precomputed
+
+    # The target date fixes the data cutoff: requests for the same target train on the same bars.
+    target_date = _expected_target_date(datetime.datetime.now(KST))
+    return await domestic_predictions.run(
+        (code, years, target_date, budget_seconds, model),
+        partial(_compute_domestic_prediction, code, years, budget_seconds, model),
+    )
+
+async def _compute_domestic_prediction(code: str, years: int, budget_seconds: Optional[float],
+                                       model: Optional[str]) -> dict:
+    """Fetch and train for one on-demand prediction (locally, or on the owning worker in queue mode)."""
+    if worker_client is not None:
+        # Queue mode: the worker that owns this code fetches, trains and formats the response.
+        return await run_on_worker(
+            "domestic_predict", code, {"code": code, "years": years, "budget_seconds": budget_seconds, "model": model}
+        )
+    inputs = await _prepare_prediction_inputs_async(code, years)
+    # Training runs in a worker thread so the event loop keeps serving other requests.
+    return await run_in_threadpool(_run_domestic_prediction, code, years, None, inputs, budget_seconds, model)
+
+
+@router.post("/domestic/predict/jobs", status_code=202)
+async def create_domestic_prediction_job(
+    code: str = Query(..., description="Stock code to predict (e.g., '005930')"),
+    years: int = Query(1, description="Number of years of historical data to use (1, 2, 3, or 5)"),
+    budget_seconds: Optional[float] = Query(
+        None, ge=0, description="Training time budget in seconds (default: server setting, 0: unlimited)"
+    ),
+    model: Optional[PredictionModel] = Query(None, description=_MODEL_DESCRIPTION)
+):
+    """
+    Start a prediction in the background and return its job id immediately.
+    Poll `GET /stocks/domestic/predict/jobs/{job_id}` or subscribe to
+    `GET /stocks/domestic/predict/jobs/{job_id}/events` (Server-Sent Events).
+    """
+    if years not in [1, 2, 3, 5]:
+        raise HTTPException(status_code=400, detail="Years must be 1, 2, 3, or 5.")
+    try:
+        job = job_manager.submit(
+            "domestic_predict", {"code": code, "years": years, "budget_seconds": budget_seconds, "model": model},
+            lambda job: _dispatch_domestic_prediction(code, years, job=job, budget_seconds=budget_seconds, model=model),
+        )
+    except JobQueueFullError as e:
+        raise HTTPException(status_code=429, detail=str(e))
+    return {"job_id": job.id, "status": job.status}
+
+def _get_job_or_404(job_id: str) -> Job:
+    job = job_manager.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail=f"Job not found: {job_id}")
+    return job
+
+@router.get("/domestic/predict/jobs/{job_id}")
+async def get_domestic_prediction_job(job_id: str):
+    """
+    Get the status, progress and (when finished) the result of a prediction job.
+    """
+    return _get_job_or_404(job_id).to_dict()
+
+@router.get("/domestic/predict/jobs/{job_id}/events")
+async def stream_domestic_prediction_job(job_id: str, request: Request):
+    """
+    Stream job status and progress changes as Server-Sent Events until the job finishes.
+    """
+    job = _get_job_or_404(job_id)
+
+    async def event_stream():
+        last_version = -1
+        while True:
+            if job.version != last_version:
+                last_version = job.version
+                yield f"event: {job.status}\ndata: {json.dumps(job.to_dict(), ensure_ascii=False)}\n\n"
+            if job.done or await request.is_disconnected():
+                break
+            await asyncio.sleep(JOB_EVENT_POLL_SECONDS)
+
+    return StreamingResponse(event_stream(), media_type="text/event-stream")
+
+@router.delete("/domestic/predict/jobs/{job_id}")
+async def cancel_domestic_prediction_job(job_id: str):
+    """
+    Cancel a prediction job. Queued jobs are cancelled immediately; running jobs
+    stop at the next stage boundary.
+    """
+    _get_job_or_404(job_id)
+    return job_manager.cancel(job_id).to_dict()
+
+
+class BatchPredictionRequest(BaseModel):
+    codes: Optional[List[str]] = Field(None, description="Stock codes to predict (e.g., ['005930', '000660'])")
+    universe: Optional[str] = Field(None, description=f"Named index universe instead of codes ({', '.join(INDEX_UNIVERSES)})")
+    years: int = Field(1, description="Number of years of historical data to use (1, 2, 3, or 5)")
+    budget_seconds: Optional[float] = Field(
+        None, ge=0, description="Training time budget per code in seconds (default: server setting, 0: unlimited)"
+    )
+    model: Optional[PredictionModel] = Field(None, description=_MODEL_DESCRIPTION)
+
+async def _predict_batch_item(code: str, years: int, fetch_limit: asyncio.Semaphore, train_limit: asyncio.Semaphore,
+                              budget_seconds: Optional[float] = None, model: Optional[str] = None) -> dict:
+    """
+    Run one code of a batch: fetch on the async I/O layer, then predict in a server thread whose
+    base-model fits run on the training process pool (or, in queue mode, on the training worker
+    that owns the code). At most `train_limit` codes of the batch train at once.
+    """
+    try:
+        if worker_client is not None:
+            response = await run_on_worker(
+                "domestic_predict", code, {"code": code, "years": years, "budget_seconds": budget_seconds, "model": model}
+            )
+            return {"code": code, "status": "ok", "predicted_price": response["forecasts"][0]["predicted_price"], **response}
+        async with fetch_limit:
+            inputs = await _prepare_prediction_inputs_async(code, years)
+        predictor = await run_in_threadpool(load_engine, "predictor")
+        # Feature store, model registry and their stage metrics stay in this process;
+        # only the CPU-bound fits go to the training pool (parallel=True).
+        async with train_limit:
+            result = await run_in_threadpool(partial(
+                predictor.predict_price_horizons_stacking_hybrid, inputs["data_for_prediction"],
+                code=code, years=years, parallel=True, budget_seconds=budget_seconds, model=model,
+            ))
+        predictions = result["predictions"]
+        return {
+            "code": code, "status": "ok", "predicted_price": predictions[1],
+            **_with_model_report(_format_prediction(code, inputs, predictions), result),
+        }
+    except HTTPException as e:
+        return {"code": code, "status": "error", "status_code": e.status_code, "detail": e.detail}
+    except ValueError as e:
+        return {"code": code, "status": "error", "status_code": 400, "detail": str(e)}
+    except Exception as e:
+        return {"code": code, "status": "error", "status_code": 500,
+                "detail": f"An unexpected error occurred during prediction: {e}"}
+
+@router.post("/domestic/predict/batch")
+async def predict_domestic_stocks_batch(request: BatchPredictionRequest):
+    """
+    Predict many stocks at once. Histories are fetched concurrently and training is
+    scheduled across the training process pool. Results are streamed back as
+    newline-delimited JSON, one line per code in completion order; failures are
+    reported per code instead of failing the whole batch.
+    """
+    if request.years not in [1, 2, 3, 5]:
+        raise HTTPException(status_code=400, detail="Years must be 1, 2, 3, or 5.")
+    if bool(request.codes) == bool(request.universe):
+        raise HTTPException(status_code=400, detail="Provide either 'codes' or 'universe'.")
+
+    if request.universe:
+        try:
+            codes = get_index_constituents(request.universe)
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+        except Exception as e:
+            raise HTTPException(status_code=500, detail=f"Could not load universe '{request.universe}': {e}")
+    else:
+        codes = list(dict.fromkeys(request.codes))
+
+    if len(codes) > BATCH_MAX_CODES:
+        raise HTTPException(status_code=400, detail=f"A batch can contain at most {BATCH_MAX_CODES} codes.")
+
+    async def stream_results():
+        fetch_limit = asyncio.Semaphore(BATCH_FETCH_CONCURRENCY)
+        train_limit = asyncio.Semaphore(PARALLEL_TRAINING_WORKERS)
+        tasks = [
+            asyncio.ensure_future(_predict_batch_item(
+                code, request.years, fetch_limit, train_limit, request.budget_seconds, request.model
+            ))
+            for code in codes
+        ]
+        try:
+            for task in asyncio.as_completed(tasks):
+                yield json.dumps(await task, ensure_ascii=False) + "\n"
+        finally:
+            for task in tasks:
+                task.cancel()
+
+    return StreamingResponse(stream_results(), media_type="application/x-ndjson")
+
+
+def _precompute_domestic_predictions(job: Job, codes: List[str], universe: Optional[str], years_list: List[int]) -> dict:
+    """
+    Sync data and predict every (code, years) of the watchlist, storing each result under its
+    target date. Pairs already stored for the current target date are skipped, so a rerun (or a
+    catch-up after a restart) only fills in what is missing. Failures are collected per code.
+    Predictions run on a few threads of this process so the model registry and feature store
+    are written here; their base-model fits run on the training process pool.
+    Runs off the request path, so training has no time budget (full models, cached for warm starts).
+    """
+    if universe:
+        job.update_progress(0.0, f"{universe} 구성 종목 조회 중")
+        codes = list(dict.fromkeys([*codes, *get_index_constituents(universe)]))
+    tasks = [(code, years) for code in codes for years in years_list]
+    target_date = _expected_target_date(datetime.datetime.now(KST))
+    predictor = load_engine("predictor")
+    executor = ThreadPoolExecutor(max_workers=PARALLEL_TRAINING_WORKERS, thread_name_prefix="precompute")
+
+    futures, failed, skipped = {}, {}, 0
+    try:
+        for index, (code, years) in enumerate(tasks):
+            job.raise_if_cancelled()
+            if _is_precomputed(code, years, target_date):
+                skipped += 1
+                continue
+            job.update_progress(0.3 * index / len(tasks), f"{code} 과거 데이터 동기화 중")
+            try:
+                inputs = _prepare_prediction_inputs(code, years)
+            except HTTPException as e:
+                failed[f"{code}/{years}"] = e.detail
+                continue
+            future = executor.submit(
+                predictor.predict_price_horizons_stacking_hybrid, inputs["data_for_prediction"],
+                code=code, years=years, parallel=True, budget_seconds=0,
+                model="per_ticker" if PREDICTION_MODEL == "compare" else None,
+            )
+            futures[future] = (code, years, inputs)
+
+        for done, future in enumerate(as_completed(futures), start=1):
+            job.raise_if_cancelled()
+            code, years, inputs = futures[future]
+            job.update_progress(0.3 + 0.7 * done / len(futures), f"{code} 예측 완료")
+            try:
+                predictions = future.result()["predictions"]
+            except Exception as e:
+                failed[f"{code}/{years}"] = str(e)
+                continue
+            data_for_prediction = inputs["data_for_prediction"]
+            last_data_date = data_for_prediction.index[-1].date()
+            prediction_store.put(
+                code, years, next_business_day(last_data_date), inputs["stock_name"], last_data_date,
+                float(data_for_prediction['closing_price'].iloc[-1]), predictions,
+            )
+    finally:
+        executor.shutdown(wait=False, cancel_futures=True)
+
+    prediction_store.purge_expired()
+    return {"predicted": len(tasks) - len(failed) - skipped, "skipped": skipped, "failed": failed}
+
+def _is_precomputed(code: str, years: int, target_date: datetime.date) -> bool:
+    return prediction_store.get(code, years, target_date) is not None
+
+def domestic_precompute_pending() -> bool:
+    """
+    Whether any watchlist prediction for the date a prediction made now would target is missing
+    from the store (the scheduler's startup catch-up check, so restarts don't rerun a finished precompute).
+    """
+    codes = list(PRECOMPUTE_CODES)
+    if PRECOMPUTE_UNIVERSE:
+        codes = list(dict.fromkeys([*codes, *get_index_constituents(PRECOMPUTE_UNIVERSE)]))
+    target_date = _expected_target_date(datetime.datetime.now(KST))
+    return any(not _is_precomputed(code, years, target_date) for code in codes for years in PRECOMPUTE_YEARS)
+
+def submit_domestic_precompute() -> dict:
+    """Queue a precompute job for the configured watchlist (called by the post-close scheduler)."""
+    job = job_manager.submit(
+        "domestic_precompute",
+        {"codes": PRECOMPUTE_CODES, "universe": PRECOMPUTE_UNIVERSE, "years": PRECOMPUTE_YEARS},
+        _precompute_domestic_predictions, PRECOMPUTE_CODES, PRECOMPUTE_UNIVERSE, PRECOMPUTE_YEARS,
+    )
+    logger.info("Queued precompute job %s", job.id)
+    return {"job_id": job.id, "status": job.status}
+
+@router.post("/domestic/precompute", status_code=202)
+async def run_domestic_precompute():
+    """
+    Run the post-close precompute for the configured watchlist now instead of waiting for
+    the scheduler. Track it with the prediction job endpoints.
+    """
+    if not PRECOMPUTE_CODES and not PRECOMPUTE_UNIVERSE:
+        raise HTTPException(status_code=400, detail="No precompute watchlist is configured.")
+    try:
+        return submit_domestic_precompute()
+    except JobQueueFullError as e:
+        raise HTTPException(status_code=429, detail=str(e))
+
+@router.get("/domestic/precompute")
+async def get_domestic_precompute_status():
+    """
+    Show the precompute watchlist, the scheduler state and how many predictions are stored
+    for the date a prediction made now would target.
+    """
+    target_date = _expected_target_date(datetime.datetime.now(KST))
+    return {
+        "watchlist": {"codes": PRECOMPUTE_CODES, "universe": PRECOMPUTE_UNIVERSE, "years": PRECOMPUTE_YEARS},
+        "scheduler": precompute_scheduler.status(),
+        "target_date": target_date.isoformat(),
+        "stored_predictions": prediction_store.count(target_date),
+    }
+
+
+def _train_domestic_global_model(job: Job, universe: Optional[str], years: int) -> dict:
+    """
+    Train the shared cross-ticker model on every listed code (or an index universe) and
+    make it the model `model=global` predictions use. Runs off the request path.
+    """
+    job.update_progress(0.0, "학습 종목 조회 중")
+    codes = get_index_constituents(universe) if universe else ticker_index.codes()
+    predictor = load_engine("predictor")
+
+    def progress(fraction: float, message: str):
+        job.raise_if_cancelled()
+        job.update_progress(fraction, message)
+
+    return predictor.train_global_model(codes, years, progress=progress)
+
+@router.post("/domestic/global-model/train", status_code=202)
+async def train_domestic_global_model(
+    universe: Optional[str] = Query(
+        None, description=f"Train on an index universe ({', '.join(INDEX_UNIVERSES)}) instead of every listed code"
+    ),
+    years: int = Query(GLOBAL_MODEL_YEARS, ge=1, description="Years of history per code")
+):
+    """
+    Train the shared cross-ticker stacking model in the background. Once it finishes,
+    `model=global` predictions load it and only run inference. Track it with the
+    prediction job endpoints; the job result holds the hold-out errors.
+    """
+    if universe is not None and universe not in INDEX_UNIVERSES:
+        raise HTTPException(status_code=400, detail=f"Unknown universe '{universe}'.")
+    try:
+        job = job_manager.submit(
+            "domestic_global_model", {"universe": universe, "years": years},
+            _train_domestic_global_model, universe, years,
+        )
+    except JobQueueFullError as e:
+        raise HTTPException(status_code=429, detail=str(e))
+    return {"job_id": job.id, "status": job.status}
+
+@router.get("/domestic/global-model")
+async def get_domestic_global_model():
+    """
+    Show the current shared cross-ticker model: when and on how many codes it was trained,
+    and its hold-out errors next to each base model. `model` is null until one is trained.
+    """
+    predictor = await run_in_threadpool(load_engine, "predictor")
+    return {"default_model": PREDICTION_MODEL, "model": await run_in_threadpool(predictor.global_model_store.metadata)}
+
+
+_TIME_PATTERN = r"^([01]\d|2[0-3]):[0-5]\d$"
 
 @router.get("/domestic/intraday")
 async def get_domestic_intraday_data(
     code: str = Query(..., description="Stock code to get intraday data for (e.g., '005930')"),
-    date: str = Query(..., description="Date for intraday data (YYYYMMDD format, e.g., '20250819')")
+    date: str = Query(..., description="Date for intraday data (YYYYMMDD format, e.g., '20250819')"),
+    since: Optional[str] = Query(None, pattern=_TIME_PATTERN, description="Only return bars after this time (HH:MM, e.g., '10:15')"),
+    response_format: ResponseFormat = Query("records", alias="format", description=_FORMAT_DESCRIPTION)
 ):
     """
     Get intraday (minute-by-minute) stock data for a given stock code and date.
+    Bars are cached on the server, so today's bars are fetched from KRX at most once
+    per poll interval. Pass the time of the last bar you have as `since` to get only newer bars
+    (an empty list means nothing new yet). `format=columns` or `format=arrow` returns column arrays.
     """
-    intraday_data = get_intraday_data(code, date)
-    
+    intraday_data = await intraday_feed.get_bars(code, date, since)
+
     if isinstance(intraday_data, dict) and "error" in intraday_data:
         raise HTTPException(status_code=500, detail=intraday_data["error"])
-    
-    if not intraday_data:
+
+    if intraday_data.empty and since is None:
         raise HTTPException(status_code=404, detail=f"No intraday data found for {code} on {date}.")
-        
-    return {"intraday_data": intraday_data}
+
+    return table_response("intraday_data", intraday_data, response_format)
+
+@router.get("/domestic/intraday/stream")
+async def stream_domestic_intraday_data(
+    request: Request,
+    code: str = Query(..., description="Stock code to watch (e.g., '005930')"),
+    since: Optional[str] = Query(None, pattern=_TIME_PATTERN, description="Skip today's bars up to this time (HH:MM)")
+):
+    """
+    Stream today's minute bars as Server-Sent Events (`event: bar`, one bar per event).
+    The bars after `since` (or all of today's bars) are sent first, then each new or
+    updated bar as it appears. All subscribers of a code share one upstream poller.
+    """
+    async def event_stream():
+        async with intraday_feed.subscribe(code) as queue:
+            last = None
+            bars = await intraday_feed.get_bars(code, today_kst())
+            while True:
+                if isinstance(bars, pd.DataFrame):
+                    for bar in bars_after(bars, last, since):
+                        last = bar
+                        yield f"event: bar\ndata: {json.dumps(bar, ensure_ascii=False)}\n\n"
+                try:
+                    bars = await asyncio.wait_for(queue.get(), timeout=INTRADAY_POLL_SECONDS)
+                except asyncio.TimeoutError:
+                    bars = None
+                    if await request.is_disconnected():
+                        break
+                    yield ": keep-alive\n\n"
+
+    return StreamingResponse(event_stream(), media_type="text/event-stream")
 
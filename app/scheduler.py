@@ -0,0 +1,95 @@
+import logging
+import datetime
+import threading
+
+import pytz
+
+from .config import PRECOMPUTE_TIME
+
+logger = logging.getLogger(__name__)
+
+KST = pytz.timezone('Asia/Seoul')
+
+
+def next_weekday_run(now: datetime.datetime, run_time: datetime.time) -> datetime.datetime:
+    """now 이후 처음 오는 평일 run_time 시각을 반환합니다."""
+    candidate = now.replace(hour=run_time.hour, minute=run_time.minute, second=0, microsecond=0)
+    if candidate <= now:
+        candidate += datetime.timedelta(days=1)
+    while candidate.weekday() >= 5:
+        candidate += datetime.timedelta(days=1)
+    return candidate
+
+
+class DailyScheduler:
+    """
+    평일 정해진 시각(KST)마다 콜백을 한 번 실행하는 데몬 스레드입니다.
+    서버가 그날 실행 시각 이후에 시작되면 시작하자마자 한 번 실행합니다. (재시작으로 놓친 실행 보충)
+    catch_up을 지정하면 그 함수가 True를 반환할 때만 보충 실행합니다. (이미 실행된 결과가 남아 있으면 건너뜀)
+    콜백은 오래 걸리는 일을 직접 하지 않고 작업(Job)을 등록한 뒤 바로 반환하는 것을 전제로 합니다.
+    """
+
+    def __init__(self, run_time: str):
+        hour, minute = (int(part) for part in run_time.split(':'))
+        self.run_time = datetime.time(hour, minute)
+        self.last_run_at = None
+        self.last_result = None
+        self.next_run_at = None
+        self._thread = None
+        self._stop = threading.Event()
+
+    def start(self, callback, catch_up=None):
+        if self._thread is not None:
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(
+            target=self._loop, args=(callback, catch_up), name="daily-scheduler", daemon=True
+        )
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        self._thread = None
+
+    def status(self) -> dict:
+        return {
+            "enabled": self._thread is not None,
+            "run_time": self.run_time.strftime('%H:%M'),
+            "next_run_at": self.next_run_at.isoformat() if self.next_run_at else None,
+            "last_run_at": self.last_run_at.isoformat() if self.last_run_at else None,
+            "last_result": self.last_result,
+        }
+
+    def _loop(self, callback, catch_up):
+        now = datetime.datetime.now(KST)
+        if now.weekday() < 5 and now.time() >= self.run_time and self._needs_catch_up(catch_up):
+            self._fire(callback)
+        while True:
+            now = datetime.datetime.now(KST)
+            self.next_run_at = next_weekday_run(now, self.run_time)
+            if self._stop.wait((self.next_run_at - now).total_seconds()):
+                return
+            self._fire(callback)
+
+    @staticmethod
+    def _needs_catch_up(catch_up) -> bool:
+        if catch_up is None:
+            return True
+        try:
+            return catch_up()
+        except Exception as e:
+            # 확인하지 못하면 실행을 놓치지 않도록 보충 실행합니다.
+            logger.warning("Catch-up check failed, running anyway: %s", e)
+            return True
+
+    def _fire(self, callback):
+        self.last_run_at = datetime.datetime.now(KST)
+        try:
+            self.last_result = callback()
+        except Exception as e:
+            logger.warning("Scheduled run failed: %s", e)
+            self.last_result = {"error": str(e)}
+
+
+# 장 마감 후 관심 종목 예측을 미리 계산하는 스케줄러 (app.main에서 관심 종목이 설정된 경우에만 시작)
+precompute_scheduler = DailyScheduler(PRECOMPUTE_TIME)
@@ -2,8 +2,10 @@ import streamlit as st
 import requests
 import pandas as pd
 import re
+import uuid
 import sys
 import os
+import logging
 import datetime # Added for date handling
 import numpy as np # Added for np.nan
 
@@ -12,7 +14,12 @@ project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..
 if project_root not in sys.path:
     sys.path.insert(0, project_root)
 
-from app.llm_analyzer import analyze_prediction_with_llm
+from app.llm_analyzer import stream_prediction_analysis
+from app.observability import configure_logging, request_id_var
+
+configure_logging()
+# streamlit run으로 실행하면 __name__이 '__main__'이므로 app 로거 아래 이름을 직접 지정
+logger = logging.getLogger("app.streamlit.ui")
 
 # FastAPI 서버의 기본 URL
 API_BASE_URL = "http://127.0.0.1:8000"
@@ -119,10 +126,16 @@ if st.button("분석 시작 🚀", use_container_width=True, disabled=(st.sessio
     else:
         col1, col2 = st.columns(2)
         prediction_message = None
+        forecasts = []
         news_articles = []
         stock_name = st.session_state.stock_to_analyze['name']
         stock_code = st.session_state.stock_to_analyze['code']
 
+        # 한 번의 분석에서 보내는 API 요청과 LLM 호출 로그를 같은 요청 ID로 묶습니다.
+        request_id = uuid.uuid4().hex
+        request_id_var.set(request_id)
+        api_headers = {"X-Request-ID": request_id}
+
         # 주식 유형에 따른 API 기본 경로 설정
         api_path_base = "domestic" if st.session_state.stock_type == '국내' else "international"
 
@@ -131,19 +144,19 @@ if st.button("분석 시작 🚀", use_container_width=True, disabled=(st.sessio
                 # 예측 API 호출
                 if api_path_base == "domestic":
                     predict_params = {"code": stock_code, "years": years_to_fetch}
-                    predict_response = requests.get(f"{API_BASE_URL}/stocks/{api_path_base}/predict", params=predict_params)
-                    predict_response.raise_for_status()
-                    prediction_message = predict_response.json().get('prediction_message', "예측 실패")
                 else: # 해외 주식
-                    # 해외 주식 예측은 아직 구현되지 않았으므로, 과거 데이터만 가져옴
-                    predict_params = {"ticker": stock_code, "period": f"{years_to_fetch}y"}
-                    predict_response = requests.get(f"{API_BASE_URL}/stocks/{api_path_base}/historical", params=predict_params)
-                    predict_response.raise_for_status()
-                    prediction_message = f"해외 주식 예측은 아직 구현되지 않았습니다. {stock_code}의 {years_to_fetch}치 과거 데이터를 가져왔습니다."
-
-                # 예측 메시지에서 가격 추출 (국내 주식에만 해당)
+                    predict_params = {"ticker": stock_code, "years": years_to_fetch}
+                predict_response = requests.get(f"{API_BASE_URL}/stocks/{api_path_base}/predict", params=predict_params, headers=api_headers)
+                predict_response.raise_for_status()
+                predict_result = predict_response.json()
+                prediction_message = predict_result.get('prediction_message', "예측 실패")
+                forecasts = predict_result.get('forecasts', [])
+
+                # 예측 메시지에서 가격 추출
                 predicted_price_value = "N/A"
-                if api_path_base == "domestic":
+                if api_path_base == "international":
+                    predicted_price_value = predict_result.get('predicted_price', "N/A")
+                else:
                     # Updated regex to extract the single predicted price from the new message format
                     price_match = re.search(r'예상 종가는 \*\*(\d{1,3}(?:,\d{3})*)\*\* 원', prediction_message)
                     if price_match:
@@ -154,7 +167,7 @@ if st.button("분석 시작 🚀", use_container_width=True, disabled=(st.sessio
                 # 뉴스 API 호출
                 if api_path_base == "domestic":
                     news_params = {"code": stock_code, "limit": 15}
-                    news_response = requests.get(f"{API_BASE_URL}/stocks/{api_path_base}/news", params=news_params)
+                    news_response = requests.get(f"{API_BASE_URL}/stocks/{api_path_base}/news", params=news_params, headers=api_headers)
                     news_response.raise_for_status()
                     news_articles = news_response.json().get('news', [])
                 else:
@@ -165,7 +178,7 @@ if st.button("분석 시작 🚀", use_container_width=True, disabled=(st.sessio
                     try:
                         today_date_str = datetime.datetime.now().strftime("%Y%m%d")
                         intraday_params = {"code": stock_code, "date": today_date_str}
-                        intraday_response = requests.get(f"{API_BASE_URL}/stocks/{api_path_base}/intraday", params=intraday_params)
+                        intraday_response = requests.get(f"{API_BASE_URL}/stocks/{api_path_base}/intraday", params=intraday_params, headers=api_headers)
                         
                         # 404 (데이터 없음) 에러는 장 시간이 아닐 때 정상일 수 있으므로, 성공(200) 케이스만 처리
                         if intraday_response.status_code == 200:
@@ -205,6 +218,17 @@ if st.button("분석 시작 🚀", use_container_width=True, disabled=(st.sessio
         with col1:
             st.subheader("📈 자체 예측 결과")
             st.success(prediction_message)
+            if forecasts:
+                # 같은 학습으로 예측한 기간별(거래일) 예상 종가
+                st.dataframe(pd.DataFrame([
+                    {
+                        "기간": f"{forecast['horizon_days']}거래일 후",
+                        "대상 날짜": forecast['target_date'],
+                        "예상 종가": forecast['predicted_price'],
+                        "최신 종가 대비(%)": forecast['change_pct'],
+                    }
+                    for forecast in forecasts
+                ]), hide_index=True, use_container_width=True)
             st.subheader("📰 관련 최신 뉴스")
             if news_articles:
                 for news_item in news_articles:
@@ -215,20 +239,13 @@ if st.button("분석 시작 🚀", use_container_width=True, disabled=(st.sessio
 
         with col2:
             st.subheader("🤖 LLM 기반 종합 분석")
-            print(f"DEBUG UI: prediction_message: {prediction_message}") # ADDED FOR DEBUGGING
-            print(f"DEBUG UI: predicted_price_value: {predicted_price_value}") # ADDED FOR DEBUGGING
-            with st.spinner("AI가 뉴스를 기반으로 예측을 분석하는 중입니다. 잠시만 기다려주세요..."):
-                analysis_result = analyze_prediction_with_llm(
-                    api_key=openai_api_key,
-                    stock_name=stock_name,
-                    prediction_message=prediction_message,
-                    predicted_price_value=predicted_price_value, # Pass the numeric predicted value
-                    news_articles=news_articles
-                )
-                print(f"DEBUG UI: analysis_result (before markdown): {analysis_result[:200]}...") # ADDED FOR DEBUGGING
-                try:
-                    st.markdown(analysis_result.encode('utf-8').decode('utf-8'))
-                except UnicodeEncodeError as e:
-                    st.error(f"분석 결과 표시 오류: {e}. 터미널 인코딩을 확인해주세요.")
-                    st.markdown(analysis_result.encode('ascii', 'replace').decode('ascii')) # 대체 표시
-
+            logger.debug("LLM 분석 요청: prediction_message=%s, predicted_price_value=%s", prediction_message, predicted_price_value)
+            # 토큰이 생성되는 대로 화면에 표시 (캐시된 분석은 한 번에 표시)
+            analysis_result = st.write_stream(stream_prediction_analysis(
+                api_key=openai_api_key,
+                stock_name=stock_name,
+                prediction_message=prediction_message,
+                predicted_price_value=predicted_price_value, # Pass the numeric predicted value
+                news_articles=news_articles
+            ))
+            logger.debug("LLM 분석 결과: %.200s", analysis_result)
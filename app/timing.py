@@ -0,0 +1,58 @@
+import time
+import logging
+import contextvars
+from contextlib import contextmanager
+
+from .observability import STAGE_SECONDS, STAGE_FAILURES
+
+logger = logging.getLogger(__name__)
+
+_recorder = contextvars.ContextVar("stage_recorder", default=None)
+
+
+class StageRecorder:
+    """한 작업(예측 요청, 벤치마크 케이스 등) 안에서 단계별로 걸린 시간과 횟수를 모읍니다."""
+
+    def __init__(self):
+        self.seconds = {}
+        self.counts = {}
+
+    def add(self, name: str, seconds: float):
+        self.seconds[name] = self.seconds.get(name, 0.0) + seconds
+        self.counts[name] = self.counts.get(name, 0) + 1
+
+    def to_dict(self) -> dict:
+        return {name: {"seconds": round(self.seconds[name], 4), "count": self.counts[name]} for name in self.seconds}
+
+
+@contextmanager
+def record_stages():
+    """with 블록 안에서 실행된 stage()들의 시간을 StageRecorder에 모읍니다."""
+    recorder = StageRecorder()
+    token = _recorder.set(recorder)
+    try:
+        yield recorder
+    finally:
+        _recorder.reset(token)
+
+
+@contextmanager
+def stage(name: str):
+    """
+    단계 하나의 실행 시간을 /metrics 히스토그램(predictiboot_stage_duration_seconds)에 기록하고,
+    기록 중인 StageRecorder가 있으면 함께 더합니다. 예외가 나면 실패 횟수도 셉니다.
+    (병렬 학습 시 워커 프로세스에서 실행된 단계는 서버의 /metrics에 나타나지 않습니다.)
+    """
+    start = time.perf_counter()
+    try:
+        yield
+    except Exception:
+        STAGE_FAILURES.labels(name).inc()
+        raise
+    finally:
+        elapsed = time.perf_counter() - start
+        STAGE_SECONDS.labels(name).observe(elapsed)
+        recorder = _recorder.get()
+        if recorder is not None:
+            recorder.add(name, elapsed)
+        logger.debug("stage %s took %.3fs", name, elapsed)
@@ -0,0 +1,531 @@
+"""
+학습 워커: 예측 학습을 API 프로세스 밖의 워커 프로세스(또는 노드)에서 실행합니다.
+
+PREDICTIBOOT_WORKER_MODE=queue이면 API는 예측 요청을 브로커의 워커별 큐에 넣고 결과를 기다리기만 합니다.
+어느 워커가 처리할지는 종목 코드의 일관된 해시(consistent hashing)로 정하므로, 같은 종목은 늘 같은 워커로 가서
+그 워커의 시세 저장소/지표/학습 모델 캐시를 계속 재사용합니다. 워커가 늘거나 줄면 그 워커 몫의 종목만 옮겨 갑니다.
+
+워커 실행: python -m app.workers [--id worker-1]
+"""
+import os
+import sys
+import json
+import time
+import uuid
+import queue
+import bisect
+import signal
+import socket
+import asyncio
+import hashlib
+import logging
+import argparse
+import importlib
+import threading
+
+from fastapi import HTTPException
+
+from .jobs import JobCancelledError
+from .observability import request_id_var, configure_logging, WORKER_TASKS, WORKER_REASSIGNED
+from .config import (
+    WORKER_MODE, WORKER_BROKER, WORKER_BROKER_DIR, WORKER_LOCAL_COUNT, WORKER_VIRTUAL_NODES,
+    WORKER_HEARTBEAT_SECONDS, WORKER_TIMEOUT_SECONDS, WORKER_TASK_TIMEOUT_SECONDS, WORKER_POLL_SECONDS
+)
+
+logger = logging.getLogger(__name__)
+
+# 작업 종류 -> fn(job, **params). 워커가 시작할 때 아래 모듈을 불러오면 각 라우터가 처리 함수를 등록합니다.
+TASK_HANDLERS = {}
+_HANDLER_MODULES = ("app.routers.prediction", "app.routers.international")
+_FINAL_STATES = ("succeeded", "failed", "cancelled")
+# 배정된 워커가 빠져 다른 워커로 다시 넣는 최대 횟수
+_MAX_ATTEMPTS = 3
+
+
+class NoWorkersError(Exception):
+    """살아 있는 학습 워커가 하나도 없을 때 발생합니다."""
+
+
+class WorkerTaskError(Exception):
+    """워커에서 실패한 작업. status_code/detail은 API 응답에 그대로 사용합니다."""
+
+    def __init__(self, status_code: int, detail: str):
+        super().__init__(detail)
+        self.status_code = status_code
+        self.detail = detail
+
+
+def task_handler(kind: str):
+    """워커에서 실행할 작업 처리 함수를 등록하는 데코레이터. 함수는 fn(job, **params)로 호출됩니다."""
+    def register(fn):
+        TASK_HANDLERS[kind] = fn
+        return fn
+    return register
+
+
+def _hash(value: str) -> int:
+    return int.from_bytes(hashlib.blake2b(value.encode('utf-8'), digest_size=8).digest(), 'big')
+
+
+class HashRing:
+    """워커마다 가상 노드 virtual_nodes개를 링에 올리고, 키는 시계 방향으로 처음 만나는 가상 노드의 워커에 배정합니다."""
+
+    def __init__(self, nodes, virtual_nodes: int = WORKER_VIRTUAL_NODES):
+        points = sorted((_hash(f"{node}#{i}"), node) for node in nodes for i in range(virtual_nodes))
+        self._points = [point for point, _ in points]
+        self._nodes = [node for _, node in points]
+
+    def node_for(self, key: str):
+        if not self._points:
+            return None
+        return self._nodes[bisect.bisect(self._points, _hash(key)) % len(self._points)]
+
+
+# --- 브로커 ---
+# 두 브로커는 같은 메서드를 제공합니다. (Redis 등 다른 큐를 쓰려면 같은 메서드의 클래스를 추가)
+# - heartbeat/leave/workers: 워커 생존 신호와 살아 있는 워커 목록
+# - put/take: 워커별 작업 큐 (take는 가져간 작업을 그 워커의 것으로 확정)
+# - withdraw: 아직 가져가지 않은 작업을 큐에서 빼기 (다른 워커로 다시 배정할 때)
+# - set_status/get_status: 작업 상태(진행률, 결과, 오류). cancel/is_cancelled: 취소 요청. forget: 끝난 작업 정리
+
+def _json_roundtrip(value):
+    # 메모리 브로커도 파일 브로커와 같이 JSON으로 주고받아, 직렬화할 수 없는 결과를 개발 중에 바로 알 수 있게 합니다.
+    return json.loads(json.dumps(value, ensure_ascii=False))
+
+
+class InProcessBroker:
+    """같은 프로세스 안의 큐입니다. API 프로세스 안에서 워커 스레드를 함께 실행할 때(개발/테스트) 사용합니다."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._queues = {}
+        self._heartbeats = {}
+        self._statuses = {}
+        self._cancelled = set()
+
+    def _queue(self, worker_id: str) -> queue.Queue:
+        with self._lock:
+            return self._queues.setdefault(worker_id, queue.Queue())
+
+    def heartbeat(self, worker_id: str):
+        with self._lock:
+            self._heartbeats[worker_id] = time.time()
+
+    def leave(self, worker_id: str):
+        with self._lock:
+            self._heartbeats.pop(worker_id, None)
+
+    def workers(self, timeout: float) -> list:
+        now = time.time()
+        with self._lock:
+            return sorted(worker_id for worker_id, seen in self._heartbeats.items() if now - seen <= timeout)
+
+    def put(self, worker_id: str, task: dict):
+        self._queue(worker_id).put(_json_roundtrip(task))
+
+    def take(self, worker_id: str, timeout: float):
+        try:
+            return self._queue(worker_id).get(timeout=timeout)
+        except queue.Empty:
+            return None
+
+    def withdraw(self, worker_id: str, task_id: str) -> bool:
+        q = self._queue(worker_id)
+        with q.mutex:
+            for task in q.queue:
+                if task["id"] == task_id:
+                    q.queue.remove(task)
+                    return True
+        return False
+
+    def set_status(self, task_id: str, status: dict):
+        with self._lock:
+            self._statuses[task_id] = _json_roundtrip(status)
+
+    def get_status(self, task_id: str):
+        with self._lock:
+            return self._statuses.get(task_id)
+
+    def cancel(self, task_id: str):
+        with self._lock:
+            self._cancelled.add(task_id)
+
+    def is_cancelled(self, task_id: str) -> bool:
+        with self._lock:
+            return task_id in self._cancelled
+
+    def forget(self, task_id: str):
+        with self._lock:
+            self._statuses.pop(task_id, None)
+            self._cancelled.discard(task_id)
+
+
+class FileBroker:
+    """
+    공유 디렉토리의 파일로 만든 큐입니다. 같은 호스트의 여러 워커 프로세스나, 같은 파일 시스템을 마운트한 노드끼리 사용합니다.
+    - workers/<워커>: 생존 신호 (수정 시각)
+    - queues/<워커>/<등록 시각>-<작업>.json: 대기 작업. 워커는 claimed/로 rename해 가져가므로 한 작업은 한 번만 가져갑니다.
+    - status/<작업>.json: 작업 상태, cancel/<작업>: 취소 요청
+    파일은 임시 파일에 쓴 뒤 rename하므로 읽는 쪽은 항상 완전한 파일만 봅니다.
+    """
+
+    def __init__(self, root: str, poll_seconds: float = 0.2):
+        self.root = root
+        self.poll_seconds = poll_seconds
+        for name in ("workers", "queues", "claimed", "status", "cancel"):
+            os.makedirs(os.path.join(root, name), exist_ok=True)
+
+    def _path(self, *parts) -> str:
+        return os.path.join(self.root, *parts)
+
+    def _write_json(self, path: str, value: dict):
+        temp_path = f"{path}.{uuid.uuid4().hex}.tmp"
+        with open(temp_path, 'w', encoding='utf-8') as f:
+            json.dump(value, f, ensure_ascii=False)
+        os.replace(temp_path, path)
+
+    def _remove(self, path: str):
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
+
+    def heartbeat(self, worker_id: str):
+        path = self._path("workers", worker_id)
+        with open(path, 'a'):
+            os.utime(path)
+
+    def leave(self, worker_id: str):
+        self._remove(self._path("workers", worker_id))
+
+    def workers(self, timeout: float) -> list:
+        now, alive = time.time(), []
+        for worker_id in os.listdir(self._path("workers")):
+            try:
+                if now - os.path.getmtime(self._path("workers", worker_id)) <= timeout:
+                    alive.append(worker_id)
+            except FileNotFoundError:
+                continue
+        return sorted(alive)
+
+    def put(self, worker_id: str, task: dict):
+        directory = self._path("queues", worker_id)
+        os.makedirs(directory, exist_ok=True)
+        self._write_json(os.path.join(directory, f"{time.time_ns():020d}-{task['id']}.json"), task)
+
+    def take(self, worker_id: str, timeout: float):
+        directory = self._path("queues", worker_id)
+        os.makedirs(directory, exist_ok=True)
+        deadline = time.time() + timeout
+        while True:
+            for name in sorted(name for name in os.listdir(directory) if name.endswith(".json")):
+                claimed = self._path("claimed", name.split("-", 1)[1])
+                try:
+                    os.replace(os.path.join(directory, name), claimed)
+                except FileNotFoundError:
+                    continue  # 다른 스레드가 먼저 가져감
+                with open(claimed, encoding='utf-8') as f:
+                    return json.load(f)
+            remaining = deadline - time.time()
+            if remaining <= 0:
+                return None
+            time.sleep(min(self.poll_seconds, remaining))
+
+    def withdraw(self, worker_id: str, task_id: str) -> bool:
+        directory = self._path("queues", worker_id)
+        try:
+            names = [name for name in os.listdir(directory) if name.endswith(f"-{task_id}.json")]
+        except FileNotFoundError:
+            return False
+        for name in names:
+            try:
+                os.remove(os.path.join(directory, name))
+                return True
+            except FileNotFoundError:
+                continue  # 워커가 방금 가져감
+        return False
+
+    def set_status(self, task_id: str, status: dict):
+        self._write_json(self._path("status", f"{task_id}.json"), status)
+
+    def get_status(self, task_id: str):
+        try:
+            with open(self._path("status", f"{task_id}.json"), encoding='utf-8') as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return None
+
+    def cancel(self, task_id: str):
+        with open(self._path("cancel", task_id), 'a'):
+            pass
+
+    def is_cancelled(self, task_id: str) -> bool:
+        return os.path.exists(self._path("cancel", task_id))
+
+    def forget(self, task_id: str):
+        for path in (self._path("status", f"{task_id}.json"), self._path("cancel", task_id),
+                     self._path("claimed", f"{task_id}.json")):
+            self._remove(path)
+
+
+def make_broker(kind: str = WORKER_BROKER, root: str = WORKER_BROKER_DIR):
+    if kind == "memory":
+        return InProcessBroker()
+    if kind == "file":
+        return FileBroker(root)
+    raise ValueError(f"Unknown worker broker '{kind}' (expected 'memory' or 'file').")
+
+
+# --- API 쪽: 작업 배정과 결과 대기 ---
+
+class WorkerClient:
+    """
+    작업을 종목 코드(key)로 해시 링에서 고른 워커의 큐에 넣고 결과를 기다립니다.
+    링은 살아 있는 워커 목록이 바뀔 때마다 다시 만들며, 배정된 워커가 끝내지 못하고 링에서 빠지면
+    같은 키의 새 담당 워커에게 작업을 다시 넣습니다.
+    """
+
+    def __init__(self, broker, virtual_nodes: int = WORKER_VIRTUAL_NODES, worker_timeout: float = WORKER_TIMEOUT_SECONDS,
+                 task_timeout: float = WORKER_TASK_TIMEOUT_SECONDS, poll_seconds: float = WORKER_POLL_SECONDS):
+        self.broker = broker
+        self.virtual_nodes = virtual_nodes
+        self.worker_timeout = worker_timeout
+        self.task_timeout = task_timeout
+        self.poll_seconds = poll_seconds
+        self._lock = threading.Lock()
+        self._ring_nodes = None
+        self._ring = None
+
+    def fleet(self) -> list:
+        return self.broker.workers(self.worker_timeout)
+
+    def route(self, key: str) -> str:
+        nodes = tuple(self.fleet())
+        if not nodes:
+            raise NoWorkersError("No training workers are available.")
+        with self._lock:
+            if nodes != self._ring_nodes:
+                self._ring, self._ring_nodes = HashRing(nodes, self.virtual_nodes), nodes
+            return self._ring.node_for(key)
+
+    def submit(self, kind: str, key: str, params: dict) -> dict:
+        task = {
+            "id": uuid.uuid4().hex, "kind": kind, "key": key, "params": params,
+            "request_id": request_id_var.get(), "created_at": time.time(), "attempt": 1,
+        }
+        task["worker"] = self.route(key)
+        self.broker.put(task["worker"], task)
+        WORKER_TASKS.labels(task["worker"], kind).inc()
+        return task
+
+    def _poll(self, task: dict):
+        """
+        작업 상태를 읽고, 끝나지 않았는데 배정된 워커가 빠졌으면 다른 워커에게 다시 넣습니다.
+        이전 워커의 큐에 남은 작업은 빼고(같은 id로 다시 시작한 워커가 실행하지 않도록), 이미 가져간 작업이면
+        그 실행을 취소합니다. 다시 넣은 작업은 새 id를 받으므로 이전 실행의 취소/상태와 섞이지 않습니다.
+        """
+        status = self.broker.get_status(task["id"])
+        if status is not None and status["status"] in _FINAL_STATES:
+            return status
+        if task["worker"] not in self.fleet():
+            if task["attempt"] >= _MAX_ATTEMPTS:
+                raise WorkerTaskError(503, f"Training worker {task['worker']} left before finishing the task.")
+            previous, previous_id = task["worker"], task["id"]
+            if not self.broker.withdraw(previous, previous_id):
+                self.broker.cancel(previous_id)
+            task["id"] = uuid.uuid4().hex
+            task["attempt"] += 1
+            task["worker"] = self.route(task["key"])
+            self.broker.put(task["worker"], task)
+            WORKER_REASSIGNED.inc()
+            logger.warning("Worker %s left; moved task %s to %s as %s", previous, previous_id, task["worker"], task["id"])
+            return None
+        return status
+
+    def _result(self, task: dict, status: dict):
+        self.broker.forget(task["id"])
+        if status["status"] == "succeeded":
+            return status["result"]
+        if status["status"] == "cancelled":
+            raise JobCancelledError()
+        raise WorkerTaskError(status.get("status_code") or 500, status.get("error") or "Training worker failed.")
+
+    def run(self, kind: str, key: str, params: dict, job=None):
+        """
+        작업을 배정하고 끝날 때까지 기다려 결과를 반환합니다. (작업 스레드에서 호출)
+        job이 주어지면 워커의 진행률을 job에 옮기고, job이 취소되면 워커에도 취소를 요청합니다.
+        """
+        task = self.submit(kind, key, params)
+        deadline = time.time() + self.task_timeout
+        last_progress = None
+        try:
+            while True:
+                status = self._poll(task)
+                if status is not None and status["status"] in _FINAL_STATES:
+                    return self._result(task, status)
+                if job is not None:
+                    job.raise_if_cancelled()
+                    if status is not None and (status["progress"], status["message"]) != last_progress:
+                        last_progress = (status["progress"], status["message"])
+                        job.update_progress(*last_progress)
+                if time.time() >= deadline:
+                    raise WorkerTaskError(504, "Timed out waiting for the training worker.")
+                time.sleep(self.poll_seconds)
+        except (JobCancelledError, WorkerTaskError, NoWorkersError):
+            self.broker.cancel(task["id"])
+            raise
+
+    async def run_async(self, kind: str, key: str, params: dict):
+        """run과 같지만 이벤트 루프를 막지 않고 기다립니다. 요청이 끊기면(작업 취소) 워커에도 취소를 요청합니다."""
+        task = await asyncio.to_thread(self.submit, kind, key, params)
+        deadline = time.time() + self.task_timeout
+        try:
+            while True:
+                status = await asyncio.to_thread(self._poll, task)
+                if status is not None and status["status"] in _FINAL_STATES:
+                    return self._result(task, status)
+                if time.time() >= deadline:
+                    raise WorkerTaskError(504, "Timed out waiting for the training worker.")
+                await asyncio.sleep(self.poll_seconds)
+        except (asyncio.CancelledError, WorkerTaskError, NoWorkersError):
+            self.broker.cancel(task["id"])
+            raise
+
+
+# queue 모드에서만 만들어집니다. (local 모드에서는 None이며 라우터가 직접 학습)
+worker_client = WorkerClient(make_broker()) if WORKER_MODE == "queue" else None
+
+
+async def run_on_worker(kind: str, key: str, params: dict):
+    """요청 처리 중 워커에서 작업을 실행하고, 실패를 HTTP 오류로 바꿉니다."""
+    try:
+        return await worker_client.run_async(kind, key, params)
+    except NoWorkersError as e:
+        raise HTTPException(status_code=503, detail=str(e))
+    except WorkerTaskError as e:
+        raise HTTPException(status_code=e.status_code, detail=e.detail)
+    except JobCancelledError:
+        raise HTTPException(status_code=499, detail="The prediction was cancelled.")
+
+
+# --- 워커 쪽: 작업 실행 ---
+
+class RemoteJob:
+    """워커에서 실행 중인 작업. Job과 같은 update_progress/raise_if_cancelled를 브로커를 통해 API에 전달합니다."""
+
+    def __init__(self, broker, task: dict, worker_id: str):
+        self.broker = broker
+        self.task = task
+        self.worker_id = worker_id
+
+    def update_progress(self, progress: float, message: str):
+        self.broker.set_status(self.task["id"], {
+            "status": "running", "progress": progress, "message": message, "worker": self.worker_id,
+        })
+
+    def raise_if_cancelled(self):
+        if self.broker.is_cancelled(self.task["id"]):
+            raise JobCancelledError()
+
+
+def _load_task_handlers():
+    for module in _HANDLER_MODULES:
+        importlib.import_module(module)
+
+
+def _execute(broker, task: dict, worker_id: str):
+    task_id = task["id"]
+    if broker.is_cancelled(task_id):
+        broker.forget(task_id)
+        return
+    job = RemoteJob(broker, task, worker_id)
+    # 요청 ID를 이어받아 워커의 로그도 API 요청과 함께 찾을 수 있게 합니다.
+    token = request_id_var.set(task.get("request_id") or "-")
+    status = {"worker": worker_id, "progress": 1.0, "message": "완료"}
+    try:
+        try:
+            handler = TASK_HANDLERS.get(task["kind"])
+            if handler is None:
+                raise WorkerTaskError(400, f"Unknown task kind '{task['kind']}'.")
+            job.update_progress(0.0, "실행 중")
+            result = handler(job, **task["params"])
+        except JobCancelledError:
+            status.update(status="cancelled", message="취소됨")
+        except Exception as e:
+            status.update(status="failed", message="실패", status_code=getattr(e, "status_code", 500),
+                          error=getattr(e, "detail", None) or str(e))
+        else:
+            status.update(status="succeeded", result=result)
+
+        if broker.is_cancelled(task_id):
+            broker.forget(task_id)  # 기다리던 쪽이 이미 취소했으므로 결과를 남기지 않습니다.
+        else:
+            broker.set_status(task_id, status)
+        logger.info("Task %s (%s %s) %s on %s", task_id, task["kind"], task.get("key"), status["status"], worker_id)
+    finally:
+        request_id_var.reset(token)
+
+
+def run_worker(worker_id: str, broker, stop: threading.Event = None):
+    """stop이 설정될 때까지 worker_id의 큐에서 작업을 하나씩 가져와 실행합니다."""
+    _load_task_handlers()
+    stop = stop or threading.Event()
+
+    def heartbeat():
+        while not stop.wait(WORKER_HEARTBEAT_SECONDS):
+            broker.heartbeat(worker_id)
+
+    broker.heartbeat(worker_id)
+    threading.Thread(target=heartbeat, name=f"heartbeat-{worker_id}", daemon=True).start()
+    logger.info("Worker %s is taking tasks", worker_id)
+    try:
+        while not stop.is_set():
+            task = broker.take(worker_id, timeout=1.0)
+            if task is not None:
+                _execute(broker, task, worker_id)
+    finally:
+        broker.leave(worker_id)
+        logger.info("Worker %s stopped", worker_id)
+
+
+_local_stop = threading.Event()
+
+
+def start_local_workers(count: int = WORKER_LOCAL_COUNT):
+    """메모리 브로커일 때 API 프로세스 안에서 워커 스레드를 실행합니다. (개발/테스트용)"""
+    _local_stop.clear()
+    for index in range(count):
+        threading.Thread(
+            target=run_worker, args=(f"local-{index}", worker_client.broker, _local_stop),
+            name=f"worker-local-{index}", daemon=True
+        ).start()
+
+
+def stop_local_workers():
+    _local_stop.set()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run a PredictiBoot training worker.")
+    parser.add_argument('--id', default=f"{socket.gethostname()}-{os.getpid()}",
+                        help="Worker id on the hash ring (keep it stable across restarts to keep its tickers)")
+    args = parser.parse_args()
+    if WORKER_BROKER == "memory":
+        parser.error("The memory broker only works inside the API process; set PREDICTIBOOT_WORKER_BROKER=file.")
+
+    configure_logging()
+    # 첫 작업이 TensorFlow/XGBoost 로딩을 기다리지 않도록 미리 불러옵니다.
+    from .engines import load_engine
+    load_engine("predictor")
+
+    stop = threading.Event()
+    signal.signal(signal.SIGTERM, lambda *_: stop.set())
+    try:
+        run_worker(args.id, make_broker(), stop)
+    except KeyboardInterrupt:
+        stop.set()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
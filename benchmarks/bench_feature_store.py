@@ -0,0 +1,104 @@
+"""
+기술적 지표 계산 단계의 벤치마크.
+
+기존 방식(종목마다 _create_features로 전체 이력을 pandas rolling 계산)과
+현재 방식(전 종목 종가 행렬을 한 번에 계산하는 compute_panel_features, 새 봉만 계산하는 FeatureStore.update)을
+시장 전체 규모(기본 2,500종목 x 5년)의 합성 데이터로 비교하고, 결과가 기존 방식과 같은지 확인합니다.
+
+실행: python benchmarks/bench_feature_store.py [종목 수]
+"""
+import os
+import sys
+import time
+import tempfile
+
+import numpy as np
+import pandas as pd
+
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+if project_root not in sys.path:
+    sys.path.insert(0, project_root)
+
+from app.domestic.feature_store import FeatureStore, FEATURE_COLUMNS, compute_panel_features, _bottom_aligned
+
+TRADING_DAYS_PER_YEAR = 248
+YEARS = 5
+
+
+def make_closes(tickers: int, seed: int = 0) -> dict:
+    """종목마다 상장일이 달라 길이가 다른 종가 Series를 만듭니다."""
+    rng = np.random.default_rng(seed)
+    n = YEARS * TRADING_DAYS_PER_YEAR
+    dates = pd.bdate_range('2021-01-01', periods=n)
+    closes = {}
+    for i in range(tickers):
+        length = n if i % 10 else int(rng.integers(30, n))
+        values = 10000 * np.exp(np.cumsum(rng.normal(0, 0.02, length)))
+        closes[f"{i:06d}"] = pd.Series(values, index=dates[-length:])
+    return closes
+
+
+def legacy_features(close: pd.Series) -> pd.DataFrame:
+    """기존 predictor._create_features의 지표 계산 부분."""
+    df_new = pd.DataFrame({'closing_price': close})
+    df_new['sma5'] = df_new['closing_price'].rolling(5).mean()
+    df_new['sma20'] = df_new['closing_price'].rolling(20).mean()
+    delta = df_new['closing_price'].diff(1)
+    gain = (delta.where(delta > 0, 0)).rolling(window=14).mean()
+    loss = (-delta.where(delta < 0, 0)).rolling(window=14).mean()
+    rs = gain / loss
+    df_new['rsi'] = 100 - (100 / (1 + rs))
+    df_new['price_change_ratio'] = df_new['closing_price'].pct_change()
+    return df_new[FEATURE_COLUMNS]
+
+
+def assert_same(expected: pd.DataFrame, actual: pd.DataFrame, label: str):
+    np.testing.assert_allclose(actual.values, expected.values, rtol=1e-9, atol=1e-9, equal_nan=True, err_msg=label)
+
+
+def main():
+    tickers = int(sys.argv[1]) if len(sys.argv) > 1 else 2500
+    closes = make_closes(tickers)
+    print(f"{tickers} tickers x {YEARS}y")
+
+    start = time.perf_counter()
+    legacy = {code: legacy_features(close) for code, close in closes.items()}
+    print(f"  legacy per-ticker rolling : {time.perf_counter() - start:7.2f}s")
+
+    start = time.perf_counter()
+    panel = compute_panel_features(_bottom_aligned({code: close.values for code, close in closes.items()}))
+    print(f"  panel (in-memory)         : {time.perf_counter() - start:7.2f}s")
+    for code in list(closes)[:50]:
+        close = closes[code]
+        actual = pd.DataFrame({name: panel[name][code].values[-len(close):] for name in FEATURE_COLUMNS})
+        assert_same(legacy[code], actual, code)
+
+    with tempfile.TemporaryDirectory() as root:
+        store = FeatureStore(root)
+        start = time.perf_counter()
+        store.update(closes)
+        print(f"  store full build          : {time.perf_counter() - start:7.2f}s")
+
+        # 다음 거래일 봉 하나 추가 + 장중에 바뀐 마지막 봉
+        next_day = max(close.index[-1] for close in closes.values()) + pd.offsets.BDay(1)
+        appended = {}
+        for code, close in closes.items():
+            close = close.copy()
+            close.iloc[-1] *= 1.01
+            close.loc[next_day] = close.iloc[-1] * 0.99
+            appended[code] = close
+        start = time.perf_counter()
+        result = store.update(appended)
+        print(f"  store daily append        : {time.perf_counter() - start:7.2f}s")
+        for code in list(appended)[:50]:
+            assert_same(legacy_features(appended[code]), result[code][FEATURE_COLUMNS], code)
+
+        code = next(iter(appended))
+        start = time.perf_counter()
+        store.get(code, appended[code])
+        print(f"  store per-request read    : {(time.perf_counter() - start) * 1000:7.2f}ms")
+    print("  results match legacy features")
+
+
+if __name__ == "__main__":
+    main()
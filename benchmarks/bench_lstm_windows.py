@@ -0,0 +1,195 @@
+"""
+LSTM 입력 시퀀스 생성 단계의 마이크로 벤치마크.
+
+기존 방식(파이썬 루프로 60일 슬라이스를 모은 뒤 np.array로 float64 복사, 메타/최종 단계마다 스케일러 재학습)과
+현재 방식(스케일러 1회 학습, float32 strided sliding-window view)을 1년/3년/5년 데이터에 대해 비교합니다.
+현재 방식은 예측기의 _lstm_training_pairs/_sliding_windows와 메타 분할(_split_for_meta)을 그대로 사용합니다.
+model.fit은 입력 view를 어차피 연속 배열로 복사하므로, 입력 생성 단계의 메모리는 그 복사까지 포함해 잽니다.
+
+입력 생성 단계 표에는 모델 학습 시간이 들어 있지 않습니다. 이어서 (--no-fit이 아니면) 방식마다 별도 프로세스에서
+메타/최종 단계 LSTM을 1 epoch씩 실제로 학습하며 최대 RSS가 학습 전보다 얼마나 늘었는지 잽니다.
+(기존 방식은 단일 기간 타깃을 예측 기간 수만큼 복제해 같은 모델 구조로 학습)
+
+실행: python benchmarks/bench_lstm_windows.py [--no-fit]
+"""
+import os
+import sys
+import json
+import time
+import argparse
+import resource
+import subprocess
+import tracemalloc
+
+import numpy as np
+import pandas as pd
+from sklearn.preprocessing import MinMaxScaler
+
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+if project_root not in sys.path:
+    sys.path.insert(0, project_root)
+
+from app.domestic.predictor import (
+    HORIZONS, LSTM_FEATURES, PREDICTION_DAYS, _fit_lstm_scaler, _scale_lstm_inputs, _sliding_windows,
+    _lstm_training_pairs, _create_features, _training_rows, _split_for_meta
+)
+
+TRADING_DAYS_PER_YEAR = 248
+META_SIZE = 60  # 기존 방식의 메타 학습 구간
+REPEATS = 20
+
+
+def make_ohlcv(years: int, seed: int = 0) -> pd.DataFrame:
+    rng = np.random.default_rng(seed)
+    n = years * TRADING_DAYS_PER_YEAR
+    close = 50000 * np.exp(np.cumsum(rng.normal(0, 0.02, n)))
+    return pd.DataFrame({
+        'closing_price': close,
+        'opening_price': close * (1 + rng.normal(0, 0.005, n)),
+        'high_price': close * (1 + np.abs(rng.normal(0, 0.01, n))),
+        'low_price': close * (1 - np.abs(rng.normal(0, 0.01, n))),
+        'volume': rng.integers(100000, 5000000, n).astype(float),
+    }, index=pd.bdate_range('2020-01-01', periods=n))
+
+
+def legacy_stage(train_df: pd.DataFrame, predict_df: pd.DataFrame):
+    """기존 _train_and_predict_lstm의 입력 생성 부분 (학습/예측 제외)."""
+    train_data = train_df[LSTM_FEATURES].values
+    scaler = MinMaxScaler(feature_range=(0, 1))
+    scaler.fit(train_data)
+    train_data_scaled = scaler.transform(train_data)
+    scaler_close = MinMaxScaler(feature_range=(0, 1))
+    scaler_close.fit(train_df[['closing_price']])
+
+    x_train, y_train = [], []
+    for i in range(PREDICTION_DAYS, len(train_data_scaled)):
+        x_train.append(train_data_scaled[i-PREDICTION_DAYS:i])
+        y_train.append(train_data_scaled[i, 0])
+    x_train, y_train = np.array(x_train), np.array(y_train)
+
+    total_data = pd.concat([train_df[LSTM_FEATURES], predict_df[LSTM_FEATURES]], axis=0)
+    inputs = total_data[len(total_data) - len(predict_df) - PREDICTION_DAYS:].values
+    inputs_scaled = scaler.transform(inputs)
+    x_predict = []
+    for i in range(PREDICTION_DAYS, len(inputs_scaled)):
+        x_predict.append(inputs_scaled[i-PREDICTION_DAYS:i])
+    x_predict = np.array(x_predict)
+    return x_train, y_train, x_predict
+
+
+def legacy_request(df: pd.DataFrame):
+    """요청 1건: 메타 단계 + 최종 단계."""
+    meta = legacy_stage(df.iloc[:-META_SIZE], df.iloc[-META_SIZE:])
+    final = legacy_stage(df, df.iloc[[-1]])
+    return meta, final
+
+
+def meta_positions_for(df: pd.DataFrame) -> np.ndarray:
+    """예측기와 같은 방식으로 메타 학습 구간의 LSTM 위치를 구합니다. (지표 계산은 측정에서 제외)"""
+    return _split_for_meta(df, _training_rows(_create_features(df)))[2]
+
+
+def current_request(df: pd.DataFrame, meta_positions: np.ndarray):
+    """요청 1건: 스케일러 1회 학습 후 같은 float32 배열의 view를 메타/최종 단계에서 공유. (예측기와 같은 함수 사용)"""
+    scaler = _fit_lstm_scaler(df)
+    data_scaled = _scale_lstm_inputs(scaler, df)
+    windows = _sliding_windows(data_scaled)
+
+    x_meta_train, y_meta_train = _lstm_training_pairs(data_scaled[:meta_positions[0]])
+    x_meta_predict = windows[meta_positions - PREDICTION_DAYS]
+    x_train, y_train = _lstm_training_pairs(data_scaled)
+    x_predict = windows[[len(data_scaled) - PREDICTION_DAYS]]
+    return (x_meta_train, y_meta_train, x_meta_predict), (x_train, y_train, x_predict)
+
+
+def materialized(func):
+    """model.fit/predict가 하는 것처럼 각 단계의 입력을 연속 배열로 복사한 결과까지 만듭니다."""
+    def run(df, *args):
+        return [tuple(np.ascontiguousarray(array) for array in stage) for stage in func(df, *args)]
+    return run
+
+
+def measure(func, df: pd.DataFrame, *args):
+    func(df, *args)  # warm-up
+    start = time.perf_counter()
+    for _ in range(REPEATS):
+        func(df, *args)
+    elapsed_ms = (time.perf_counter() - start) / REPEATS * 1000
+
+    tracemalloc.start()
+    result = func(df, *args)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del result
+    return elapsed_ms, peak / 1024 ** 2
+
+
+def _peak_rss_mib() -> float:
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024  # Linux: KiB
+
+
+def fit_child(method: str, years: int):
+    """별도 프로세스에서 메타/최종 단계 LSTM을 1 epoch씩 학습하고 최대 RSS 증가량을 출력합니다."""
+    from app.domestic.predictor import _build_lstm_model
+
+    df = make_ohlcv(years)
+    model = _build_lstm_model((PREDICTION_DAYS, len(LSTM_FEATURES)))
+    # 그래프 생성 등 한 번만 드는 메모리는 작은 데이터로 먼저 학습해 기준선에서 뺍니다.
+    warmup = np.zeros((64, PREDICTION_DAYS, len(LSTM_FEATURES)), dtype=np.float32)
+    model.fit(warmup, np.zeros((64, len(HORIZONS)), dtype=np.float32), epochs=1, batch_size=32, verbose=0)
+    baseline = _peak_rss_mib()
+
+    if method == "legacy":
+        for x_train, y_train, x_predict in legacy_request(df):
+            y_train = np.repeat(y_train[:, None], len(HORIZONS), axis=1)
+            model.fit(x_train, y_train, epochs=1, batch_size=32, verbose=0)
+            model.predict(x_predict, verbose=0)
+    else:
+        for x_train, y_train, x_predict in current_request(df, meta_positions_for(df)):
+            model.fit(x_train, y_train, epochs=1, batch_size=32, verbose=0)
+            model.predict(x_predict, verbose=0)
+    print("RESULT " + json.dumps({"peak_rss_mib": _peak_rss_mib(), "fit_rss_delta_mib": _peak_rss_mib() - baseline}))
+
+
+def run_fit_child(method: str, years: int) -> dict:
+    completed = subprocess.run(
+        [sys.executable, os.path.abspath(__file__), "--fit-child", method, "--years", str(years)],
+        capture_output=True, text=True, check=True
+    )
+    line = next(line for line in completed.stdout.splitlines() if line.startswith("RESULT "))
+    return json.loads(line[len("RESULT "):])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--no-fit', action='store_true', help="실제 학습의 최대 RSS 측정을 건너뜀")
+    parser.add_argument('--fit-child', choices=("legacy", "current"), help=argparse.SUPPRESS)
+    parser.add_argument('--years', type=int, default=1, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    if args.fit_child:
+        fit_child(args.fit_child, args.years)
+        return
+
+    print("입력 생성 (fit이 하는 연속 배열 복사 포함)")
+    print(f"{'years':>5} {'rows':>6} | {'legacy ms':>10} {'legacy MiB':>11} | {'current ms':>10} {'current MiB':>11} | {'speedup':>7} {'mem saved':>9}")
+    for years in (1, 3, 5):
+        df = make_ohlcv(years)
+        meta_positions = meta_positions_for(df)
+        legacy_ms, legacy_mib = measure(materialized(legacy_request), df)
+        current_ms, current_mib = measure(materialized(current_request), df, meta_positions)
+        print(
+            f"{years:>5} {len(df):>6} | {legacy_ms:>10.2f} {legacy_mib:>11.2f} | {current_ms:>10.2f} {current_mib:>11.2f} | "
+            f"{legacy_ms / current_ms:>6.1f}x {legacy_mib - current_mib:>8.2f}M"
+        )
+
+    if args.no_fit:
+        return
+    print("\n실제 학습 (메타/최종 단계 1 epoch씩, 최대 RSS 증가량)")
+    print(f"{'years':>5} | {'legacy MiB':>10} | {'current MiB':>11}")
+    for years in (1, 3, 5):
+        legacy, current = run_fit_child("legacy", years), run_fit_child("current", years)
+        print(f"{years:>5} | {legacy['fit_rss_delta_mib']:>10.1f} | {current['fit_rss_delta_mib']:>11.1f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,100 @@
+"""
+서버 콜드 스타트 벤치마크.
+
+새 파이썬 프로세스에서 app.main을 불러와 다음을 측정합니다. (각 시나리오를 --repeat 회 반복한 중앙값)
+
+- import: app.main을 불러오는 데 걸린 시간과 그 시점의 RSS, 이미 불러온 무거운 모듈
+- first response: 서버 시작(lifespan) 후 `GET /`에 처음 응답하기까지 걸린 시간 (프로세스 시작 기준)
+- ready: 백그라운드 워밍업이 끝나 `GET /ready`가 200을 반환하기까지 걸린 시간과 그 시점의 RSS
+
+시나리오
+- lazy: 워밍업 없이 처음 사용할 때만 엔진을 불러오는 경우 (PREDICTIBOOT_WARMUP_ENGINES="")
+- warmup: 기본 설정 (요청을 받기 시작한 뒤 백그라운드에서 엔진을 불러옴)
+- eager: 예전처럼 시작 시 예측 모듈(TensorFlow/XGBoost)과 pykrx/bs4를 모두 불러온 뒤 응답하는 경우
+
+실행: python benchmarks/bench_startup.py [--repeat 3] [--output 결과.json]
+"""
+import os
+import sys
+import json
+import argparse
+import statistics
+import subprocess
+
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+
+HEAVY_MODULES = ['tensorflow', 'xgboost', 'sklearn', 'pykrx', 'bs4', 'yfinance']
+
+CHILD = r"""
+import os, sys, time, json, resource
+start = time.perf_counter()
+sys.path.insert(0, {root!r})
+
+def rss_mib():
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return round(peak / (1024 * 1024) if sys.platform == 'darwin' else peak / 1024, 1)
+
+import app.main
+result = {{"import_seconds": time.perf_counter() - start, "import_rss_mib": rss_mib()}}
+result["heavy_modules_after_import"] = [m for m in {heavy!r} if m in sys.modules]
+
+if {eager!r}:
+    from app.engines import load_engine
+    for name in ("predictor", "pykrx", "bs4"):
+        load_engine(name)
+
+from fastapi.testclient import TestClient
+with TestClient(app.main.app) as client:
+    client.get("/")
+    result["first_response_seconds"] = time.perf_counter() - start
+    while client.get("/ready").status_code != 200:
+        time.sleep(0.05)
+    result["ready_seconds"] = time.perf_counter() - start
+    result["ready_rss_mib"] = rss_mib()
+print("RESULT " + json.dumps(result))
+"""
+
+SCENARIOS = {
+    "lazy": {"env": {"PREDICTIBOOT_WARMUP_ENGINES": ""}, "eager": False},
+    "warmup": {"env": {}, "eager": False},
+    "eager": {"env": {"PREDICTIBOOT_WARMUP_ENGINES": ""}, "eager": True},
+}
+
+
+def run_scenario(name: str) -> dict:
+    scenario = SCENARIOS[name]
+    env = dict(os.environ, **scenario["env"])
+    code = CHILD.format(root=project_root, heavy=HEAVY_MODULES, eager=scenario["eager"])
+    completed = subprocess.run([sys.executable, "-c", code], env=env, capture_output=True, text=True, check=True)
+    line = next(line for line in completed.stdout.splitlines() if line.startswith("RESULT "))
+    return json.loads(line[len("RESULT "):])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--output', help="결과 JSON 경로")
+    args = parser.parse_args()
+
+    summary = {}
+    for name in SCENARIOS:
+        runs = [run_scenario(name) for _ in range(args.repeat)]
+        summary[name] = {
+            key: statistics.median(run[key] for run in runs)
+            for key in ("import_seconds", "import_rss_mib", "first_response_seconds", "ready_seconds", "ready_rss_mib")
+        }
+        summary[name]["heavy_modules_after_import"] = runs[0]["heavy_modules_after_import"]
+        s = summary[name]
+        print(
+            f"{name:>7}: import {s['import_seconds']:.2f}s ({s['import_rss_mib']:.0f}MiB), "
+            f"first response {s['first_response_seconds']:.2f}s, ready {s['ready_seconds']:.2f}s "
+            f"({s['ready_rss_mib']:.0f}MiB), heavy modules at import: {s['heavy_modules_after_import'] or '-'}"
+        )
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(summary, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,320 @@
+"""
+스태킹 하이브리드 모델의 워크포워드(walk-forward) 백테스트 및 지연 시간 벤치마크.
+
+저장된 일봉 픽스처(네트워크 사용 없음)의 마지막 --steps 거래일 각각에 대해, 그 전날까지의 1/2/3/5년 데이터로
+모델을 처음부터 학습해 다음 날 종가를 예측하고 실제 종가와 비교합니다. 같은 학습으로 예측한 더 긴 기간
+(PREDICTIBOOT_PREDICTION_HORIZONS)은 픽스처 안에 실제 종가가 있는 경우에만 기간별 MAE/MAPE로 집계합니다.
+(종목, 기간) 조합마다 새 프로세스에서 실행하여 다음을 측정합니다.
+
+- 정확도: MAE, MAPE, 방향 정확도(전날 종가 대비 상승/하락 방향이 맞은 비율)
+- 속도: 예측 1회당 소요 시간, 프로세스 최대 메모리(peak RSS), 단계별 시간(피처 생성, LSTM/XGBoost 학습, 메타 모델 등)
+- 학습 모드: --budget(초)으로 예측마다 학습 시간 예산을 주면 예산에 맞춰 선택된 모드(full, reduced, xgboost_only)의 분포
+- 공통 모델 비교: --model global은 전 종목 공통 모델(추론만)로, --model compare는 종목별 모델과 공통 모델을 함께
+  실행해 두 모델의 정확도와 예측 1회당 경과 시간/CPU 시간을 나란히 보고합니다. 공통 모델은 모든 픽스처의
+  워크포워드 구간 이전 데이터로 임시 디렉토리에 한 번 학습합니다. (--baseline으로 종목별 모델 결과와도 비교 가능)
+
+결과는 JSON으로 저장하며, --baseline으로 이전 결과를 주면 예측 1회당 시간이 --tolerance 이상 늘어난
+조합을 회귀로 보고하고 종료 코드 1을 반환합니다.
+
+픽스처는 benchmarks/fixtures/<종목코드>.parquet (로컬 시세 저장소와 같은 형식)이며,
+--record 005930 000660 ... 으로 로컬 시세 저장소에서 기록할 수 있습니다. (이때만 네트워크 사용)
+픽스처가 없으면 합성 데이터(synthetic-*)로 실행합니다.
+
+실행: python benchmarks/bench_walk_forward.py [--years 1 2 3 5] [--steps 3] [--budget 30] [--model compare]
+      [--output 결과.json] [--baseline 이전결과.json]
+"""
+import os
+import sys
+import json
+import glob
+import time
+import argparse
+import datetime
+import platform
+import resource
+import tempfile
+import subprocess
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+if project_root not in sys.path:
+    sys.path.insert(0, project_root)
+
+from bench_lstm_windows import TRADING_DAYS_PER_YEAR, make_ohlcv
+
+FIXTURE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'fixtures')
+RESULT_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'results')
+SYNTHETIC_FIXTURES = 3
+FIXTURE_YEARS = 6
+
+
+def record_fixtures(codes: list, years: int):
+    """로컬 시세 저장소(필요 시 pykrx 동기화)에서 종목별 일봉을 픽스처로 저장합니다."""
+    from app.domestic.ohlcv_store import ohlcv_store
+
+    os.makedirs(FIXTURE_DIR, exist_ok=True)
+    for code in codes:
+        frame = ohlcv_store.get(code, years)
+        frame.to_parquet(os.path.join(FIXTURE_DIR, f"{code}.parquet"))
+        print(f"recorded {code}: {len(frame)} bars ({frame.index[0].date()} ~ {frame.index[-1].date()})")
+
+
+def load_fixtures() -> dict:
+    """{이름: 날짜 인덱스 OHLCV 데이터프레임}. 기록된 픽스처가 없으면 합성 데이터를 만듭니다."""
+    paths = sorted(glob.glob(os.path.join(FIXTURE_DIR, '*.parquet')))
+    if paths:
+        return {os.path.splitext(os.path.basename(path))[0]: pd.read_parquet(path) for path in paths}
+    return {f"synthetic-{seed}": make_ohlcv(FIXTURE_YEARS, seed=seed) for seed in range(SYNTHETIC_FIXTURES)}
+
+
+def _peak_rss_mib() -> float:
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / (1024 * 1024) if sys.platform == 'darwin' else peak / 1024
+
+
+def train_global_fixture_model(fixtures: dict, steps: int) -> dict:
+    """모든 픽스처의 워크포워드 구간(마지막 steps 거래일) 이전 데이터로 공통 모델을 학습합니다. 새 프로세스에서 호출됩니다."""
+    import tensorflow as tf
+    from app.domestic.global_model import train_global_model_from_frames
+
+    tf.keras.utils.set_random_seed(0)
+    return train_global_model_from_frames({name: frame.sort_index().iloc[:-steps] for name, frame in fixtures.items()})
+
+
+def _accuracy(previous: np.ndarray, predicted: np.ndarray, actual: np.ndarray) -> dict:
+    errors = np.abs(predicted - actual)
+    return {
+        "mae": float(errors.mean()),
+        "mape_pct": float((errors / actual).mean() * 100),
+        "directional_accuracy": float((np.sign(predicted - previous) == np.sign(actual - previous)).mean()),
+    }
+
+
+def run_case(name: str, frame: pd.DataFrame, years: int, steps: int, budget_seconds: float = 0,
+             model: str = "per_ticker") -> dict:
+    """(픽스처, 기간) 조합 하나를 워크포워드로 실행합니다. 새 프로세스에서 호출됩니다."""
+    import tensorflow as tf
+    from app.domestic.predictor import predict_price_horizons_stacking_hybrid
+    from app.timing import record_stages
+
+    tf.keras.utils.set_random_seed(0)
+    frame = frame.sort_index()
+    predictions, wall_times, cpu_times, stage_totals = [], [], [], {}
+    for position in range(len(frame) - steps, len(frame)):
+        history_end = frame.index[position - 1]
+        window = frame.iloc[:position]
+        window = window[window.index > history_end - pd.Timedelta(days=years * 365)]
+
+        with record_stages() as recorder:
+            start, cpu_start = time.perf_counter(), time.process_time()
+            result = predict_price_horizons_stacking_hybrid(
+                window, parallel=False, budget_seconds=budget_seconds, model=model
+            )
+            wall_times.append(time.perf_counter() - start)
+            cpu_times.append(time.process_time() - cpu_start)
+        for stage_name, seconds in recorder.seconds.items():
+            stage_totals[stage_name] = stage_totals.get(stage_name, 0.0) + seconds
+        horizon_predictions = result["predictions"]
+
+        predictions.append({
+            "date": frame.index[position].strftime('%Y-%m-%d'),
+            "previous_close": float(window['closing_price'].iloc[-1]),
+            "predicted": horizon_predictions[1],
+            "actual": float(frame['closing_price'].iloc[position]),
+            "training": result["training"],
+            "horizons": {
+                str(h): {
+                    "predicted": price,
+                    # h 거래일 뒤 = position + h - 1 행 (픽스처 밖이면 None)
+                    "actual": float(frame['closing_price'].iloc[position + h - 1]) if position + h - 1 < len(frame) else None,
+                }
+                for h, price in horizon_predictions.items()
+            },
+            "comparison": result.get("comparison"),
+        })
+
+    previous = np.array([p["previous_close"] for p in predictions])
+    predicted = np.array([p["predicted"] for p in predictions])
+    actual = np.array([p["actual"] for p in predictions])
+    case = {
+        "fixture": name,
+        "years": years,
+        "bars": int(len(window)),
+        "steps": steps,
+        "model": model,
+        **_accuracy(previous, predicted, actual),
+        "wall_seconds": {
+            "mean": float(np.mean(wall_times)), "max": float(np.max(wall_times)), "total": float(np.sum(wall_times))
+        },
+        "cpu_seconds_mean": float(np.mean(cpu_times)),
+        "peak_rss_mib": round(_peak_rss_mib(), 1),
+        "stage_seconds_mean": {stage_name: round(total / steps, 4) for stage_name, total in stage_totals.items()},
+        "budget_seconds": budget_seconds,
+        "modes": {mode: sum(p["training"]["mode"] == mode for p in predictions)
+                  for mode in sorted({p["training"]["mode"] for p in predictions})},
+        "horizons": _horizon_errors(predictions),
+        "predictions": predictions,
+    }
+    if model == "compare":
+        case["comparison"] = _comparison_summary(predictions, previous, actual)
+    return case
+
+
+def _comparison_summary(predictions: list, previous: np.ndarray, actual: np.ndarray) -> dict:
+    """compare 모드에서 모델별 다음 날 예측의 정확도와 예측 1회당 평균 경과 시간/CPU 시간을 집계합니다."""
+    summary = {}
+    for model in ("per_ticker", "global"):
+        reports = [p["comparison"][model] for p in predictions]
+        if any("predictions" not in report for report in reports):
+            summary[model] = {"error": next(r.get("error") for r in reports if "predictions" not in r)}
+            continue
+        predicted = np.array([report["predictions"][1] for report in reports])
+        summary[model] = {
+            **_accuracy(previous, predicted, actual),
+            "wall_seconds_mean": float(np.mean([report["elapsed_seconds"] for report in reports])),
+            "cpu_seconds_mean": float(np.mean([report["cpu_seconds"] for report in reports])),
+        }
+    return summary
+
+
+def _horizon_errors(predictions: list) -> dict:
+    """{기간: {"count", "mae", "mape_pct"}}. 실제 종가가 있는 예측만 집계합니다."""
+    errors = {}
+    for h in predictions[0]["horizons"]:
+        pairs = [(p["horizons"][h]["predicted"], p["horizons"][h]["actual"]) for p in predictions
+                 if p["horizons"][h]["actual"] is not None]
+        if not pairs:
+            errors[h] = {"count": 0, "mae": None, "mape_pct": None}
+            continue
+        predicted, actual = np.array(pairs).T
+        abs_errors = np.abs(predicted - actual)
+        errors[h] = {
+            "count": len(pairs), "mae": float(abs_errors.mean()), "mape_pct": float((abs_errors / actual).mean() * 100)
+        }
+    return errors
+
+
+def _git_commit():
+    try:
+        return subprocess.run(
+            ['git', 'rev-parse', '--short', 'HEAD'], cwd=project_root, capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def _environment() -> dict:
+    import tensorflow as tf
+    import xgboost as xgb
+    from app.domestic.predictor import MODEL_VERSION
+    from app.domestic.global_model import GLOBAL_MODEL_VERSION
+
+    return {
+        "model_version": MODEL_VERSION,
+        "global_model_version": GLOBAL_MODEL_VERSION,
+        "git_commit": _git_commit(),
+        "created_at": datetime.datetime.now().isoformat(timespec='seconds'),
+        "python": platform.python_version(),
+        "tensorflow": tf.__version__,
+        "xgboost": xgb.__version__,
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+    }
+
+
+def compare_with_baseline(cases: list, baseline_path: str, tolerance: float) -> list:
+    """기준 결과와 (픽스처, 기간)별로 비교하여 예측 1회당 시간이 tolerance 이상 늘어난 조합을 반환합니다."""
+    with open(baseline_path, encoding='utf-8') as f:
+        baseline = {(case["fixture"], case["years"]): case for case in json.load(f)["cases"]}
+
+    regressions = []
+    print(f"\ncompared with {baseline_path}")
+    for case in cases:
+        before = baseline.get((case["fixture"], case["years"]))
+        if before is None:
+            continue
+        ratio = case["wall_seconds"]["mean"] / before["wall_seconds"]["mean"]
+        mae_change = case["mae"] - before["mae"]
+        flag = "REGRESSION" if ratio > 1 + tolerance else ""
+        print(f"  {case['fixture']:>14} {case['years']}y  time x{ratio:5.2f}  MAE {mae_change:+10.2f}  {flag}")
+        if flag:
+            regressions.append(case)
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--years', type=int, nargs='+', default=[1, 2, 3, 5])
+    parser.add_argument('--steps', type=int, default=3, help="워크포워드로 예측할 마지막 거래일 수")
+    parser.add_argument('--fixtures', nargs='+', help="사용할 픽스처 이름 (기본값: 전부)")
+    parser.add_argument('--output', help="결과 JSON 경로 (기본값: benchmarks/results/walk_forward-<시각>.json)")
+    parser.add_argument('--baseline', help="비교할 이전 결과 JSON")
+    parser.add_argument('--tolerance', type=float, default=0.2, help="허용하는 시간 증가 비율 (기본값: 0.2 = 20%%)")
+    parser.add_argument('--budget', type=float, default=0, help="예측 1회의 학습 시간 예산(초, 기본값: 0 = 제한 없음)")
+    parser.add_argument('--model', choices=['per_ticker', 'global', 'compare'], default='per_ticker',
+                        help="예측 모델 (global/compare는 픽스처로 공통 모델을 먼저 학습)")
+    parser.add_argument('--record', nargs='+', metavar='CODE', help="로컬 시세 저장소에서 픽스처를 기록하고 종료")
+    args = parser.parse_args()
+
+    if args.record:
+        record_fixtures(args.record, FIXTURE_YEARS)
+        return 0
+
+    fixtures = load_fixtures()
+    if args.fixtures:
+        fixtures = {name: fixtures[name] for name in args.fixtures}
+
+    cases = []
+    # 조합마다 새 프로세스를 사용해 peak RSS와 TensorFlow 상태가 서로 섞이지 않도록 합니다.
+    context = multiprocessing.get_context('spawn')
+    global_model = None
+    if args.model != 'per_ticker':
+        # 학습한 공통 모델이 실제 공통 모델을 덮어쓰지 않도록 임시 디렉토리를 사용합니다. (자식 프로세스에 환경 변수로 전달)
+        os.environ['PREDICTIBOOT_GLOBAL_MODEL_DIR'] = tempfile.mkdtemp(prefix='predictiboot-global-')
+        with ProcessPoolExecutor(max_workers=1, mp_context=context) as pool:
+            global_model = pool.submit(train_global_fixture_model, fixtures, args.steps).result()
+        print(f"trained global model on {global_model['codes']} fixtures in {global_model['training_seconds']}s")
+    for name, frame in fixtures.items():
+        for years in args.years:
+            if len(frame) < years * TRADING_DAYS_PER_YEAR * 0.9 + args.steps:
+                print(f"skip {name} {years}y: not enough history ({len(frame)} bars)")
+                continue
+            with ProcessPoolExecutor(max_workers=1, mp_context=context) as pool:
+                case = pool.submit(run_case, name, frame, years, args.steps, args.budget, args.model).result()
+            cases.append(case)
+            stages = ", ".join(f"{k} {v:.2f}s" for k, v in case["stage_seconds_mean"].items())
+            print(
+                f"{name:>14} {years}y ({case['bars']} bars): MAE {case['mae']:.2f}, MAPE {case['mape_pct']:.2f}%, "
+                f"direction {case['directional_accuracy']:.0%}, {case['wall_seconds']['mean']:.2f}s/prediction, "
+                f"peak RSS {case['peak_rss_mib']:.0f}MiB, modes {case['modes']}\n{'':>16}{stages}"
+            )
+            for model, summary in case.get("comparison", {}).items():
+                if "error" in summary:
+                    print(f"{'':>16}{model}: {summary['error']}")
+                    continue
+                print(
+                    f"{'':>16}{model}: MAE {summary['mae']:.2f}, MAPE {summary['mape_pct']:.2f}%, "
+                    f"direction {summary['directional_accuracy']:.0%}, {summary['wall_seconds_mean']:.2f}s "
+                    f"/ {summary['cpu_seconds_mean']:.2f} CPU s per prediction"
+                )
+
+    output = args.output or os.path.join(
+        RESULT_DIR, f"walk_forward-{datetime.datetime.now().strftime('%Y%m%d-%H%M%S')}.json"
+    )
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, 'w', encoding='utf-8') as f:
+        json.dump({"environment": _environment(), "steps": args.steps, "model": args.model,
+                   "global_model": global_model, "cases": cases}, f, indent=2, ensure_ascii=False)
+    print(f"\nsaved {output}")
+
+    if args.baseline and compare_with_baseline(cases, args.baseline, args.tolerance):
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
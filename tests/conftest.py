@@ -0,0 +1,7 @@
+import os
+import sys
+
+# 프로젝트 루트를 import 경로에 추가 (pytest를 어느 디렉토리에서 실행해도 app 패키지를 찾을 수 있도록)
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+if project_root not in sys.path:
+    sys.path.insert(0, project_root)
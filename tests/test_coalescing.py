@@ -0,0 +1,41 @@
+"""
+동시 요청 합치기(SingleFlight) 테스트.
+"""
+import asyncio
+
+from app.coalescing import SingleFlight
+
+
+def test_concurrent_calls_share_one_computation():
+    flight = SingleFlight("test")
+    calls = []
+
+    async def compute():
+        calls.append(1)
+        await asyncio.sleep(0.01)
+        return {"price": 1}
+
+    async def main():
+        results = await asyncio.gather(*(flight.run("005930", compute) for _ in range(5)))
+        other = await flight.run("000660", compute)
+        return results, other
+
+    results, other = asyncio.run(main())
+    assert len(calls) == 2
+    assert all(result is results[0] for result in results) and other == {"price": 1}
+    assert flight.inflight() == 0
+
+
+def test_waiters_share_the_exception_and_key_is_released():
+    flight = SingleFlight("test")
+
+    async def fail():
+        await asyncio.sleep(0.01)
+        raise ValueError("no data")
+
+    async def main():
+        return await asyncio.gather(*(flight.run("005930", fail) for _ in range(3)), return_exceptions=True)
+
+    results = asyncio.run(main())
+    assert all(isinstance(result, ValueError) for result in results)
+    assert flight.inflight() == 0
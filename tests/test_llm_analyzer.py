@@ -0,0 +1,91 @@
+"""
+LLM 분석기 테스트: OpenAI 호환 스텁 서버(로컬 HTTP)를 띄워 SQLite 캐시, 클라이언트 재사용, 스트리밍을 확인합니다.
+"""
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from app import llm_analyzer
+
+STREAM_TOKENS = ["1. 상승 확률: ", "60%", "\n2. 근거: 실적 개선"]
+COMPLETION_TEXT = "1. 상승 확률: 55%"
+NEWS = [{"title": "실적 발표", "source": "연합뉴스", "date": "2026.10.01", "content": "영업이익 증가"}]
+
+
+class _StubHandler(BaseHTTPRequestHandler):
+    """/v1/chat/completions 요청에 고정된 응답(일반 JSON 또는 SSE 스트림)을 돌려주는 핸들러."""
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, *args):
+        pass
+
+    def do_POST(self):
+        body = json.loads(self.rfile.read(int(self.headers['Content-Length'])))
+        self.server.requests.append(body)
+        if body.get('stream'):
+            events = [
+                {"id": "stub", "object": "chat.completion.chunk", "created": 0, "model": body['model'],
+                 "choices": [{"index": 0, "delta": {"content": token}, "finish_reason": None}]}
+                for token in STREAM_TOKENS
+            ]
+            payload = ''.join(f"data: {json.dumps(event)}\n\n" for event in events) + "data: [DONE]\n\n"
+            self._send(payload.encode('utf-8'), 'text/event-stream')
+        else:
+            completion = {"id": "stub", "object": "chat.completion", "created": 0, "model": body['model'],
+                          "choices": [{"index": 0, "finish_reason": "stop",
+                                       "message": {"role": "assistant", "content": COMPLETION_TEXT}}]}
+            self._send(json.dumps(completion).encode('utf-8'), 'application/json')
+
+    def _send(self, data: bytes, content_type: str):
+        self.send_response(200)
+        self.send_header('Content-Type', content_type)
+        self.send_header('Content-Length', str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+
+@pytest.fixture
+def stub_server(tmp_path, monkeypatch):
+    """스텁 서버를 띄우고 분석기의 base URL, 캐시 파일, 클라이언트 캐시를 테스트용으로 바꿉니다."""
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _StubHandler)
+    server.requests = []
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+
+    monkeypatch.setattr(llm_analyzer, 'LLM_BASE_URL', f"http://127.0.0.1:{server.server_port}/v1")
+    monkeypatch.setattr(llm_analyzer, 'analysis_cache',
+                        llm_analyzer.AnalysisCache(str(tmp_path / "llm_cache.sqlite"), 3600))
+    monkeypatch.setattr(llm_analyzer, '_clients', {})
+    try:
+        yield server
+    finally:
+        server.shutdown()
+        server.server_close()
+
+
+def test_repeated_analysis_hits_sqlite_cache(stub_server):
+    first = llm_analyzer.analyze_prediction_with_llm("test-key", "삼성전자", "상승 예상", "70000", NEWS)
+    second = llm_analyzer.analyze_prediction_with_llm("test-key", "삼성전자", "상승 예상", "70000", NEWS)
+
+    assert first == second == COMPLETION_TEXT
+    assert len(stub_server.requests) == 1
+
+    # 입력이 바뀌면 캐시를 쓰지 않고 새로 요청하되, 클라이언트는 재사용
+    llm_analyzer.analyze_prediction_with_llm("test-key", "삼성전자", "하락 예상", "69000", NEWS)
+    assert len(stub_server.requests) == 2
+    assert len(llm_analyzer._clients) == 1
+
+
+def test_stream_yields_tokens_then_serves_cache(stub_server):
+    tokens = list(llm_analyzer.stream_prediction_analysis("test-key", "삼성전자", "상승 예상", "70000", NEWS))
+
+    assert tokens == STREAM_TOKENS
+    assert stub_server.requests[0]['stream'] is True
+
+    # 스트리밍이 끝난 결과는 캐시에 저장되어 다음 호출은 서버 요청 없이 전체 결과를 한 번에 반환
+    cached = list(llm_analyzer.stream_prediction_analysis("test-key", "삼성전자", "상승 예상", "70000", NEWS))
+    assert cached == [''.join(STREAM_TOKENS)]
+    assert llm_analyzer.analyze_prediction_with_llm("test-key", "삼성전자", "상승 예상", "70000", NEWS) == ''.join(STREAM_TOKENS)
+    assert len(stub_server.requests) == 1
@@ -0,0 +1,140 @@
+"""
+로컬 시세 저장소(OHLCVStore) 동기화 계획 테스트: 업스트림 대신 호출을 기록하는 스텁 fetch 함수를 사용합니다.
+"""
+import datetime
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from app.domestic.ohlcv_store import OHLCVStore, OHLCV_COLUMNS
+
+
+def make_ohlcv(days: int, start_price: float = 10000.0) -> pd.DataFrame:
+    """오늘까지 days일(영업일) 동안의 일봉 데이터프레임을 만듭니다."""
+    index = pd.bdate_range(end=pd.Timestamp(datetime.date.today()), periods=days, name='date')
+    close = start_price + np.arange(days, dtype=float)
+    return pd.DataFrame({
+        'closing_price': close, 'change': 0.0, 'opening_price': close - 5,
+        'high_price': close + 10, 'low_price': close - 10, 'volume': 1000.0,
+    }, index=index)[OHLCV_COLUMNS]
+
+
+class StubUpstream:
+    """source 데이터프레임에서 요청 구간을 잘라 돌려주고, 요청한 (시작일, 종료일)을 기록합니다."""
+
+    def __init__(self, source: pd.DataFrame):
+        self.source = source
+        self.calls = []
+        self.empty = False
+
+    def fetch(self, code: str, start_str: str, end_str: str) -> pd.DataFrame:
+        self.calls.append((code, start_str, end_str))
+        if self.empty:
+            return self.source.iloc[0:0]
+        return self.source.loc[pd.Timestamp(start_str):pd.Timestamp(end_str)].copy()
+
+
+@pytest.fixture
+def upstream():
+    return StubUpstream(make_ohlcv(800))
+
+
+def test_empty_upstream_response_is_retried(tmp_path, upstream):
+    store = OHLCVStore(str(tmp_path), upstream.fetch, min_years=1, sync_ttl_seconds=0)
+
+    upstream.empty = True
+    assert store.get("005930", 1).empty
+    assert not (tmp_path / "005930.json").exists()
+
+    # 업스트림이 복구되면 다음 동기화에서 전체 구간을 받아야 함
+    upstream.empty = False
+    frame = store.get("005930", 3)
+    assert len(upstream.calls) == 2
+    assert upstream.calls[1][1] <= (datetime.date.today() - datetime.timedelta(days=3 * 365)).strftime('%Y%m%d')
+    assert len(frame) > 700
+
+
+def test_empty_stored_partition_is_treated_as_no_history(tmp_path, upstream):
+    store = OHLCVStore(str(tmp_path), upstream.fetch, min_years=1, sync_ttl_seconds=0)
+    # 빈 파티션을 저장했던 이전 버전의 파일도 이력이 없는 것으로 보고 다시 받음
+    store._write("005930", upstream.source.iloc[0:0], {'history_start': '20000101', 'last_sync': 0})
+
+    assert len(store.get("005930", 1)) > 200
+    assert len(upstream.calls) == 1
+
+
+def test_first_sync_fetches_history_then_only_the_delta(tmp_path, upstream):
+    store = OHLCVStore(str(tmp_path), upstream.fetch, min_years=1, sync_ttl_seconds=0)
+    frame = store.get("005930", 1)
+    assert len(upstream.calls) == 1 and len(frame) > 200
+
+    store.get("005930", 1)
+    # 두 번째 동기화는 마지막 두 봉(수정주가 비교용 확정 봉 + 장중일 수 있는 마지막 봉)부터만 받음
+    _, start_str, _ = upstream.calls[1]
+    assert start_str == frame.index[-2].strftime('%Y%m%d')
+
+
+def test_sync_ttl_skips_upstream(tmp_path, upstream):
+    store = OHLCVStore(str(tmp_path), upstream.fetch, min_years=1, sync_ttl_seconds=3600)
+    store.get("005930", 1)
+    store.get("005930", 1)
+    assert len(upstream.calls) == 1
+
+
+def test_longer_period_fetches_only_older_history(tmp_path, upstream):
+    store = OHLCVStore(str(tmp_path), upstream.fetch, min_years=1, sync_ttl_seconds=3600)
+    first = store.get("005930", 1)
+    longer = store.get("005930", 3)
+
+    _, start_str, end_str = upstream.calls[1]
+    assert end_str < first.index[0].strftime('%Y%m%d')
+    assert len(longer) > len(first)
+    assert longer.index.is_monotonic_increasing and not longer.index.duplicated().any()
+
+
+def test_adjusted_prices_trigger_full_refetch(tmp_path, upstream):
+    store = OHLCVStore(str(tmp_path), upstream.fetch, min_years=1, sync_ttl_seconds=0)
+    store.get("005930", 1)
+
+    # 액면분할 등으로 업스트림의 과거 가격이 모두 바뀐 경우
+    upstream.source = upstream.source / 2
+    frame = store.get("005930", 1)
+
+    assert len(upstream.calls) == 3
+    assert upstream.calls[2][1] == upstream.calls[0][1]  # 처음 받은 이력 시작일부터 다시 받음
+    assert np.allclose(frame['closing_price'], upstream.source['closing_price'].loc[frame.index])
+
+
+def test_changed_last_bar_is_not_an_adjustment(tmp_path, upstream):
+    store = OHLCVStore(str(tmp_path), upstream.fetch, min_years=1, sync_ttl_seconds=0)
+    store.get("005930", 1)
+
+    # 장중에 바뀐 마지막 봉만 다르면 전체를 다시 받지 않음
+    upstream.source.iloc[-1, 0] += 100
+    frame = store.get("005930", 1)
+
+    assert len(upstream.calls) == 2
+    assert frame['closing_price'].iloc[-1] == upstream.source['closing_price'].iloc[-1]
+
+
+def test_sync_many_batches_and_refetches_adjusted_codes(tmp_path):
+    sources = {"005930": make_ohlcv(400), "000660": make_ohlcv(400, start_price=50000.0)}
+    calls = []
+
+    def fetch_many(codes, start_str, end_str):
+        calls.append((tuple(codes), start_str, end_str))
+        return {code: sources[code].loc[pd.Timestamp(start_str):pd.Timestamp(end_str)].copy() for code in codes}
+
+    store = OHLCVStore(str(tmp_path), None, min_years=1, sync_ttl_seconds=0, fetch_many_fn=fetch_many)
+    frames = store.get_many(["005930", "000660"], 1)
+    assert len(calls) == 1 and set(calls[0][0]) == {"005930", "000660"}
+    assert all(len(frame) > 200 for frame in frames.values())
+
+    sources["000660"] = sources["000660"] * 1.5
+    frames = store.get_many(["005930", "000660"], 1)
+
+    # 최신 구간은 두 종목을 한 번에, 가격이 바뀐 종목만 전체 구간을 다시 받음
+    assert calls[1][0] == ("000660", "005930")
+    assert calls[2][0] == ("000660",) and calls[2][1] == calls[0][1]
+    assert np.allclose(frames["000660"]['closing_price'], sources["000660"]['closing_price'].loc[frames["000660"].index])
@@ -0,0 +1,33 @@
+"""
+미리 계산한 예측 저장소(PredictionStore) 테스트.
+"""
+import datetime
+
+from app.domestic.prediction_store import PredictionStore
+
+
+def test_put_get_and_count(tmp_path):
+    store = PredictionStore(str(tmp_path / "predictions.sqlite3"), retention_days=7)
+    target = datetime.date.today() + datetime.timedelta(days=1)
+    assert store.get("005930", 1, target) is None
+
+    store.put("005930", 1, target, "삼성전자", datetime.date.today(), 70000.0, {1: 70500.0, 5: 71000.0})
+    stored = store.get("005930", 1, target)
+
+    assert stored["predicted_price"] == 70500.0
+    assert stored["predictions"] == {1: 70500.0, 5: 71000.0}
+    assert stored["last_data_date"] == datetime.date.today()
+    assert store.get("005930", 3, target) is None
+    assert store.count(target) == 1
+
+
+def test_purge_expired_keeps_recent_targets(tmp_path):
+    store = PredictionStore(str(tmp_path / "predictions.sqlite3"), retention_days=7)
+    today = datetime.date.today()
+    old, recent = today - datetime.timedelta(days=30), today - datetime.timedelta(days=1)
+    for target in (old, recent):
+        store.put("005930", 1, target, "삼성전자", target, 70000.0, {1: 70500.0})
+
+    store.purge_expired()
+    assert store.get("005930", 1, old) is None
+    assert store.get("005930", 1, recent) is not None
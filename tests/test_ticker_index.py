@@ -0,0 +1,77 @@
+"""
+종목 검색 인덱스(TickerIndex) 테스트: 업스트림(pykrx) 대신 빌드 함수를 바꿔 검색과 빌드 실패 시의 동작을 확인합니다.
+"""
+import os
+
+import pytest
+
+from app.domestic.ticker_index import TickerIndex, to_chosung
+
+ROWS = [
+    {'code': '005930', 'name': '삼성전자', 'market': 'KOSPI'},
+    {'code': '005935', 'name': '삼성전자우', 'market': 'KOSPI'},
+    {'code': '000660', 'name': 'SK하이닉스', 'market': 'KOSPI'},
+]
+
+
+@pytest.fixture
+def index(tmp_path):
+    index = TickerIndex(str(tmp_path), retry_seconds=60)
+    index.builds = 0
+
+    def build(date_str):
+        index.builds += 1
+        return ROWS
+
+    index._build = build
+    return index
+
+
+def test_search_ranks_exact_then_prefix_then_substring(index):
+    assert [r['code'] for r in index.search('삼성전자')] == ['005930', '005935']
+    assert [r['code'] for r in index.search('하이닉스')] == ['000660']
+    assert [r['code'] for r in index.search('0059', limit=1)] == ['005930']
+    assert index.search('   ') == []
+
+
+def test_chosung_search(index):
+    assert to_chosung('삼성전자') == 'ㅅㅅㅈㅈ'
+    assert [r['code'] for r in index.search('ㅅㅅㅈㅈ')] == ['005930', '005935']
+
+
+def test_built_index_is_saved_and_reused(index, tmp_path):
+    index.search('삼성')
+    index.search('삼성')
+    assert index.builds == 1
+
+    restarted = TickerIndex(str(tmp_path))
+    restarted._build = lambda date_str: pytest.fail("should load the saved index")
+    assert restarted.get_name('000660') == 'SK하이닉스'
+
+
+def test_failed_rebuild_serves_stale_index_with_backoff(index):
+    index.search('삼성')
+    # 전날 만든 인덱스만 메모리에 있는 상태
+    index._built_date = '20000101'
+    os.remove(index._path())
+
+    def fail(date_str):
+        index.builds += 1
+        raise RuntimeError("KRX down")
+
+    index._build = fail
+    for _ in range(3):
+        assert index.search('삼성전자')[0]['code'] == '005930'
+    assert index.builds == 2  # 실패 후 재시도 대기 동안은 다시 빌드하지 않음
+    assert index.is_fresh()
+
+
+def test_failed_first_build_raises(tmp_path):
+    index = TickerIndex(str(tmp_path))
+
+    def fail(date_str):
+        raise RuntimeError("KRX down")
+
+    index._build = fail
+    with pytest.raises(RuntimeError):
+        index.search('삼성')
@@ -0,0 +1,127 @@
+"""
+학습 워커 테스트: 파일 브로커(FileBroker)의 작업 가져가기/상태/취소와 해시 링 배정, 워커가 빠졌을 때의 재배정을 확인합니다.
+"""
+import os
+import threading
+
+import pytest
+
+from app.workers import FileBroker, WorkerClient, HashRing, TASK_HANDLERS, _execute
+
+
+@pytest.fixture
+def broker(tmp_path):
+    return FileBroker(str(tmp_path), poll_seconds=0.01)
+
+
+def make_client(broker) -> WorkerClient:
+    return WorkerClient(broker, virtual_nodes=8, worker_timeout=60, task_timeout=5, poll_seconds=0.01)
+
+
+def test_take_claims_each_task_once(broker):
+    for i in range(20):
+        broker.put("worker-1", {"id": f"task-{i}", "kind": "noop", "params": {}})
+
+    taken, lock = [], threading.Lock()
+
+    def take_all():
+        while True:
+            task = broker.take("worker-1", timeout=0)
+            if task is None:
+                return
+            with lock:
+                taken.append(task["id"])
+
+    threads = [threading.Thread(target=take_all) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    # 여러 스레드가 같은 큐에서 가져가도 작업마다 정확히 한 번만 가져감
+    assert sorted(taken) == sorted(f"task-{i}" for i in range(20))
+    assert broker.take("worker-1", timeout=0) is None
+
+
+def test_take_waits_for_a_task_until_timeout(broker):
+    assert broker.take("worker-1", timeout=0.05) is None
+    threading.Timer(0.02, broker.put, args=("worker-1", {"id": "late", "kind": "noop", "params": {}})).start()
+    assert broker.take("worker-1", timeout=2)["id"] == "late"
+
+
+def test_workers_lists_only_live_heartbeats(broker, tmp_path):
+    broker.heartbeat("worker-1")
+    broker.heartbeat("worker-2")
+    os.utime(tmp_path / "workers" / "worker-2", (0, 0))
+    assert broker.workers(timeout=60) == ["worker-1"]
+    broker.leave("worker-1")
+    assert broker.workers(timeout=60) == []
+
+
+def test_executed_task_status_and_forget(broker, monkeypatch):
+    def echo(job, value):
+        job.update_progress(0.5, "절반")
+        return {"value": value}
+
+    monkeypatch.setitem(TASK_HANDLERS, "test_echo", echo)
+
+    broker.put("worker-1", {"id": "t1", "kind": "test_echo", "params": {"value": 3}})
+    _execute(broker, broker.take("worker-1", timeout=0), "worker-1")
+
+    status = broker.get_status("t1")
+    assert status["status"] == "succeeded" and status["result"] == {"value": 3}
+    broker.forget("t1")
+    assert broker.get_status("t1") is None
+
+
+def test_cancelled_task_is_not_run(broker, monkeypatch):
+    ran = []
+    monkeypatch.setitem(TASK_HANDLERS, "test_record", lambda job: ran.append(True))
+
+    broker.put("worker-1", {"id": "t2", "kind": "test_record", "params": {}})
+    broker.cancel("t2")
+    _execute(broker, broker.take("worker-1", timeout=0), "worker-1")
+
+    assert ran == [] and broker.get_status("t2") is None and not broker.is_cancelled("t2")
+
+
+def test_hash_ring_moves_only_the_departed_workers_keys():
+    keys = [f"{i:06d}" for i in range(300)]
+    before = HashRing(["worker-1", "worker-2", "worker-3"], virtual_nodes=64)
+    after = HashRing(["worker-1", "worker-2"], virtual_nodes=64)
+    moved = [key for key in keys if before.node_for(key) != after.node_for(key)]
+    assert moved and all(before.node_for(key) == "worker-3" for key in moved)
+
+
+def test_reassign_removes_queued_task_from_departed_worker(broker):
+    client = make_client(broker)
+    broker.heartbeat("worker-1")
+    task = client.submit("domestic_predict", "005930", {"code": "005930"})
+    first_id = task["id"]
+
+    broker.leave("worker-1")
+    broker.heartbeat("worker-2")
+    assert client._poll(task) is None
+
+    assert task["worker"] == "worker-2" and task["attempt"] == 2 and task["id"] != first_id
+    # 같은 id로 다시 시작한 워커는 옮겨 간 작업을 가져가지 않아야 함
+    assert broker.take("worker-1", timeout=0) is None
+    assert not broker.is_cancelled(first_id)
+    assert broker.take("worker-2", timeout=0)["id"] == task["id"]
+
+
+def test_reassign_cancels_claim_of_departed_worker(broker):
+    client = make_client(broker)
+    broker.heartbeat("worker-1")
+    task = client.submit("domestic_predict", "005930", {"code": "005930"})
+    first_id = task["id"]
+    assert broker.take("worker-1", timeout=0)["id"] == first_id
+
+    broker.leave("worker-1")
+    broker.heartbeat("worker-2")
+    client._poll(task)
+
+    # 이전 실행은 취소되고, 새 실행은 새 id로 취소와 섞이지 않음
+    assert broker.is_cancelled(first_id)
+    assert not broker.is_cancelled(task["id"])
+    assert broker.take("worker-2", timeout=0)["id"] == task["id"]